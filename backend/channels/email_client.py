@@ -14,67 +14,43 @@
 
 import os
 import json
+import logging
 import streamlit as st
 
 import sib_api_v3_sdk
 from sib_api_v3_sdk.rest import ApiException
 
+from backend.utils.client_factory import get_client
+from backend.channels.notification_templates import get_template_registry
+
+logger = logging.getLogger(__name__)
+
+# Brevo accepts up to this many message versions in one send call.
+BREVO_MAX_MESSAGE_VERSIONS: int = 1000
+
 
 class TransactionalEmails:
     def __init__(self):
-        configuration = sib_api_v3_sdk.Configuration()
-        configuration.api_key["api-key"] = st.secrets["BREVO_API_KEY"]
-
-        self.api_instance = sib_api_v3_sdk.TransactionalEmailsApi(
-            sib_api_v3_sdk.ApiClient(configuration)
-        )
+        self.api_instance = get_client("brevo")
 
         self.sender = {
             "email": st.secrets['BREVO_SENDERS_EMAIL_ID'], 
-            "name:": "LogIQ Support",
+            "name": "LogIQ Support",
         }
 
-    def send_onsite_service_request_confirmation_mail(
-        self,
-        receiver_full_name,
-        receiver_email,
-        service_request_id,
-    ):
-        to = [
-            {
-                "email": receiver_email,
-                "name:": receiver_full_name,
-            }
-        ]
+        self.templates = get_template_registry()
 
-        subject = "You service request has been cretaed succesfully!"
-
-        html_content = f"""
-        <HTML>
-            <BODY>
-                Dear {receiver_full_name},
-                <BR><BR>
-                Your request for onsite service has been successfully created 
-                with id: <B>{service_request_id}</B>.
-                <BR><BR>
-                Our team is currently processing your request and will assign a 
-                qualified service engineer to your case as soon as possible. 
-                You'll receive an update with the engineer's details shortly.
-                <BR><BR>
-                If you have any questions in the meantime, feel free to contact 
-                us.
-                <BR><BR>
-                Warm regards,
-                <BR>
-                LogIQ Support Team
-            </BODY>
-        </HTML>
-        """
+    def _send(self, event, receiver_full_name, receiver_email, params):
+        subject, html_content = self.templates.render(
+            event,
+            "email",
+            {"receiver_full_name": receiver_full_name, **params},
+        )
 
         smtp_payload = sib_api_v3_sdk.SendSmtpEmail(
-            sender=self.sender, 
-            to=to, 
-            subject=subject, 
+            sender=self.sender,
+            to=[{"email": receiver_email, "name": receiver_full_name}],
+            subject=subject,
             html_content=html_content,
         )
 
@@ -85,6 +61,80 @@ class TransactionalEmails:
         except ApiException as e:
             return False
 
+    def send_bulk(self, event, recipients, variant="default", rate_limiter=None):
+        # recipients: [{"email", "name", "params"}]. The unrendered template
+        # goes out once per call and Brevo renders a version per recipient;
+        # each call draws one token from rate_limiter.
+        template = self.templates.get(event, "email", variant)
+        failed_recipients = []
+
+        for start in range(0, len(recipients), BREVO_MAX_MESSAGE_VERSIONS):
+            batch = recipients[start : start + BREVO_MAX_MESSAGE_VERSIONS]
+
+            message_versions = []
+            for recipient in batch:
+                params = {
+                    "receiver_full_name": recipient["name"],
+                    **recipient["params"],
+                }
+
+                # Brevo fills the body in with these values as given, so they
+                # are escaped here exactly as _send's local render does.
+                try:
+                    message_versions.append(
+                        sib_api_v3_sdk.SendSmtpEmailMessageVersions(
+                            to=[
+                                {"email": recipient["email"], "name": recipient["name"]}
+                            ],
+                            params=template["body"].substitutions(params),
+                            subject=template["subject"].render(params),
+                        )
+                    )
+
+                except ValueError as error:
+                    # Retrying cannot fix missing params, and failing the
+                    # recipient would resend the whole batch; skip them.
+                    logger.error(
+                        "Could not render bulk %s email for %s: %s",
+                        event,
+                        recipient["email"],
+                        error,
+                    )
+
+            if not message_versions:
+                continue
+
+            smtp_payload = sib_api_v3_sdk.SendSmtpEmail(
+                sender=self.sender,
+                html_content=template["body"].source,
+                subject=template["subject"].source,
+                message_versions=message_versions,
+            )
+
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+
+            try:
+                api_response = self.api_instance.send_transac_email(smtp_payload)
+
+            except ApiException as e:
+                failed_recipients.extend(batch)
+
+        return failed_recipients
+
+    def send_onsite_service_request_confirmation_mail(
+        self,
+        receiver_full_name,
+        receiver_email,
+        service_request_id,
+    ):
+        return self._send(
+            "onsite_service_request_confirmation",
+            receiver_full_name,
+            receiver_email,
+            {"service_request_id": service_request_id},
+        )
+
     def send_onsite_service_request_engineer_assigned_mail(
         self,
         receiver_full_name,
@@ -95,59 +145,19 @@ class TransactionalEmails:
         engineer_phone,
         engineer_email,
     ):
-        to = [
+        return self._send(
+            "onsite_service_request_engineer_assigned",
+            receiver_full_name,
+            receiver_email,
             {
-                "email": receiver_email,
-                "name:": receiver_full_name,
-            }
-        ]
-
-        subject = f"Service Request {service_request_id} Assigned to Engineer!"
-
-        html_content = f"""
-        <HTML>
-            <BODY>
-                Dear {receiver_full_name},
-                <BR><BR>
-                We are pleased to inform you that an engineer has been assigned 
-                to your service request, with Request Id: 
-                <B>{service_request_id}</B>.
-                <BR><BR>
-                Below are the details of the assigned engineer:
-                <BR><UL>
-                    <LI><B>Engineer ID:</B> {engineer_id}</LI>
-                    <LI><B>Engineer Name:</B> {engineer_name}</LI>
-                    <LI><B>Phone Number:</B> {engineer_phone}</LI>
-                    <LI><B>Email Address:</B> {engineer_email}</LI>
-                </UL>
-                The engineer will contact you shortly to schedule a convenient 
-                time for the service. If you have any questions or need further 
-                assistance, please feel free to reach out to us.
-                <BR><BR>
-                Thank you for choosing LogIQ. We appreciate the opportunity to 
-                serve you!
-                <BR><BR>
-                Warm regards,
-                <BR>
-                LogIQ Support Team
-            </BODY>
-        </HTML>
-        """
-
-        smtp_payload = sib_api_v3_sdk.SendSmtpEmail(
-            sender=self.sender, 
-            to=to, 
-            subject=subject, 
-            html_content=html_content,
+                "service_request_id": service_request_id,
+                "engineer_id": engineer_id,
+                "engineer_name": engineer_name,
+                "engineer_phone": engineer_phone,
+                "engineer_email": engineer_email,
+            },
         )
 
-        try:
-            api_response = self.api_instance.send_transac_email(smtp_payload)
-            return True
-
-        except ApiException as e:
-            return False
-
     def send_onsite_service_request_resolution_started_mail(
         self,
         receiver_full_name,
@@ -156,53 +166,17 @@ class TransactionalEmails:
         engineer_id,
         engineer_name,
     ):
-        to = [
+        return self._send(
+            "onsite_service_request_resolution_started",
+            receiver_full_name,
+            receiver_email,
             {
-                "email": receiver_email,
-                "name:": receiver_full_name,
-            }
-        ]
-
-        subject = f"Resolution Has Begun for Request Id: {service_request_id}!"
-
-        html_content = f"""
-        <HTML>
-            <BODY>
-                Dear {receiver_full_name},
-                <BR><BR>
-                We are happy to inform you that the assigned engineer, 
-                {engineer_name} (Id: {engineer_id}), has been successfully 
-                verified and has started working on resolving your service 
-                request.
-                <BR><BR>
-                The resolution process is now underway, and we will keep you 
-                updated on the progress. If you have any questions or concerns, 
-                please feel free to contact us at customer.support@logiq.com.
-                <BR><BR>
-                Thank you for your patience and trust in LogIQ. We are 
-                committed to providing you with the best service experience.
-                <BR><BR>
-                Warm regards,
-                <BR>
-                LogIQ Support Team
-            </BODY>
-        </HTML>
-        """
-
-        smtp_payload = sib_api_v3_sdk.SendSmtpEmail(
-            sender=self.sender, 
-            to=to, 
-            subject=subject, 
-            html_content=html_content,
+                "service_request_id": service_request_id,
+                "engineer_id": engineer_id,
+                "engineer_name": engineer_name,
+            },
         )
 
-        try:
-            api_response = self.api_instance.send_transac_email(smtp_payload)
-            return True
-
-        except ApiException as e:
-            return False
-
     def send_onsite_service_request_resolved_mail(
         self,
         receiver_full_name,
@@ -213,51 +187,15 @@ class TransactionalEmails:
         ticket_activity,
         additional_notes,
     ):
-        to = [
+        return self._send(
+            "onsite_service_request_resolved",
+            receiver_full_name,
+            receiver_email,
             {
-                "email": receiver_email,
-                "name:": receiver_full_name,
-            }
-        ]
-
-        subject = f"Service Request {service_request_id} Has Been Resolved!"
-
-        html_content = f"""
-        <HTML>
-            <BODY>
-                Dear {receiver_full_name},
-                <BR><BR>
-                We are pleased to inform you that your service request has been 
-                successfully resolved by our engineer, {engineer_name} (Id: 
-                {engineer_id}).
-                <BR><UL>
-                    <LI><B>Engineer Activity:</B><BR>{ticket_activity}</LI><BR>
-                    <LI><B>Additional Notes:</B><BR>{additional_notes}</LI>
-                </UL>
-                We hope everything is now functioning as expected. If you have 
-                any further concerns or require additional assistance, please 
-                don't hesitate to contact us at customer.support@logiq.com.
-                <BR><BR>
-                Thank you for choosing LogIQ. We value your trust and look 
-                forward to serving you again in the future!
-                <BR><BR>
-                Warm regards,
-                <BR>
-                LogIQ Support Team
-            </BODY>
-        </HTML>
-        """
-
-        smtp_payload = sib_api_v3_sdk.SendSmtpEmail(
-            sender=self.sender, 
-            to=to, 
-            subject=subject, 
-            html_content=html_content,
+                "service_request_id": service_request_id,
+                "engineer_id": engineer_id,
+                "engineer_name": engineer_name,
+                "ticket_activity": ticket_activity,
+                "additional_notes": additional_notes,
+            },
         )
-
-        try:
-            api_response = self.api_instance.send_transac_email(smtp_payload)
-            return True
-
-        except ApiException as e:
-            return False
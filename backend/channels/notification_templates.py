@@ -0,0 +1,310 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+import html
+import threading
+
+# Templates use Brevo's "{{ params.name }}" syntax, so the same source is
+# rendered here for a single send and handed to Brevo unrendered for a
+# batch send, where each message version carries its own params.
+_PLACEHOLDER = re.compile(r"\{\{\s*params\.(\w+)\s*\}\}")
+
+
+class CompiledTemplate:
+    def __init__(self, source, escape_html=False):
+        self.source = source
+        self.escape_html = escape_html
+
+        pieces = _PLACEHOLDER.split(source)
+        self._literals = pieces[0::2]
+        self._fields = pieces[1::2]
+
+        self.fields = frozenset(self._fields)
+
+    def substitutions(self, params):
+        # The exact value render() puts in for each placeholder. A batch send
+        # hands these to Brevo, so both paths escape the same way.
+        missing_fields = self.fields - params.keys()
+
+        if missing_fields:
+            raise ValueError(f"Missing template params: {sorted(missing_fields)}")
+
+        substitutions = {}
+
+        for field in self.fields:
+            value = "" if params[field] is None else str(params[field])
+            substitutions[field] = html.escape(value) if self.escape_html else value
+
+        return substitutions
+
+    def render(self, params):
+        substitutions = self.substitutions(params)
+
+        rendered = [self._literals[0]]
+
+        for field, literal in zip(self._fields, self._literals[1:]):
+            rendered.append(substitutions[field])
+            rendered.append(literal)
+
+        return "".join(rendered)
+
+
+class TemplateRegistry:
+    def __init__(self):
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def register(self, event, channel, body, subject=None, variant="default"):
+        template = {
+            "subject": CompiledTemplate(subject) if subject else None,
+            "body": CompiledTemplate(body, escape_html=channel == "email"),
+        }
+
+        with self._lock:
+            self._templates[(event, channel, variant)] = template
+
+    def get(self, event, channel, variant="default"):
+        template = self._templates.get(
+            (event, channel, variant)
+        ) or self._templates.get((event, channel, "default"))
+
+        if template is None:
+            raise KeyError(f"No {channel} template registered for {event!r}")
+
+        return template
+
+    def render(self, event, channel, params, variant="default"):
+        template = self.get(event, channel, variant)
+
+        subject = template["subject"].render(params) if template["subject"] else None
+        return subject, template["body"].render(params)
+
+    def events(self, channel=None):
+        return sorted(
+            {
+                event
+                for event, template_channel, _ in self._templates
+                if channel is None or template_channel == channel
+            }
+        )
+
+
+_EMAIL_SIGN_OFF = """
+                <BR><BR>
+                Warm regards,
+                <BR>
+                LogIQ Support Team
+            </BODY>
+        </HTML>
+"""
+
+
+def _register_default_templates(registry):
+    registry.register(
+        "onsite_service_request_confirmation",
+        "email",
+        subject="You service request has been cretaed succesfully!",
+        body="""
+        <HTML>
+            <BODY>
+                Dear {{ params.receiver_full_name }},
+                <BR><BR>
+                Your request for onsite service has been successfully created
+                with id: <B>{{ params.service_request_id }}</B>.
+                <BR><BR>
+                Our team is currently processing your request and will assign a
+                qualified service engineer to your case as soon as possible.
+                You'll receive an update with the engineer's details shortly.
+                <BR><BR>
+                If you have any questions in the meantime, feel free to contact
+                us."""
+        + _EMAIL_SIGN_OFF,
+    )
+
+    registry.register(
+        "onsite_service_request_engineer_assigned",
+        "email",
+        subject="Service Request {{ params.service_request_id }} Assigned to Engineer!",
+        body="""
+        <HTML>
+            <BODY>
+                Dear {{ params.receiver_full_name }},
+                <BR><BR>
+                We are pleased to inform you that an engineer has been assigned
+                to your service request, with Request Id:
+                <B>{{ params.service_request_id }}</B>.
+                <BR><BR>
+                Below are the details of the assigned engineer:
+                <BR><UL>
+                    <LI><B>Engineer ID:</B> {{ params.engineer_id }}</LI>
+                    <LI><B>Engineer Name:</B> {{ params.engineer_name }}</LI>
+                    <LI><B>Phone Number:</B> {{ params.engineer_phone }}</LI>
+                    <LI><B>Email Address:</B> {{ params.engineer_email }}</LI>
+                </UL>
+                The engineer will contact you shortly to schedule a convenient
+                time for the service. If you have any questions or need further
+                assistance, please feel free to reach out to us.
+                <BR><BR>
+                Thank you for choosing LogIQ. We appreciate the opportunity to
+                serve you!"""
+        + _EMAIL_SIGN_OFF,
+    )
+
+    registry.register(
+        "onsite_service_request_resolution_started",
+        "email",
+        subject="Resolution Has Begun for Request Id: {{ params.service_request_id }}!",
+        body="""
+        <HTML>
+            <BODY>
+                Dear {{ params.receiver_full_name }},
+                <BR><BR>
+                We are happy to inform you that the assigned engineer,
+                {{ params.engineer_name }} (Id: {{ params.engineer_id }}), has been
+                successfully verified and has started working on resolving your
+                service request.
+                <BR><BR>
+                The resolution process is now underway, and we will keep you
+                updated on the progress. If you have any questions or concerns,
+                please feel free to contact us at customer.support@logiq.com.
+                <BR><BR>
+                Thank you for your patience and trust in LogIQ. We are
+                committed to providing you with the best service experience."""
+        + _EMAIL_SIGN_OFF,
+    )
+
+    registry.register(
+        "onsite_service_request_resolved",
+        "email",
+        subject="Service Request {{ params.service_request_id }} Has Been Resolved!",
+        body="""
+        <HTML>
+            <BODY>
+                Dear {{ params.receiver_full_name }},
+                <BR><BR>
+                We are pleased to inform you that your service request has been
+                successfully resolved by our engineer, {{ params.engineer_name }}
+                (Id: {{ params.engineer_id }}).
+                <BR><UL>
+                    <LI><B>Engineer Activity:</B><BR>
+                    {{ params.ticket_activity }}</LI><BR>
+                    <LI><B>Additional Notes:</B><BR>
+                    {{ params.additional_notes }}</LI>
+                </UL>
+                We hope everything is now functioning as expected. If you have
+                any further concerns or require additional assistance, please
+                don't hesitate to contact us at customer.support@logiq.com.
+                <BR><BR>
+                Thank you for choosing LogIQ. We value your trust and look
+                forward to serving you again in the future!"""
+        + _EMAIL_SIGN_OFF,
+    )
+
+    registry.register(
+        "service_outage_notice",
+        "email",
+        subject="Service disruption in {{ params.region }}",
+        body="""
+        <HTML>
+            <BODY>
+                Dear {{ params.receiver_full_name }},
+                <BR><BR>
+                Onsite service in {{ params.region }} is disrupted
+                {{ params.outage_window }}. {{ params.details }}
+                <BR><BR>
+                Requests raised in this period will be scheduled as soon as
+                service resumes. We apologise for the inconvenience."""
+        + _EMAIL_SIGN_OFF,
+    )
+
+    registry.register(
+        "warranty_expiry_reminder",
+        "email",
+        subject="Warranty for your {{ params.appliance_name }} ends on "
+        "{{ params.warranty_expiration }}",
+        body="""
+        <HTML>
+            <BODY>
+                Dear {{ params.receiver_full_name }},
+                <BR><BR>
+                The warranty for your {{ params.appliance_name }} (Serial No:
+                <B>{{ params.serial_number }}</B>) ends on
+                <B>{{ params.warranty_expiration }}</B>.
+                <BR><BR>
+                If the appliance needs attention, raise a service request in the
+                LogIQ app before then so it is covered."""
+        + _EMAIL_SIGN_OFF,
+    )
+
+    # SMS bodies are kept to one line: the indentation the old triple-quoted
+    # strings carried was sent and billed as part of the message.
+    registry.register(
+        "onsite_service_request_confirmation",
+        "sms",
+        body="Request Id: {{ params.service_request_id }} confirmed! We'll assign "
+        "an engineer soon and update you with their details - LogIQ Support Team",
+    )
+    registry.register(
+        "onsite_service_request_engineer_assigned",
+        "sms",
+        body="Engineer {{ params.engineer_name }} (Id: {{ params.engineer_id }}) "
+        "assigned to Request Id: {{ params.service_request_id }} "
+        "- LogIQ Support Team",
+    )
+    registry.register(
+        "onsite_service_request_resolution_started",
+        "sms",
+        body="Engineer {{ params.engineer_name }} (Id: {{ params.engineer_id }}) "
+        "has started working on resolving Request Id "
+        "{{ params.service_request_id }} - LogIQ Support Team",
+    )
+    registry.register(
+        "onsite_service_request_resolved",
+        "sms",
+        body="Request Id {{ params.service_request_id }} successfully resolved by "
+        "Engineer {{ params.engineer_name }} - LogIQ Support Team",
+    )
+    registry.register(
+        "service_outage_notice",
+        "sms",
+        body="Onsite service in {{ params.region }} is disrupted "
+        "{{ params.outage_window }}. Requests will be scheduled once service "
+        "resumes - LogIQ Support Team",
+    )
+    registry.register(
+        "warranty_expiry_reminder",
+        "sms",
+        body="Warranty for your {{ params.appliance_name }} "
+        "({{ params.serial_number }}) ends on {{ params.warranty_expiration }}. "
+        "Raise a request in the LogIQ app before then - LogIQ Support Team",
+    )
+
+
+_template_registry = None
+_template_registry_lock = threading.Lock()
+
+
+def get_template_registry() -> TemplateRegistry:
+    global _template_registry
+
+    if _template_registry is None:
+        with _template_registry_lock:
+            if _template_registry is None:
+                registry = TemplateRegistry()
+                _register_default_templates(registry)
+
+                _template_registry = registry
+
+    return _template_registry
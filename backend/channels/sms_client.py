@@ -14,29 +14,28 @@
 
 import os
 import json
+import logging
 import streamlit as st
-from twilio.rest import Client
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.channels.notification_templates import get_template_registry
+from backend.utils.client_factory import get_client
+
+logger = logging.getLogger(__name__)
+
+TWILIO_BULK_SMS_CONCURRENCY: int = int(os.getenv("TWILIO_BULK_SMS_CONCURRENCY", "8"))
 
 
 class NotificationSMS:
     def __init__(self):
-        account_sid = st.secrets["TWILIO_ACCOUNT_SID"]
-        auth_token = st.secrets["TWILIO_AUTH_TOKEN"]
-
-        self.client = Client(account_sid, auth_token)
+        self.client = get_client("twilio")
 
         self.sender_phone_number = st.secrets["TWILIO_PHONE_NUMBER"]
         self.messaging_service_sid = st.secrets["TWILIO_MESSAGING_SERVICE_SID"]
 
-    def send_onsite_service_request_confirmation_sms(
-        self, receivers_phone_number, service_request_id
-    ):
-        sms_body = f"""
-        Request Id: {service_request_id} confirmed!
-        We'll assign an engineer soon and update you with their details
-         - LogIQ Support Team
-        """
+        self.templates = get_template_registry()
 
+    def _create_message(self, receivers_phone_number, sms_body):
         receivers_phone_number = receivers_phone_number.replace("+91", "")
 
         try:
@@ -51,6 +50,65 @@ class NotificationSMS:
         except Exception as error:
             return False
 
+    def _send(self, event, receivers_phone_number, params):
+        _, sms_body = self.templates.render(event, "sms", params)
+
+        return self._create_message(receivers_phone_number, sms_body)
+
+    def send_bulk(self, event, recipients, variant="default", rate_limiter=None):
+        # recipients: [{"phone_number", "params"}]. Twilio has no batch
+        # endpoint, so messages are created concurrently, each one drawing on
+        # rate_limiter so bulk and transactional SMS share one budget.
+        # Returns the recipients that failed.
+        template = self.templates.get(event, "sms", variant)
+
+        # Every body is rendered before anything is sent, so bad params fail
+        # only their own recipient and never abort a half-sent chunk.
+        sms_bodies = []
+        failed_recipients = []
+        for recipient in recipients:
+            try:
+                sms_bodies.append(
+                    (recipient, template["body"].render(recipient["params"]))
+                )
+
+            except Exception as error:
+                logger.error(
+                    "Could not render bulk %s SMS for %s: %s",
+                    event,
+                    recipient["phone_number"],
+                    error,
+                )
+                failed_recipients.append(recipient)
+
+        def _send_one(recipient_and_body):
+            recipient, sms_body = recipient_and_body
+
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+
+            return self._create_message(recipient["phone_number"], sms_body)
+
+        with ThreadPoolExecutor(max_workers=TWILIO_BULK_SMS_CONCURRENCY) as executor:
+            results = list(executor.map(_send_one, sms_bodies))
+
+        failed_recipients.extend(
+            recipient
+            for (recipient, _), sent in zip(sms_bodies, results)
+            if not sent
+        )
+
+        return failed_recipients
+
+    def send_onsite_service_request_confirmation_sms(
+        self, receivers_phone_number, service_request_id
+    ):
+        return self._send(
+            "onsite_service_request_confirmation",
+            receivers_phone_number,
+            {"service_request_id": service_request_id},
+        )
+
     def send_onsite_service_request_engineer_assigned_sms(
         self, 
         receivers_phone_number, 
@@ -58,24 +116,15 @@ class NotificationSMS:
         engineer_id, 
         engineer_name,
     ):
-        sms_body = f"""
-        Engineer {engineer_name} (Id: {engineer_id}) assigned to
-        Request Id: {service_request_id} - LogIQ Support Team
-        """
-
-        receivers_phone_number = receivers_phone_number.replace("+91", "")
-
-        try:
-            message = self.client.messages.create(
-                body=sms_body,
-                to=f"+91{receivers_phone_number}",
-                messaging_service_sid=self.messaging_service_sid,
-            )
-
-            return True
-
-        except Exception as error:
-            return False
+        return self._send(
+            "onsite_service_request_engineer_assigned",
+            receivers_phone_number,
+            {
+                "service_request_id": service_request_id,
+                "engineer_id": engineer_id,
+                "engineer_name": engineer_name,
+            },
+        )
 
     def send_onsite_service_request_resolution_started_sms(
         self,
@@ -84,24 +133,15 @@ class NotificationSMS:
         engineer_id,
         engineer_name,
     ):
-        sms_body = f"""
-        Engineer {engineer_name} (Id: {engineer_id}) has started working
-        on resolving Request Id {service_request_id} - LogIQ Support Team
-        """
-
-        receivers_phone_number = receivers_phone_number.replace("+91", "")
-
-        try:
-            message = self.client.messages.create(
-                body=sms_body,
-                to=f"+91{receivers_phone_number}",
-                messaging_service_sid=self.messaging_service_sid,
-            )
-
-            return True
-
-        except Exception as error:
-            return False
+        return self._send(
+            "onsite_service_request_resolution_started",
+            receivers_phone_number,
+            {
+                "service_request_id": service_request_id,
+                "engineer_id": engineer_id,
+                "engineer_name": engineer_name,
+            },
+        )
 
     def send_onsite_service_request_resolved_sms(
         self,
@@ -109,21 +149,11 @@ class NotificationSMS:
         service_request_id,
         engineer_name,
     ):
-        sms_body = f"""
-        Request Id {service_request_id} successfully resolved by
-        Engineer {engineer_name} - LogIQ Support Team
-        """
-
-        receivers_phone_number = receivers_phone_number.replace("+91", "")
-
-        try:
-            message = self.client.messages.create(
-                body=sms_body,
-                to=f"+91{receivers_phone_number}",
-                messaging_service_sid=self.messaging_service_sid,
-            )
-
-            return True
-
-        except Exception as error:
-            return False
+        return self._send(
+            "onsite_service_request_resolved",
+            receivers_phone_number,
+            {
+                "service_request_id": service_request_id,
+                "engineer_name": engineer_name,
+            },
+        )
@@ -0,0 +1,110 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import threading
+
+import requests
+import streamlit as st
+
+from backend.utils.outbox import OutboxWorker, get_outbox
+from database.firebase.firestore import OnsiteServiceRequestCollection
+
+logger = logging.getLogger(__name__)
+
+ENGINEER_ASSIGNMENT_TOPIC: str = "onsite_engineer_assignment"
+ENGINEER_ASSIGNMENT_MAX_ATTEMPTS: int = 3
+ENGINEER_ASSIGNMENT_TIMEOUT_SECONDS: int = 120
+
+
+class EngineerAssignmentDispatcher:
+    def __init__(self, outbox=None):
+        self.outbox = outbox or get_outbox()
+
+        self.worker = OutboxWorker(
+            self.outbox,
+            ENGINEER_ASSIGNMENT_TOPIC,
+            handler=self._assign_engineer,
+            on_exhausted=self._assign_to_admin,
+            max_attempts=ENGINEER_ASSIGNMENT_MAX_ATTEMPTS,
+            base_backoff_seconds=10.0,
+        )
+
+    def _assign_engineer(self, payload):
+        response = requests.post(
+            str(st.secrets["URL_CLOUD_RUN_ONSITE_ENGINEER_ASSIGNMENT_SERVICE"]),
+            json=payload,
+            timeout=ENGINEER_ASSIGNMENT_TIMEOUT_SECONDS,
+        )
+
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"Assignment service returned {response.status_code}: "
+                f"{response.text[:200]}"
+            )
+
+        return response.text
+
+    def _assign_to_admin(self, payload, error):
+        onsite_service_request_collection = OnsiteServiceRequestCollection()
+
+        if not onsite_service_request_collection.update_engineer_for_service_request(
+            str(payload["customer_id"]),
+            str(payload["request_id"]),
+            "ADMIN",
+        ):
+            raise RuntimeError("Unable to assign the service request to ADMIN")
+
+    def dispatch(self, customer_id, request_id):
+        payload = {"customer_id": str(customer_id), "request_id": str(request_id)}
+
+        try:
+            message_id = self.outbox.enqueue(
+                ENGINEER_ASSIGNMENT_TOPIC,
+                payload,
+                dedupe_key=f"{customer_id}:{request_id}",
+            )
+
+        except Exception as error:
+            # Without an outbox row nothing would ever assign the request, so
+            # it goes to ADMIN now, as it would after exhausted retries.
+            logger.error(
+                "Could not queue engineer assignment for %s: %s", request_id, error
+            )
+            self._assign_to_admin(payload, error)
+
+            return None
+
+        self.worker.start()
+        self.worker.wake()
+
+        return message_id
+
+    def start(self):
+        return self.worker.start()
+
+
+_engineer_assignment_dispatcher = None
+_engineer_assignment_dispatcher_lock = threading.Lock()
+
+
+def get_engineer_assignment_dispatcher() -> EngineerAssignmentDispatcher:
+    global _engineer_assignment_dispatcher
+
+    if _engineer_assignment_dispatcher is None:
+        with _engineer_assignment_dispatcher_lock:
+            if _engineer_assignment_dispatcher is None:
+                _engineer_assignment_dispatcher = EngineerAssignmentDispatcher()
+
+    return _engineer_assignment_dispatcher
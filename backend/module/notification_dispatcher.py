@@ -0,0 +1,333 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import logging
+import threading
+from functools import partial
+
+from backend.utils.outbox import (
+    OUTBOX_LEASE_SECONDS,
+    OutboxWorker,
+    RateLimiter,
+    get_outbox,
+)
+from backend.channels.email_client import (
+    BREVO_MAX_MESSAGE_VERSIONS,
+    TransactionalEmails,
+)
+from backend.channels.sms_client import NotificationSMS
+from backend.channels.notification_templates import get_template_registry
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_EMAIL_TOPIC: str = "notification_email"
+NOTIFICATION_SMS_TOPIC: str = "notification_sms"
+NOTIFICATION_BULK_EMAIL_TOPIC: str = "notification_bulk_email"
+NOTIFICATION_BULK_SMS_TOPIC: str = "notification_bulk_sms"
+NOTIFICATION_MAX_ATTEMPTS: int = 6
+
+# Limits are per process; Brevo's transactional API allows far more than
+# this app sends, while a Twilio long code is held to about one SMS a second.
+NOTIFICATION_EMAIL_RATE_PER_SECOND: float = float(
+    os.getenv("NOTIFICATION_EMAIL_RATE_PER_SECOND", "5")
+)
+NOTIFICATION_SMS_RATE_PER_SECOND: float = float(
+    os.getenv("NOTIFICATION_SMS_RATE_PER_SECOND", "1")
+)
+NOTIFICATION_EMAIL_WORKERS: int = int(os.getenv("NOTIFICATION_EMAIL_WORKERS", "2"))
+NOTIFICATION_SMS_WORKERS: int = int(os.getenv("NOTIFICATION_SMS_WORKERS", "1"))
+
+# Bulk sends are queued in chunks on their own topics, so an outage notice
+# to every customer does not hold up the transactional messages.
+NOTIFICATION_BULK_EMAIL_CHUNK_SIZE: int = BREVO_MAX_MESSAGE_VERSIONS
+NOTIFICATION_BULK_SMS_CHUNK_SIZE: int = int(
+    os.getenv("NOTIFICATION_BULK_SMS_CHUNK_SIZE", "100")
+)
+NOTIFICATION_BULK_SMS_RETRY_SECONDS: float = 60.0
+
+# A bulk SMS chunk is paced message by message on the channel's limiter,
+# which the transactional workers draw on too. The lease covers the chunk
+# at half that rate, so the other app process sharing the outbox never
+# claims and texts a chunk that is still being sent.
+NOTIFICATION_BULK_SMS_LEASE_SECONDS: float = max(
+    OUTBOX_LEASE_SECONDS,
+    2 * NOTIFICATION_BULK_SMS_CHUNK_SIZE / NOTIFICATION_SMS_RATE_PER_SECOND + 60,
+)
+
+# Event type -> (TransactionalEmails method, NotificationSMS method). The
+# enqueued keyword arguments are passed to the method unchanged.
+NOTIFICATION_EVENTS = {
+    "onsite_service_request_confirmation": (
+        "send_onsite_service_request_confirmation_mail",
+        "send_onsite_service_request_confirmation_sms",
+    ),
+    "onsite_service_request_engineer_assigned": (
+        "send_onsite_service_request_engineer_assigned_mail",
+        "send_onsite_service_request_engineer_assigned_sms",
+    ),
+    "onsite_service_request_resolution_started": (
+        "send_onsite_service_request_resolution_started_mail",
+        "send_onsite_service_request_resolution_started_sms",
+    ),
+    "onsite_service_request_resolved": (
+        "send_onsite_service_request_resolved_mail",
+        "send_onsite_service_request_resolved_sms",
+    ),
+}
+
+
+class NotificationDispatcher:
+    def __init__(self, outbox=None):
+        self.outbox = outbox or get_outbox()
+
+        self._channels = {
+            "email": {
+                "topic": NOTIFICATION_EMAIL_TOPIC,
+                "client_factory": TransactionalEmails,
+                "method_index": 0,
+                "bulk_topic": NOTIFICATION_BULK_EMAIL_TOPIC,
+                "bulk_chunk_size": NOTIFICATION_BULK_EMAIL_CHUNK_SIZE,
+                "bulk_lease_seconds": OUTBOX_LEASE_SECONDS,
+                "rate_limiter": RateLimiter(NOTIFICATION_EMAIL_RATE_PER_SECOND),
+                "worker_count": NOTIFICATION_EMAIL_WORKERS,
+            },
+            "sms": {
+                "topic": NOTIFICATION_SMS_TOPIC,
+                "client_factory": NotificationSMS,
+                "method_index": 1,
+                "bulk_topic": NOTIFICATION_BULK_SMS_TOPIC,
+                "bulk_chunk_size": NOTIFICATION_BULK_SMS_CHUNK_SIZE,
+                "bulk_lease_seconds": NOTIFICATION_BULK_SMS_LEASE_SECONDS,
+                "rate_limiter": RateLimiter(NOTIFICATION_SMS_RATE_PER_SECOND),
+                "worker_count": NOTIFICATION_SMS_WORKERS,
+            },
+        }
+
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+
+        self.workers = {
+            channel: [
+                OutboxWorker(
+                    self.outbox,
+                    config["topic"],
+                    handler=partial(self._deliver, channel),
+                    on_exhausted=partial(self._give_up, channel),
+                    max_attempts=NOTIFICATION_MAX_ATTEMPTS,
+                    base_backoff_seconds=15.0,
+                    rate_limiter=config["rate_limiter"],
+                )
+                for _ in range(max(1, config["worker_count"]))
+            ]
+            for channel, config in self._channels.items()
+        }
+
+        # One worker per bulk topic. The clients pace a chunk message by
+        # message on the channel's rate limiter, the same one the
+        # transactional workers use, so a bulk send cannot push the channel
+        # past its provider limit.
+        self.bulk_workers = {
+            channel: OutboxWorker(
+                self.outbox,
+                config["bulk_topic"],
+                handler=partial(self._deliver_bulk, channel),
+                on_exhausted=partial(self._give_up, channel),
+                max_attempts=NOTIFICATION_MAX_ATTEMPTS,
+                base_backoff_seconds=15.0,
+                lease_seconds=config["bulk_lease_seconds"],
+            )
+            for channel, config in self._channels.items()
+        }
+
+    def _client(self, channel):
+        # One Brevo / Twilio client per process, built on first delivery.
+        client = self._clients.get(channel)
+
+        if client is None:
+            with self._clients_lock:
+                client = self._clients.get(channel)
+
+                if client is None:
+                    client = self._channels[channel]["client_factory"]()
+                    self._clients[channel] = client
+
+        return client
+
+    def _deliver(self, channel, payload):
+        event = payload["event"]
+        method_index = self._channels[channel]["method_index"]
+        method_name = NOTIFICATION_EVENTS[event][method_index]
+
+        # The channel methods swallow provider errors and return False;
+        # raising here turns that into a retry with backoff.
+        if not getattr(self._client(channel), method_name)(**payload["kwargs"]):
+            raise RuntimeError(f"{channel} provider did not accept {event}")
+
+    def _deliver_bulk(self, channel, payload):
+        event = payload["event"]
+        failed_recipients = self._client(channel).send_bulk(
+            event,
+            payload["recipients"],
+            payload["variant"],
+            rate_limiter=self._channels[channel]["rate_limiter"],
+        )
+
+        if not failed_recipients:
+            return
+
+        # A Brevo chunk is one API call and fails as a whole, so it is simply
+        # retried. SMS fail one by one; only those are queued again, so the
+        # rest of the chunk is not texted twice.
+        if channel == "email":
+            raise RuntimeError(f"email provider did not accept bulk {event}")
+
+        attempt = payload["attempt"] + 1
+
+        if attempt >= NOTIFICATION_MAX_ATTEMPTS:
+            self._give_up(
+                channel,
+                payload,
+                f"{len(failed_recipients)} of {len(payload['recipients'])} "
+                "recipients failed",
+            )
+            return
+
+        self.outbox.enqueue(
+            self._channels[channel]["bulk_topic"],
+            {**payload, "recipients": failed_recipients, "attempt": attempt},
+            dedupe_key=(
+                f"{payload['dedupe_key']}:retry{attempt}"
+                if payload["dedupe_key"]
+                else None
+            ),
+            delay_seconds=NOTIFICATION_BULK_SMS_RETRY_SECONDS * attempt,
+        )
+
+    def _give_up(self, channel, payload, error):
+        logger.error(
+            "Dropping %s notification %s after %s attempts: %s",
+            channel,
+            payload["event"],
+            NOTIFICATION_MAX_ATTEMPTS,
+            error,
+        )
+
+    def _enqueue(self, channel, event, idempotency_key, kwargs):
+        if event not in NOTIFICATION_EVENTS:
+            raise ValueError(f"Unknown notification event {event!r}")
+
+        # The same event for the same key is only ever queued once, so a
+        # rerun of the Streamlit script does not notify the customer twice.
+        message_id = self.outbox.enqueue(
+            self._channels[channel]["topic"],
+            {"event": event, "kwargs": kwargs},
+            dedupe_key=f"{event}:{idempotency_key}" if idempotency_key else None,
+        )
+
+        for worker in self.workers[channel]:
+            worker.start()
+            worker.wake()
+
+        return message_id
+
+    def send_email(self, event, idempotency_key=None, **kwargs):
+        return self._enqueue("email", event, idempotency_key, kwargs)
+
+    def send_sms(self, event, idempotency_key=None, **kwargs):
+        return self._enqueue("sms", event, idempotency_key, kwargs)
+
+    def _enqueue_bulk(self, channel, event, recipients, variant, idempotency_key):
+        config = self._channels[channel]
+
+        # Raises now, rather than in a worker, for an unknown event.
+        get_template_registry().get(event, channel, variant)
+
+        message_ids = []
+        for start in range(0, len(recipients), config["bulk_chunk_size"]):
+            dedupe_key = (
+                f"{event}:{idempotency_key}:{start}" if idempotency_key else None
+            )
+
+            message_ids.append(
+                self.outbox.enqueue(
+                    config["bulk_topic"],
+                    {
+                        "event": event,
+                        "variant": variant,
+                        "recipients": recipients[
+                            start : start + config["bulk_chunk_size"]
+                        ],
+                        "attempt": 0,
+                        "dedupe_key": dedupe_key,
+                    },
+                    dedupe_key=dedupe_key,
+                )
+            )
+
+        self.bulk_workers[channel].start()
+        self.bulk_workers[channel].wake()
+
+        return message_ids
+
+    def send_bulk_email(
+        self, event, recipients, variant="default", idempotency_key=None
+    ):
+        # recipients: [{"email", "name", "params"}]
+        return self._enqueue_bulk(
+            "email", event, recipients, variant, idempotency_key
+        )
+
+    def send_bulk_sms(self, event, recipients, variant="default", idempotency_key=None):
+        # recipients: [{"phone_number", "params"}]
+        return self._enqueue_bulk("sms", event, recipients, variant, idempotency_key)
+
+    def start(self):
+        started = False
+
+        for workers in self.workers.values():
+            for worker in workers:
+                started = worker.start() or started
+
+        for worker in self.bulk_workers.values():
+            started = worker.start() or started
+
+        return started
+
+    def stats(self):
+        return {
+            **{
+                channel: self.outbox.stats(config["topic"])
+                for channel, config in self._channels.items()
+            },
+            **{
+                f"bulk_{channel}": self.outbox.stats(config["bulk_topic"])
+                for channel, config in self._channels.items()
+            },
+        }
+
+
+_notification_dispatcher = None
+_notification_dispatcher_lock = threading.Lock()
+
+
+def get_notification_dispatcher() -> NotificationDispatcher:
+    global _notification_dispatcher
+
+    if _notification_dispatcher is None:
+        with _notification_dispatcher_lock:
+            if _notification_dispatcher is None:
+                _notification_dispatcher = NotificationDispatcher()
+
+    return _notification_dispatcher
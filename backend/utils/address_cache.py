@@ -0,0 +1,434 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import re
+import csv
+import json
+import time
+import logging
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+ADDRESS_CACHE_DB_PATH: str = os.getenv(
+    "ADDRESS_CACHE_DB_PATH", ".address_cache/address_cache.db"
+)
+ADDRESS_CACHE_TTL_SECONDS: int = int(
+    os.getenv("ADDRESS_CACHE_TTL_SECONDS", str(30 * 24 * 60 * 60))
+)
+ADDRESS_CACHE_MEMORY_ENTRIES: int = 2048
+
+# India Post "All India Pincode Directory" CSV (data.gov.in). It is imported
+# into the cache database once, and again whenever the file changes.
+PINCODE_DIRECTORY_PATH: str = os.getenv(
+    "PINCODE_DIRECTORY_PATH", "database/pincodes/pincode_directory.csv"
+)
+# "auto" asks the public pincode API only while no directory is loaded, so
+# a deployment with the table never leaves the process for a pincode;
+# "true" also asks it for pincodes missing from the table, "false" never.
+# database/pincodes/build_pincode_directory.py builds the table.
+PINCODE_ONLINE_FALLBACK: str = os.getenv("PINCODE_ONLINE_FALLBACK", "auto").lower()
+PINCODE_API_TIMEOUT_SECONDS: float = 5.0
+
+_PINCODE_COLUMNS = {
+    "pincode": ("pincode",),
+    "office_name": ("officename", "office_name"),
+    "district": ("district", "districtname"),
+    "state": ("statename", "state"),
+}
+
+
+def normalize_address_key(*parts) -> str:
+    # "12, M.G. Road " and "12 mg road" are the same lookup; the Address
+    # Validation API does not care about case, punctuation or spacing.
+    normalized_parts = []
+
+    for part in parts:
+        text = unicodedata.normalize("NFKC", str(part or "")).casefold()
+        text = re.sub(r"[.']", "", text)
+        text = re.sub(r"[^\w]+", " ", text)
+        normalized_parts.append(" ".join(text.split()))
+
+    return "|".join(normalized_parts)
+
+
+def normalize_pincode(pincode) -> str:
+    digits = re.sub(r"\D", "", str(pincode or ""))
+    return digits if len(digits) == 6 else ""
+
+
+def read_pincode_directory(csv_path):
+    # (pincode, office_name, district, state) rows from an India Post
+    # directory CSV, whichever of its known column spellings it uses.
+    rows = []
+
+    with open(csv_path, newline="", encoding="utf-8-sig") as csv_file:
+        reader = csv.DictReader(csv_file)
+        header = {name.strip().lower(): name for name in reader.fieldnames or []}
+
+        columns = {}
+        for column, aliases in _PINCODE_COLUMNS.items():
+            columns[column] = next(
+                (header[alias] for alias in aliases if alias in header), None
+            )
+
+        if not columns["pincode"] or not columns["district"]:
+            raise ValueError(f"{csv_path} is not a pincode directory CSV")
+
+        for record in reader:
+            pincode = normalize_pincode(record.get(columns["pincode"]))
+
+            if not pincode:
+                continue
+
+            rows.append(
+                (
+                    pincode,
+                    *(
+                        (record.get(columns[column]) or "").strip().title() or None
+                        if columns[column]
+                        else None
+                        for column in ("office_name", "district", "state")
+                    ),
+                )
+            )
+
+    return rows
+
+
+class AddressCache:
+    def __init__(
+        self,
+        db_path=ADDRESS_CACHE_DB_PATH,
+        ttl_seconds=ADDRESS_CACHE_TTL_SECONDS,
+        memory_entries=ADDRESS_CACHE_MEMORY_ENTRIES,
+        pincode_directory_path=PINCODE_DIRECTORY_PATH,
+    ):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self.pincode_directory_path = pincode_directory_path
+
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._pincode_directory_checked = False
+        self._pincode_directory_rows = None
+
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = sqlite3.connect(
+            db_path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS address_cache (
+                namespace TEXT NOT NULL,
+                cache_key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (namespace, cache_key)
+            );
+
+            CREATE TABLE IF NOT EXISTS pincodes (
+                pincode TEXT NOT NULL,
+                office_name TEXT,
+                district TEXT,
+                state TEXT
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_pincodes_pincode ON pincodes (pincode);
+
+            CREATE TABLE IF NOT EXISTS address_cache_meta (
+                name TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            """
+        )
+
+    def _remember(self, memory_key, expires_at, value_json):
+        self._memory[memory_key] = (expires_at, value_json)
+        self._memory.move_to_end(memory_key)
+
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, namespace, key_parts):
+        cache_key = normalize_address_key(*key_parts)
+        memory_key = (namespace, cache_key)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(memory_key)
+
+            if entry is None:
+                row = self._conn.execute(
+                    "SELECT expires_at, value FROM address_cache "
+                    "WHERE namespace = ? AND cache_key = ?",
+                    (namespace, cache_key),
+                ).fetchone()
+
+                if row:
+                    entry = (row[0], row[1])
+                    self._remember(memory_key, *entry)
+
+            if entry is None or entry[0] <= now:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._memory.move_to_end(memory_key)
+
+        # Values are kept as JSON so every caller gets its own copy.
+        return json.loads(entry[1])
+
+    def set(self, namespace, key_parts, value, ttl_seconds=None):
+        cache_key = normalize_address_key(*key_parts)
+        now = time.time()
+        expires_at = now + (ttl_seconds or self.ttl_seconds)
+        value_json = json.dumps(value, default=str)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO address_cache "
+                "(namespace, cache_key, value, expires_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (namespace, cache_key, value_json, expires_at, now),
+            )
+            self._remember((namespace, cache_key), expires_at, value_json)
+
+    def get_or_compute(self, namespace, key_parts, compute, ttl_seconds=None, cache_if=None):
+        value = self.get(namespace, key_parts)
+
+        if value is not None:
+            return value
+
+        value = compute()
+
+        # Failed or empty lookups are returned but not cached, so a transient
+        # API error is not remembered for a month.
+        if value is not None and (cache_if is None or cache_if(value)):
+            self.set(namespace, key_parts, value, ttl_seconds)
+
+        return value
+
+    def purge_expired(self):
+        now = time.time()
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM address_cache WHERE expires_at <= ?", (now,)
+            )
+
+            for memory_key in [
+                memory_key
+                for memory_key, (expires_at, _) in self._memory.items()
+                if expires_at <= now
+            ]:
+                del self._memory[memory_key]
+
+            return cursor.rowcount
+
+    def import_pincode_directory(self, csv_path):
+        rows = read_pincode_directory(csv_path)
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+
+            try:
+                self._conn.execute("DELETE FROM pincodes")
+                self._conn.executemany(
+                    "INSERT INTO pincodes (pincode, office_name, district, state) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO address_cache_meta (name, value) "
+                    "VALUES ('pincode_directory', ?)",
+                    (
+                        json.dumps(
+                            {
+                                "path": os.path.abspath(csv_path),
+                                "mtime": os.path.getmtime(csv_path),
+                            }
+                        ),
+                    ),
+                )
+                self._conn.execute("COMMIT")
+
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        self._pincode_directory_rows = len(rows)
+        return len(rows)
+
+    def _ensure_pincode_directory(self):
+        if self._pincode_directory_checked:
+            return
+
+        self._pincode_directory_checked = True
+
+        if not self.pincode_directory_path or not os.path.exists(
+            self.pincode_directory_path
+        ):
+            return
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM address_cache_meta WHERE name = 'pincode_directory'"
+            ).fetchone()
+
+        imported = json.loads(row[0]) if row else {}
+
+        if imported.get("mtime") == os.path.getmtime(self.pincode_directory_path):
+            return
+
+        try:
+            imported_rows = self.import_pincode_directory(self.pincode_directory_path)
+            logger.info("Imported %s pincode directory rows", imported_rows)
+
+        except Exception as error:
+            logger.warning("Pincode directory import failed: %s", error)
+
+    def _lookup_pincode_offline(self, pincode):
+        self._ensure_pincode_directory()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT district, state FROM pincodes WHERE pincode = ? "
+                "ORDER BY rowid LIMIT 1",
+                (pincode,),
+            ).fetchone()
+
+        if not row:
+            return None
+
+        return {"District": row[0], "State": row[1], "Country": "India"}
+
+    def _online_fallback_enabled(self):
+        if PINCODE_ONLINE_FALLBACK != "auto":
+            return PINCODE_ONLINE_FALLBACK == "true"
+
+        self._ensure_pincode_directory()
+
+        if self._pincode_directory_rows is None:
+            with self._lock:
+                self._pincode_directory_rows = self._conn.execute(
+                    "SELECT COUNT(*) FROM pincodes"
+                ).fetchone()[0]
+
+        return self._pincode_directory_rows == 0
+
+    def _lookup_pincode_online(self, pincode):
+        response = requests.get(
+            f"https://api.postalpincode.in/pincode/{pincode}",
+            timeout=PINCODE_API_TIMEOUT_SECONDS,
+        )
+        post_offices = response.json()[0].get("PostOffice")
+
+        if not post_offices or not isinstance(post_offices, list):
+            return None
+
+        return {
+            "District": post_offices[0].get("District"),
+            "State": post_offices[0].get("State"),
+            "Country": post_offices[0].get("Country"),
+        }
+
+    def lookup_pincode(self, pincode):
+        pincode = normalize_pincode(pincode)
+
+        if not pincode:
+            return None
+
+        post_office = self._lookup_pincode_offline(pincode)
+
+        if post_office or not self._online_fallback_enabled():
+            return post_office
+
+        try:
+            return self.get_or_compute(
+                "pincode", (pincode,), lambda: self._lookup_pincode_online(pincode)
+            )
+
+        except Exception as error:
+            logger.warning("Online pincode lookup for %s failed: %s", pincode, error)
+            return None
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute(
+                "SELECT namespace, COUNT(*) FROM address_cache GROUP BY namespace"
+            ).fetchall()
+            pincode_rows = self._conn.execute(
+                "SELECT COUNT(*) FROM pincodes"
+            ).fetchone()[0]
+
+        lookups = self.hits + self.misses
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": dict(entries),
+            "pincode_rows": pincode_rows,
+        }
+
+
+_address_cache = None
+_address_cache_lock = threading.Lock()
+
+
+def get_address_cache() -> AddressCache:
+    global _address_cache
+
+    if _address_cache is None:
+        with _address_cache_lock:
+            if _address_cache is None:
+                _address_cache = AddressCache()
+
+    return _address_cache
+
+
+def cached_address_validation(gmaps_factory, address_lines, **validation_kwargs):
+    # gmaps_factory is only called on a miss, so a cache hit does not build
+    # a Maps client at all.
+    key_parts = (
+        json.dumps(address_lines, default=str),
+        *(f"{name}={value}" for name, value in sorted(validation_kwargs.items())),
+    )
+
+    return get_address_cache().get_or_compute(
+        "address_validation",
+        key_parts,
+        lambda: gmaps_factory().addressvalidation(address_lines, **validation_kwargs),
+        cache_if=lambda response: bool(response.get("result")),
+    )
+
+
+def lookup_pincode(pincode):
+    return get_address_cache().lookup_pincode(pincode)
@@ -0,0 +1,157 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import time
+import logging
+import threading
+
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+
+def _build_firebase_app():
+    import firebase_admin
+    from firebase_admin import credentials
+
+    # The default app may already exist if another module set it up first.
+    try:
+        return firebase_admin.get_app()
+
+    except ValueError:
+        return firebase_admin.initialize_app(
+            credentials.Certificate(
+                json.loads(st.secrets["FIREBASE_SERVICE_ACCOUNT_KEY"])
+            )
+        )
+
+
+def _build_firestore():
+    from firebase_admin import firestore
+
+    return firestore.client(get_client("firebase_app"))
+
+
+def _build_storage():
+    from database.cloud_storage.storage_backend import get_storage_backend
+
+    return get_storage_backend()
+
+
+def _build_google_maps():
+    import googlemaps
+
+    return googlemaps.Client(key=st.secrets["GOOGLE_MAPS_DISTANCE_MATRIX_API_KEY"])
+
+
+def _build_twilio():
+    from twilio.rest import Client
+
+    return Client(st.secrets["TWILIO_ACCOUNT_SID"], st.secrets["TWILIO_AUTH_TOKEN"])
+
+
+def _build_brevo():
+    import sib_api_v3_sdk
+
+    configuration = sib_api_v3_sdk.Configuration()
+    configuration.api_key["api-key"] = st.secrets["BREVO_API_KEY"]
+
+    return sib_api_v3_sdk.TransactionalEmailsApi(
+        sib_api_v3_sdk.ApiClient(configuration)
+    )
+
+
+# Client name -> builder. The SDKs are imported inside the builders, so a
+# page only pays for the ones it actually uses.
+CLIENT_BUILDERS = {
+    "firebase_app": _build_firebase_app,
+    "firestore": _build_firestore,
+    "storage": _build_storage,
+    "google_maps": _build_google_maps,
+    "twilio": _build_twilio,
+    "brevo": _build_brevo,
+}
+
+
+class ClientFactory:
+    def __init__(self, builders=None):
+        self._builders = dict(builders or CLIENT_BUILDERS)
+
+        self._clients = {}
+        self._init_ms = {}
+        self._locks = {name: threading.Lock() for name in self._builders}
+
+    def get(self, name):
+        # Each client, with its credentials and HTTP connection pool, is
+        # built once per process. Locks are per client, so a slow Firestore
+        # start does not hold up a Twilio send.
+        client = self._clients.get(name)
+
+        if client is None:
+            if name not in self._builders:
+                raise KeyError(f"No client builder registered for {name!r}")
+
+            with self._locks[name]:
+                client = self._clients.get(name)
+
+                if client is None:
+                    started_at = time.perf_counter()
+                    client = self._builders[name]()
+
+                    self._init_ms[name] = round(
+                        (time.perf_counter() - started_at) * 1000, 2
+                    )
+                    self._clients[name] = client
+
+                    logger.info(
+                        "Initialized %s client in %s ms", name, self._init_ms[name]
+                    )
+
+        return client
+
+    def reset(self, name=None):
+        # Drops cached clients, e.g. after rotating a secret.
+        for client_name in [name] if name else list(self._builders):
+            with self._locks[client_name]:
+                self._clients.pop(client_name, None)
+                self._init_ms.pop(client_name, None)
+
+    def stats(self):
+        return {
+            name: {
+                "initialized": name in self._clients,
+                "init_ms": self._init_ms.get(name),
+            }
+            for name in self._builders
+        }
+
+
+_client_factory = None
+_client_factory_lock = threading.Lock()
+
+
+def get_client_factory() -> ClientFactory:
+    global _client_factory
+
+    if _client_factory is None:
+        with _client_factory_lock:
+            if _client_factory is None:
+                _client_factory = ClientFactory()
+
+    return _client_factory
+
+
+def get_client(name):
+    return get_client_factory().get(name)
@@ -15,19 +15,20 @@
 import os
 import json
 
-import folium
-import polyline
-import googlemaps
-
 import requests
 import streamlit as st
 
+from backend.utils.client_factory import get_client
+from backend.utils.address_cache import (
+    cached_address_validation,
+    get_address_cache,
+    lookup_pincode,
+)
+
 
 class LocationServices:
     def __init__(self):
-        self.gmaps = googlemaps.Client(
-            key=st.secrets["GOOGLE_MAPS_DISTANCE_MATRIX_API_KEY"]
-        )
+        self.gmaps = get_client("google_maps")
 
     def _get_route_data(self, origin, destination):
         url = f"https://maps.googleapis.com/maps/api/directions/json?origin={
@@ -39,6 +40,10 @@ class LocationServices:
         return response.json()
 
     def display_route_with_folium(self, origin, destination):
+        # Only the engineer's directions dialog draws maps.
+        import folium
+        import polyline
+
         route_data = self._get_route_data(origin, destination)
         route_coordinates = []
 
@@ -68,6 +73,25 @@ class LocationServices:
         return folium_map
 
     def get_city_and_state_from_zipcode(self, zipcode):
+        # The pincode directory answers most lookups without a network call;
+        # OpenCage is only asked about pincodes it does not know, and its
+        # answers are cached like the rest.
+        post_office = lookup_pincode(zipcode)
+
+        if post_office and post_office.get("District"):
+            return post_office["District"], post_office.get("State")
+
+        city, state = get_address_cache().get_or_compute(
+            "opencage_zipcode",
+            (zipcode,),
+            lambda: self._fetch_city_and_state_from_opencage(zipcode)
+            or (None, None),
+            cache_if=any,
+        )
+
+        return city, state
+
+    def _fetch_city_and_state_from_opencage(self, zipcode):
         url = f"https://api.opencagedata.com/geocode/v1/json?q={zipcode}&key={
             st.secrets['OPENCAGE_GEOCODING_API_KEY']}"
 
@@ -95,7 +119,7 @@ class LocationServices:
             return None, None
 
     def validate_address(self, address):
-        result = self.gmaps.addressvalidation(address)
+        result = cached_address_validation(lambda: self.gmaps, address)
         # GRANULARITY_UNSPECIFIED, SUB_PREMISE, PREMISE, PREMISE_PROXIMITY, 
         # BLOCK, ROUTE
 
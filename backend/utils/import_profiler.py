@@ -0,0 +1,193 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Set STARTUP_IMPORT_PROFILE=true on a replica to log how long each module
+# took to import, e.g. after a dependency bump or when cold starts regress.
+STARTUP_IMPORT_PROFILE: bool = os.getenv(
+    "STARTUP_IMPORT_PROFILE", "false"
+).lower() in ("1", "true", "yes")
+IMPORT_PROFILE_PATH: str = os.getenv("IMPORT_PROFILE_PATH", "logs/import_profile.jsonl")
+IMPORT_PROFILE_TOP_N: int = int(os.getenv("IMPORT_PROFILE_TOP_N", "25"))
+
+
+class _TimedLoader:
+    def __init__(self, profiler, loader):
+        self._profiler = profiler
+        self._loader = loader
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # The real loader is put back first, so nothing that inspects
+        # __loader__ or __spec__ later sees the wrapper.
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+
+        with self._profiler.timed(module.__name__):
+            self._loader.exec_module(module)
+
+
+class ImportProfiler:
+    def __init__(self):
+        self.records = []
+        self._reported = 0
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        # Defers to the finders after this one and wraps the loader they
+        # return, which times the module body.
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+
+            spec = finder.find_spec(fullname, path, target)
+
+            if spec is None:
+                continue
+
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(self, spec.loader)
+
+            return spec
+
+        return None
+
+    @contextmanager
+    def timed(self, module_name):
+        stack = self._stack()
+        stack.append(0.0)
+        started_at = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            cumulative_ms = (time.perf_counter() - started_at) * 1000
+
+            # Time spent importing children is subtracted, so self_ms points
+            # at the module that is actually slow.
+            children_ms = stack.pop()
+            if stack:
+                stack[-1] += cumulative_ms
+
+            with self._lock:
+                self.records.append(
+                    {
+                        "module": module_name,
+                        "self_ms": round(cumulative_ms - children_ms, 3),
+                        "cumulative_ms": round(cumulative_ms, 3),
+                        "top_level": not stack,
+                    }
+                )
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+
+        return self._local.stack
+
+    def report(self, label, top_n=IMPORT_PROFILE_TOP_N):
+        # Reports the imports since the previous report, so successive calls
+        # split startup into phases (landing page, signed-in app, ...).
+        with self._lock:
+            records = self.records[self._reported :]
+            self._reported = len(self.records)
+
+        if not records:
+            return None
+
+        summary = {
+            "label": label,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "module_count": len(records),
+            "total_ms": round(
+                sum(
+                    record["cumulative_ms"]
+                    for record in records
+                    if record["top_level"]
+                ),
+                3,
+            ),
+            "slowest_modules": sorted(
+                records, key=lambda record: record["self_ms"], reverse=True
+            )[:top_n],
+        }
+
+        logger.info(
+            "Imports for %s: %s modules in %s ms; slowest: %s",
+            label,
+            summary["module_count"],
+            summary["total_ms"],
+            ", ".join(
+                f"{record['module']} ({record['self_ms']} ms)"
+                for record in summary["slowest_modules"][:5]
+            ),
+        )
+
+        try:
+            os.makedirs(os.path.dirname(IMPORT_PROFILE_PATH) or ".", exist_ok=True)
+
+            with open(IMPORT_PROFILE_PATH, "a", encoding="utf-8") as profile_file:
+                profile_file.write(json.dumps(summary) + "\n")
+
+        except OSError as error:
+            logger.warning("Could not write import profile: %s", error)
+
+        return summary
+
+
+_import_profiler = None
+_import_profiler_lock = threading.Lock()
+
+
+def install_import_profiler():
+    # A no-op unless STARTUP_IMPORT_PROFILE is set. Modules imported before
+    # this call, Streamlit itself included, are not measured.
+    global _import_profiler
+
+    if not STARTUP_IMPORT_PROFILE:
+        return None
+
+    if _import_profiler is None:
+        with _import_profiler_lock:
+            if _import_profiler is None:
+                _import_profiler = ImportProfiler()
+                sys.meta_path.insert(0, _import_profiler)
+
+    return _import_profiler
+
+
+def log_import_profile(label):
+    if _import_profiler is None:
+        return None
+
+    return _import_profiler.report(label)
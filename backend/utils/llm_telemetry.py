@@ -0,0 +1,381 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime, timezone
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+LLM_TELEMETRY_SINKS: str = os.getenv("LLM_TELEMETRY_SINKS", "jsonl")
+LLM_TELEMETRY_JSONL_PATH: str = os.getenv(
+    "LLM_TELEMETRY_JSONL_PATH", "logs/llm_telemetry.jsonl"
+)
+LLM_TELEMETRY_PROMETHEUS_PATH: str = os.getenv(
+    "LLM_TELEMETRY_PROMETHEUS_PATH", "logs/llm_telemetry.prom"
+)
+
+LATENCY_BUCKETS_SECONDS = (0.5, 1, 2, 4, 8, 16, 32, 64)
+
+# A model call that raises never reaches the after-model callback, and ADK
+# has no on-error model callback, so a call still open after this long is
+# recorded as failed.
+LLM_TELEMETRY_OPEN_CALL_TIMEOUT_SECONDS: float = 5 * 60.0
+
+
+def usage_from_metadata(usage_metadata):
+    if usage_metadata is None:
+        return {
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "output_tokens": 0,
+            "total_tokens": 0,
+        }
+
+    def _count(field_name):
+        return getattr(usage_metadata, field_name, None) or 0
+
+    return {
+        "prompt_tokens": _count("prompt_token_count"),
+        "cached_tokens": _count("cached_content_token_count"),
+        "output_tokens": _count("candidates_token_count"),
+        "total_tokens": _count("total_token_count"),
+    }
+
+
+class JsonlTelemetrySink:
+    def __init__(self, file_path=LLM_TELEMETRY_JSONL_PATH):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+
+    def write(self, record, aggregates):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+
+            with open(self.file_path, "a", encoding="utf-8") as sink_file:
+                sink_file.write(json.dumps(record, default=str) + "\n")
+
+
+class PrometheusTelemetrySink:
+    def __init__(self, file_path=LLM_TELEMETRY_PROMETHEUS_PATH):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _labels(source, component, model):
+        return (
+            f'source="{source}",component="{component}",'
+            f'model="{str(model).replace(chr(34), "")}"'
+        )
+
+    def render(self, aggregates):
+        metric_lines = {
+            "llm_calls_total": [],
+            "llm_call_errors_total": [],
+            "llm_call_duration_seconds": [],
+            "llm_time_to_first_token_seconds_total": [],
+            "llm_prompt_tokens_total": [],
+            "llm_cached_tokens_total": [],
+            "llm_output_tokens_total": [],
+        }
+
+        for (source, component, model), aggregate in sorted(aggregates.items()):
+            labels = self._labels(source, component, model)
+
+            metric_lines["llm_calls_total"].append(
+                f"llm_calls_total{{{labels}}} {aggregate['calls']}"
+            )
+            metric_lines["llm_call_errors_total"].append(
+                f"llm_call_errors_total{{{labels}}} {aggregate['errors']}"
+            )
+
+            cumulative_count = 0
+            for bucket, bucket_count in zip(
+                LATENCY_BUCKETS_SECONDS, aggregate["latency_buckets"]
+            ):
+                cumulative_count += bucket_count
+                metric_lines["llm_call_duration_seconds"].append(
+                    f'llm_call_duration_seconds_bucket{{{labels},le="{bucket}"}} '
+                    f"{cumulative_count}"
+                )
+
+            metric_lines["llm_call_duration_seconds"].extend(
+                [
+                    f'llm_call_duration_seconds_bucket{{{labels},le="+Inf"}} '
+                    f"{aggregate['calls']}",
+                    f"llm_call_duration_seconds_sum{{{labels}}} "
+                    f"{round(aggregate['wall_time_seconds'], 6)}",
+                    f"llm_call_duration_seconds_count{{{labels}}} "
+                    f"{aggregate['calls']}",
+                ]
+            )
+
+            metric_lines["llm_time_to_first_token_seconds_total"].append(
+                f"llm_time_to_first_token_seconds_total{{{labels}}} "
+                f"{round(aggregate['ttft_seconds'], 6)}"
+            )
+            metric_lines["llm_prompt_tokens_total"].append(
+                f"llm_prompt_tokens_total{{{labels}}} {aggregate['prompt_tokens']}"
+            )
+            metric_lines["llm_cached_tokens_total"].append(
+                f"llm_cached_tokens_total{{{labels}}} {aggregate['cached_tokens']}"
+            )
+            metric_lines["llm_output_tokens_total"].append(
+                f"llm_output_tokens_total{{{labels}}} {aggregate['output_tokens']}"
+            )
+
+        metric_types = {"llm_call_duration_seconds": "histogram"}
+
+        exposition = []
+        for metric_name, lines in metric_lines.items():
+            exposition.append(
+                f"# TYPE {metric_name} {metric_types.get(metric_name, 'counter')}"
+            )
+            exposition.extend(lines)
+
+        return "\n".join(exposition) + "\n"
+
+    def write(self, record, aggregates):
+        exposition = self.render(aggregates)
+
+        # Written to a temp file and swapped in so a scraping node_exporter
+        # textfile collector never reads a half-written file.
+        with self._lock:
+            os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+
+            temp_file_path = self.file_path + ".tmp"
+            with open(temp_file_path, "w", encoding="utf-8") as sink_file:
+                sink_file.write(exposition)
+
+            os.replace(temp_file_path, self.file_path)
+
+
+class LLMCall:
+    def __init__(self, source, component, model, extra=None):
+        self.source = source
+        self.component = component
+        self.model = model
+        self.extra = dict(extra or {})
+
+        self.started_at = time.perf_counter()
+        self.first_token_at = None
+        self.usage_metadata = None
+        self.error = None
+
+    def mark_first_token(self):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+
+    def set_usage(self, usage_metadata):
+        self.usage_metadata = usage_metadata
+
+    def to_record(self):
+        finished_at = time.perf_counter()
+        first_token_at = self.first_token_at or finished_at
+
+        record = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "source": self.source,
+            "component": self.component,
+            "model": self.model,
+            "wall_time_seconds": round(finished_at - self.started_at, 6),
+            "ttft_seconds": round(first_token_at - self.started_at, 6),
+            "error": self.error,
+        }
+        record.update(usage_from_metadata(self.usage_metadata))
+        record["context_cache_hit"] = record["cached_tokens"] > 0
+        record.update(self.extra)
+
+        return record
+
+
+class LLMTelemetry:
+    def __init__(self, sinks=None):
+        self.sinks = sinks if sinks is not None else []
+
+        self._aggregates = {}
+        self._open_calls = {}
+        self._lock = threading.Lock()
+
+    def _aggregate(self, record):
+        aggregate_key = (record["source"], record["component"], record["model"])
+
+        aggregate = self._aggregates.setdefault(
+            aggregate_key,
+            {
+                "calls": 0,
+                "errors": 0,
+                "wall_time_seconds": 0.0,
+                "ttft_seconds": 0.0,
+                "prompt_tokens": 0,
+                "cached_tokens": 0,
+                "output_tokens": 0,
+                "latency_buckets": [0] * len(LATENCY_BUCKETS_SECONDS),
+            },
+        )
+
+        aggregate["calls"] += 1
+        aggregate["errors"] += 1 if record.get("error") else 0
+        aggregate["wall_time_seconds"] += record["wall_time_seconds"]
+        aggregate["ttft_seconds"] += record["ttft_seconds"]
+        aggregate["prompt_tokens"] += record["prompt_tokens"]
+        aggregate["cached_tokens"] += record["cached_tokens"]
+        aggregate["output_tokens"] += record["output_tokens"]
+
+        for idx, bucket in enumerate(LATENCY_BUCKETS_SECONDS):
+            if record["wall_time_seconds"] <= bucket:
+                aggregate["latency_buckets"][idx] += 1
+                break
+
+    def _snapshot_aggregates(self):
+        # Copies the bucket lists too, so callers never touch the live ones.
+        return {
+            aggregate_key: {
+                **aggregate,
+                "latency_buckets": list(aggregate["latency_buckets"]),
+            }
+            for aggregate_key, aggregate in self._aggregates.items()
+        }
+
+    def record(self, record):
+        with self._lock:
+            self._aggregate(record)
+            aggregates = self._snapshot_aggregates()
+
+        for sink in self.sinks:
+            try:
+                sink.write(record, aggregates)
+
+            except Exception as error:
+                logger.warning("LLM telemetry sink failed: %s", error)
+
+        return record
+
+    @contextmanager
+    def track_call(self, source, component, model, **extra):
+        llm_call = LLMCall(source, component, model, extra)
+
+        try:
+            yield llm_call
+
+        except Exception as error:
+            llm_call.error = type(error).__name__
+            raise
+
+        finally:
+            self.record(llm_call.to_record())
+
+    def start_call(self, call_key, source, component, model, **extra):
+        now = time.perf_counter()
+
+        with self._lock:
+            # A call still open under the same key, or past the timeout,
+            # failed without reaching finish_call.
+            abandoned_calls = [
+                self._open_calls.pop(open_key)
+                for open_key, llm_call in list(self._open_calls.items())
+                if open_key == call_key
+                or now - llm_call.started_at > LLM_TELEMETRY_OPEN_CALL_TIMEOUT_SECONDS
+            ]
+
+            self._open_calls[call_key] = LLMCall(source, component, model, extra)
+
+        for llm_call in abandoned_calls:
+            llm_call.error = llm_call.error or "abandoned"
+            self.record(llm_call.to_record())
+
+    def mark_first_token(self, call_key):
+        with self._lock:
+            llm_call = self._open_calls.get(call_key)
+
+        if llm_call is not None:
+            llm_call.mark_first_token()
+
+    def update_call(self, call_key, **extra):
+        with self._lock:
+            llm_call = self._open_calls.get(call_key)
+
+        if llm_call is not None:
+            llm_call.extra.update(extra)
+
+    def finish_call(self, call_key, usage_metadata=None, error=None):
+        with self._lock:
+            llm_call = self._open_calls.pop(call_key, None)
+
+        if llm_call is None:
+            return None
+
+        llm_call.mark_first_token()
+        llm_call.set_usage(usage_metadata)
+        llm_call.error = error
+
+        return self.record(llm_call.to_record())
+
+    def summary(self):
+        with self._lock:
+            aggregates = self._snapshot_aggregates()
+
+        summary = {}
+        for (source, component, model), aggregate in aggregates.items():
+            calls = aggregate["calls"] or 1
+
+            summary[f"{source}/{component}/{model}"] = {
+                "calls": aggregate["calls"],
+                "errors": aggregate["errors"],
+                "avg_wall_time_seconds": round(
+                    aggregate["wall_time_seconds"] / calls, 4
+                ),
+                "avg_ttft_seconds": round(aggregate["ttft_seconds"] / calls, 4),
+                "prompt_tokens": aggregate["prompt_tokens"],
+                "cached_tokens": aggregate["cached_tokens"],
+                "output_tokens": aggregate["output_tokens"],
+                "cached_token_ratio": round(
+                    aggregate["cached_tokens"] / aggregate["prompt_tokens"], 4
+                )
+                if aggregate["prompt_tokens"]
+                else 0.0,
+            }
+
+        return summary
+
+
+def _build_sinks(sink_names):
+    sinks = []
+
+    for sink_name in sink_names.lower().replace(" ", "").split(","):
+        if sink_name == "jsonl":
+            sinks.append(JsonlTelemetrySink())
+        elif sink_name == "prometheus":
+            sinks.append(PrometheusTelemetrySink())
+
+    return sinks
+
+
+_llm_telemetry = None
+_llm_telemetry_lock = threading.Lock()
+
+
+def get_llm_telemetry() -> LLMTelemetry:
+    global _llm_telemetry
+
+    if _llm_telemetry is None:
+        with _llm_telemetry_lock:
+            if _llm_telemetry is None:
+                _llm_telemetry = LLMTelemetry(_build_sinks(LLM_TELEMETRY_SINKS))
+
+    return _llm_telemetry
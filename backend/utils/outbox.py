@@ -0,0 +1,375 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import json
+import time
+import uuid
+import random
+import logging
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_DB_PATH: str = os.getenv("OUTBOX_DB_PATH", ".outbox/outbox.db")
+
+OUTBOX_LEASE_SECONDS: int = 5 * 60
+OUTBOX_POLL_INTERVAL_SECONDS: float = 5.0
+
+
+class SqliteOutbox:
+    def __init__(self, db_path=OUTBOX_DB_PATH):
+        self.db_path = db_path
+
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(
+            db_path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                topic TEXT NOT NULL,
+                dedupe_key TEXT,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL,
+                locked_until REAL NOT NULL DEFAULT 0,
+                lease_token TEXT,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                UNIQUE (topic, dedupe_key)
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_outbox_due
+                ON outbox (topic, status, available_at);
+            """
+        )
+
+        # Outboxes created before leases carried a token gain the column here.
+        columns = {
+            row[1] for row in self._conn.execute("PRAGMA table_info(outbox)")
+        }
+        if "lease_token" not in columns:
+            self._conn.execute("ALTER TABLE outbox ADD COLUMN lease_token TEXT")
+
+    def enqueue(self, topic, payload, dedupe_key=None, delay_seconds=0):
+        now = time.time()
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO outbox "
+                "(topic, dedupe_key, payload, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    topic,
+                    dedupe_key,
+                    json.dumps(payload, default=str),
+                    now + delay_seconds,
+                    now,
+                    now,
+                ),
+            )
+
+            if cursor.rowcount:
+                return cursor.lastrowid
+
+            row = self._conn.execute(
+                "SELECT id FROM outbox WHERE topic = ? AND dedupe_key = ?",
+                (topic, dedupe_key),
+            ).fetchone()
+
+            return row[0] if row else None
+
+    def claim(self, topic, limit=1, lease_seconds=OUTBOX_LEASE_SECONDS):
+        now = time.time()
+
+        # The lease makes a claim safe across threads and processes sharing
+        # the file: a crashed worker's messages become due again once it
+        # expires. Each claimed message gets its own lease token, and only
+        # the holder of that token can settle it.
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, payload, attempts FROM outbox "
+                    "WHERE topic = ? AND status = 'pending' "
+                    "AND available_at <= ? AND locked_until <= ? "
+                    "ORDER BY available_at LIMIT ?",
+                    (topic, now, now, limit),
+                ).fetchall()
+
+                messages = [
+                    {
+                        "id": row[0],
+                        "payload": json.loads(row[1]),
+                        "attempts": row[2],
+                        "lease_token": uuid.uuid4().hex,
+                    }
+                    for row in rows
+                ]
+
+                self._conn.executemany(
+                    "UPDATE outbox SET locked_until = ?, lease_token = ?, "
+                    "updated_at = ? WHERE id = ?",
+                    [
+                        (
+                            now + lease_seconds,
+                            message["lease_token"],
+                            now,
+                            message["id"],
+                        )
+                        for message in messages
+                    ],
+                )
+                self._conn.execute("COMMIT")
+
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return messages
+
+    def _update(self, message, status, error=None, delay_seconds=0):
+        now = time.time()
+
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, "
+                "available_at = ?, locked_until = 0, lease_token = NULL, "
+                "last_error = ?, updated_at = ? WHERE id = ? AND lease_token = ?",
+                (
+                    status,
+                    now + delay_seconds,
+                    error,
+                    now,
+                    message["id"],
+                    message["lease_token"],
+                ),
+            ).rowcount
+
+        # The lease expired and another worker claimed the message; its
+        # outcome stands.
+        if not updated:
+            logger.warning(
+                "Outbox message %s lost its lease before it was marked %s",
+                message["id"],
+                status,
+            )
+
+        return bool(updated)
+
+    def complete(self, message):
+        return self._update(message, "done")
+
+    def retry(self, message, error, delay_seconds):
+        return self._update(message, "pending", str(error), delay_seconds)
+
+    def fail(self, message, error):
+        return self._update(message, "dead", str(error))
+
+    def purge(self, older_than_seconds=7 * 24 * 60 * 60):
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM outbox WHERE status = 'done' AND updated_at < ?",
+                (time.time() - older_than_seconds,),
+            ).rowcount
+
+    def stats(self, topic=None):
+        query = "SELECT status, COUNT(*) FROM outbox"
+        params = ()
+
+        if topic:
+            query += " WHERE topic = ?"
+            params = (topic,)
+
+        with self._lock:
+            rows = self._conn.execute(query + " GROUP BY status", params).fetchall()
+
+        return {status: count for status, count in rows}
+
+
+# Token bucket; one instance is shared by every worker that delivers
+# through the same provider, so adding workers never exceeds its limit.
+class RateLimiter:
+    def __init__(self, rate_per_second, burst=None):
+        self.rate_per_second = rate_per_second
+        self.capacity = burst or max(1.0, rate_per_second)
+
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated_at) * self.rate_per_second,
+                )
+                self._updated_at = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait_seconds = (1 - self._tokens) / self.rate_per_second
+
+            time.sleep(wait_seconds)
+
+
+class OutboxWorker:
+    def __init__(
+        self,
+        outbox,
+        topic,
+        handler,
+        on_exhausted=None,
+        max_attempts=5,
+        base_backoff_seconds=5.0,
+        max_backoff_seconds=10 * 60.0,
+        poll_interval_seconds=OUTBOX_POLL_INTERVAL_SECONDS,
+        lease_seconds=OUTBOX_LEASE_SECONDS,
+        rate_limiter=None,
+    ):
+        self.outbox = outbox
+        self.topic = topic
+        self.handler = handler
+        self.on_exhausted = on_exhausted
+        self.max_attempts = max_attempts
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.lease_seconds = lease_seconds
+        self.rate_limiter = rate_limiter
+
+        self._thread = None
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def backoff_seconds(self, attempts):
+        backoff = min(
+            self.max_backoff_seconds,
+            self.base_backoff_seconds * (2 ** max(0, attempts - 1)),
+        )
+        return backoff * random.uniform(0.8, 1.2)
+
+    def _handle(self, message):
+        attempts = message["attempts"] + 1
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+        try:
+            self.handler(message["payload"])
+            self.outbox.complete(message)
+
+        except Exception as error:
+            if attempts < self.max_attempts:
+                logger.warning(
+                    "Outbox %s message %s failed (attempt %s): %s",
+                    self.topic, message["id"], attempts, error,
+                )
+                self.outbox.retry(message, error, self.backoff_seconds(attempts))
+                return
+
+            logger.error(
+                "Outbox %s message %s exhausted retries: %s",
+                self.topic, message["id"], error,
+            )
+
+            try:
+                if self.on_exhausted is not None:
+                    self.on_exhausted(message["payload"], error)
+
+            except Exception as fallback_error:
+                logger.error(
+                    "Outbox %s fallback failed for message %s: %s",
+                    self.topic, message["id"], fallback_error,
+                )
+
+            self.outbox.fail(message, error)
+
+    def process_due(self):
+        # One message per claim: a batch under a single lease would let the
+        # later messages outlive it while the earlier ones are handled, and
+        # another process would claim and deliver them a second time.
+        messages = self.outbox.claim(self.topic, lease_seconds=self.lease_seconds)
+
+        for message in messages:
+            self._handle(message)
+
+        return len(messages)
+
+    def _run_forever(self):
+        while not self._stop_event.is_set():
+            self._wake_event.clear()
+
+            try:
+                if self.process_due():
+                    continue
+
+            except Exception as error:
+                logger.warning("Outbox %s worker failed: %s", self.topic, error)
+
+            self._wake_event.wait(self.poll_interval_seconds)
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run_forever,
+                name=f"outbox-{self.topic}",
+                daemon=True,
+            )
+            self._thread.start()
+
+        return True
+
+    def wake(self):
+        self._wake_event.set()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake_event.set()
+
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox() -> SqliteOutbox:
+    global _outbox
+
+    if _outbox is None:
+        with _outbox_lock:
+            if _outbox is None:
+                _outbox = SqliteOutbox()
+
+    return _outbox
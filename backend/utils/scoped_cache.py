@@ -0,0 +1,153 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import json
+import inspect
+import functools
+import threading
+
+import streamlit as st
+
+from backend.utils.tagged_cache import MISSING, TaggedCache
+
+SCOPED_CACHE_MAX_ENTRIES: int = int(os.getenv("SCOPED_CACHE_MAX_ENTRIES", "5000"))
+SCOPED_CACHE_TTL_SECONDS: int = int(os.getenv("SCOPED_CACHE_TTL_SECONDS", "3600"))
+
+# Scope -> session_state key holding the id of the user that owns an entry.
+# "global" entries (catalog, shared lookups) belong to nobody.
+CACHE_SCOPES = {
+    "customer": "customer_id",
+    "engineer": "engineer_id",
+    "global": None,
+}
+
+
+def scope_tag(scope, owner_id=None, domain=None):
+    # "customer:C123", "customer:C123:appliances", "global:catalog"
+    return ":".join(
+        str(part) for part in (scope, owner_id, domain) if part is not None
+    )
+
+
+class ScopedCache(TaggedCache):
+    def __init__(
+        self,
+        ttl_seconds=SCOPED_CACHE_TTL_SECONDS,
+        max_entries=SCOPED_CACHE_MAX_ENTRIES,
+    ):
+        super().__init__(ttl_seconds, max_entries)
+
+    def invalidate(self, *tags, function_name=None):
+        # Keys start with the cached function's name, so one function's
+        # entries can be dropped without touching the rest of the owner's.
+        key_prefix = () if function_name is None else (function_name,)
+
+        return super().invalidate(*tags, key_prefix=key_prefix)
+
+
+_scoped_cache = None
+_scoped_cache_lock = threading.Lock()
+
+
+def get_scoped_cache() -> ScopedCache:
+    global _scoped_cache
+
+    if _scoped_cache is None:
+        with _scoped_cache_lock:
+            if _scoped_cache is None:
+                _scoped_cache = ScopedCache()
+
+    return _scoped_cache
+
+
+def _scope_owner(scope):
+    owner_key = CACHE_SCOPES[scope]
+
+    if owner_key is None:
+        return None
+
+    return st.session_state.get(owner_key) or None
+
+
+def scoped_cache(scope, *domains, ttl_seconds=None):
+    # A drop-in for st.cache_data whose entries are tagged with their owner
+    # (the signed-in customer or engineer) and domains, so a logout or an
+    # edit evicts only what it affects instead of every user's cache.
+    if scope not in CACHE_SCOPES:
+        raise ValueError(f"Unknown cache scope {scope!r}")
+
+    def decorator(func):
+        # Streamlit runs every page as __main__, so the file tells apart
+        # same-named functions on different pages.
+        function_name = f"{func.__code__.co_filename}:{func.__qualname__}"
+        signature = inspect.signature(func)
+
+        def _cache_key(owner_id, args, kwargs):
+            bound_arguments = signature.bind(*args, **kwargs)
+            bound_arguments.apply_defaults()
+
+            return (
+                function_name,
+                owner_id,
+                json.dumps(bound_arguments.arguments, sort_keys=True, default=str),
+            )
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            owner_id = _scope_owner(scope)
+
+            # Nothing is shared under a missing owner, e.g. before login.
+            if CACHE_SCOPES[scope] and owner_id is None:
+                return func(*args, **kwargs)
+
+            cache = get_scoped_cache()
+            cache_key = _cache_key(owner_id, args, kwargs)
+
+            value = cache.get(cache_key)
+            if value is not MISSING:
+                return value
+
+            value = func(*args, **kwargs)
+
+            tags = {scope_tag(scope), scope_tag(scope, owner_id)}
+            tags.update(scope_tag(scope, owner_id, domain) for domain in domains)
+
+            cache.set(cache_key, value, tags, ttl_seconds)
+
+            return value
+
+        def clear():
+            # Same call as st.cache_data's clear(), limited to the current
+            # owner's entries for this function.
+            return get_scoped_cache().invalidate(
+                scope_tag(scope, _scope_owner(scope)), function_name=function_name
+            )
+
+        wrapper.clear = clear
+        return wrapper
+
+    return decorator
+
+
+def invalidate_scope(scope, owner_id=None, *domains):
+    # invalidate_scope("customer", customer_id) on logout drops all of that
+    # customer's entries; with domains, only those (e.g. "appliances").
+    # Without an owner it drops the whole scope.
+    if domains:
+        tags = [scope_tag(scope, owner_id, domain) for domain in domains]
+    else:
+        tags = [scope_tag(scope, owner_id)]
+
+    return get_scoped_cache().invalidate(*tags)
@@ -0,0 +1,99 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import time
+import threading
+from collections import OrderedDict
+
+MISSING = object()
+
+
+class TaggedCache:
+    # An in-process TTL + LRU cache whose entries carry tags, so an edit can
+    # evict just the entries it affects. Values are deep-copied in and out,
+    # so callers can mutate what they get back. get() returns MISSING on a
+    # miss, which keeps None a cacheable value.
+    def __init__(self, ttl_seconds, max_entries):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._metrics = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0}
+
+    def get(self, cache_key):
+        with self._lock:
+            entry = self._entries.get(cache_key)
+
+            if entry is None or entry["expires_at"] < time.monotonic():
+                self._entries.pop(cache_key, None)
+                self._metrics["misses"] += 1
+                return MISSING
+
+            self._entries.move_to_end(cache_key)
+            self._metrics["hits"] += 1
+
+            return copy.deepcopy(entry["value"])
+
+    def set(self, cache_key, value, tags, ttl_seconds=None):
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+
+        with self._lock:
+            self._entries[cache_key] = {
+                "value": copy.deepcopy(value),
+                "tags": frozenset(tags),
+                "expires_at": time.monotonic() + ttl_seconds,
+            }
+            self._entries.move_to_end(cache_key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+            self._metrics["stores"] += 1
+
+    def invalidate(self, *tags, key_prefix=()):
+        # Evicts entries carrying any of the tags, optionally only those whose
+        # key starts with key_prefix; everything else stays warm.
+        tags = set(tags)
+
+        with self._lock:
+            stale_keys = [
+                cache_key
+                for cache_key, entry in self._entries.items()
+                if entry["tags"] & tags
+                and cache_key[: len(key_prefix)] == key_prefix
+            ]
+
+            for cache_key in stale_keys:
+                del self._entries[cache_key]
+
+            self._metrics["invalidations"] += len(stale_keys)
+
+        return len(stale_keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["entries"] = len(self._entries)
+
+        lookups = metrics["hits"] + metrics["misses"]
+        metrics["hit_rate"] = round(metrics["hits"] / lookups, 4) if lookups else 0.0
+
+        return metrics
@@ -0,0 +1,456 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+# Benchmark runs must not append to the production telemetry files.
+os.environ.setdefault("LLM_TELEMETRY_SINKS", "")
+
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import statistics
+import tracemalloc
+from collections import Counter
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import Runner
+from google.genai import types
+
+from customer_agent.agent import root_agent
+from customer_agent.router import RoutedRunner, train_intent_router
+from customer_agent.sessions import create_session_service
+from customer_agent.tools import customer_agent_tools
+from customer_agent.tools.prefetch import prefetch_customer_context
+from customer_agent.tools.tool_cache import get_customer_tool_cache
+from database.cloud_sql.catalog import get_appliance_catalog
+
+from .fixtures import BenchmarkDataStores, benchmark_customer_context
+from .scenarios import BENCHMARK_SCENARIOS
+from .scripted_llm import ScriptedLlm, ScriptPlayer
+
+APP_NAME = "LogIQ Customer Agent Benchmark"
+
+# Metrics where any increase over the baseline is a regression; timing and
+# allocation metrics are compared against a relative tolerance instead.
+EXACT_METRICS = (
+    "llm_calls",
+    "tool_calls",
+    "sql_round_trips",
+    "firestore_round_trips",
+)
+TOLERANCE_METRICS = ("wall_ms", "alloc_peak_kb")
+
+
+class _RecordingAssignmentDispatcher:
+    def __init__(self):
+        self.dispatched = []
+
+    def dispatch(self, customer_id, request_id):
+        self.dispatched.append((customer_id, request_id))
+        return len(self.dispatched)
+
+
+def _agent_tree(agent):
+    yield agent
+
+    for sub_agent in agent.sub_agents:
+        yield from _agent_tree(sub_agent)
+
+
+class AgentBenchmark:
+    def __init__(
+        self,
+        appliance_count=6,
+        llm_latency_seconds=0.0,
+        use_router=True,
+        prefetch=True,
+        trace_allocations=True,
+        session_service=None,
+    ):
+        self.appliance_count = appliance_count
+        self.llm_latency_seconds = llm_latency_seconds
+        self.use_router = use_router
+        self.prefetch = prefetch
+        self.trace_allocations = trace_allocations
+
+        self.customer_context = benchmark_customer_context(0)
+        self.customer_id = self.customer_context["customer_id"]
+        self.player = ScriptPlayer(self.customer_context)
+        self.data_stores = None
+        self.assignment_dispatcher = _RecordingAssignmentDispatcher()
+
+        self._install(session_service or create_session_service("memory"))
+
+    def _install(self, session_service):
+        # The tools resolve their clients through these module-level
+        # factories, so swapping them routes every query to the stand-ins.
+        customer_agent_tools._initialize_cloud_sql_mysql_db = (
+            lambda: self.data_stores.engine
+        )
+        customer_agent_tools._initialize_firebase_firestore = (
+            lambda: self.data_stores.firestore_client
+        )
+        customer_agent_tools.get_engineer_assignment_dispatcher = (
+            lambda: self.assignment_dispatcher
+        )
+
+        for agent in _agent_tree(root_agent):
+            agent.model = ScriptedLlm(
+                model=f"scripted/{agent.name}",
+                agent_name=agent.name,
+                player=self.player,
+                latency_seconds=self.llm_latency_seconds,
+            )
+
+        if self.use_router:
+            self.runner = RoutedRunner(
+                agent=root_agent,
+                app_name=APP_NAME,
+                session_service=session_service,
+                intent_router=train_intent_router(
+                    root_agent.name, include_history=False
+                ),
+            )
+        else:
+            self.runner = Runner(
+                agent=root_agent,
+                app_name=APP_NAME,
+                session_service=session_service,
+            )
+
+    def use_data_stores(self, data_stores):
+        self.data_stores = data_stores
+        get_appliance_catalog().bind(lambda: data_stores.engine)
+
+    def _measure_start(self):
+        self.data_stores.reset_counters()
+
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+            return time.perf_counter(), tracemalloc.get_traced_memory()[0]
+
+        return time.perf_counter(), 0
+
+    def _measure_stop(self, started_at, memory_before):
+        wall_ms = (time.perf_counter() - started_at) * 1000
+
+        alloc_net_kb = alloc_peak_kb = 0.0
+        if self.trace_allocations:
+            memory_current, memory_peak = tracemalloc.get_traced_memory()
+            alloc_net_kb = (memory_current - memory_before) / 1024
+            alloc_peak_kb = (memory_peak - memory_before) / 1024
+
+        return {
+            "wall_ms": round(wall_ms, 3),
+            "alloc_net_kb": round(alloc_net_kb, 1),
+            "alloc_peak_kb": round(alloc_peak_kb, 1),
+            **self.data_stores.counters(),
+        }
+
+    async def _start_session(self):
+        initial_state = {
+            "customer_full_name": self.customer_context["customer_full_name"],
+            "customer_id": self.customer_id,
+        }
+
+        started_at, memory_before = self._measure_start()
+
+        if self.prefetch:
+            initial_state.update(
+                await asyncio.to_thread(prefetch_customer_context, self.customer_id)
+            )
+
+        session = await self.runner.session_service.create_session(
+            app_name=APP_NAME,
+            user_id=self.customer_id,
+            state=initial_state,
+        )
+
+        return session, self._measure_stop(started_at, memory_before)
+
+    async def _run_turn(self, session, turn):
+        self.player.load_turn(turn["steps"])
+
+        tool_calls = Counter()
+        tool_errors = 0
+        final_text = ""
+
+        started_at, memory_before = self._measure_start()
+
+        async for event in self.runner.run_async(
+            user_id=self.customer_id,
+            session_id=session.id,
+            new_message=types.Content(
+                role="user",
+                parts=[types.Part(text=self.player.user_message(turn["user"]))],
+            ),
+            run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+        ):
+            for function_call in event.get_function_calls():
+                tool_calls[function_call.name] += 1
+
+            for function_response in event.get_function_responses():
+                if (function_response.response or {}).get("status") == "error":
+                    tool_errors += 1
+
+            if event.is_final_response() and event.content and event.content.parts:
+                final_text = event.content.parts[0].text or ""
+
+        turn_metrics = self._measure_stop(started_at, memory_before)
+        turn_metrics.update(
+            {
+                "llm_calls": self.player.llm_calls,
+                "prompt_tokens": self.player.prompt_tokens,
+                "tool_calls": sum(tool_calls.values()),
+                "tools": dict(tool_calls),
+                "tool_errors": tool_errors,
+                "hops_saved": self.player.skipped_transfers,
+                "script_mismatches": self.player.mismatches,
+                "final_text": final_text,
+            }
+        )
+
+        return turn_metrics
+
+    async def run_scenario(self, scenario_name, turns):
+        random.seed(0)
+
+        self.use_data_stores(BenchmarkDataStores(appliance_count=self.appliance_count))
+        get_customer_tool_cache().invalidate(self.customer_id)
+
+        session, setup_metrics = await self._start_session()
+
+        turn_results = []
+        for turn_index, turn in enumerate(turns):
+            turn_metrics = await self._run_turn(session, turn)
+            turn_metrics.update(
+                {"scenario": scenario_name, "turn": turn_index, "user": turn["user"]}
+            )
+            turn_results.append(turn_metrics)
+
+        return setup_metrics, turn_results
+
+    async def run(self, scenario_names, repeat=3):
+        if self.trace_allocations:
+            tracemalloc.start()
+
+        try:
+            runs = []
+            for scenario_name in scenario_names:
+                for iteration in range(repeat):
+                    setup_metrics, turn_results = await self.run_scenario(
+                        scenario_name, BENCHMARK_SCENARIOS[scenario_name]
+                    )
+                    runs.append(
+                        {
+                            "scenario": scenario_name,
+                            "iteration": iteration,
+                            "setup": setup_metrics,
+                            "turns": turn_results,
+                        }
+                    )
+
+        finally:
+            if self.trace_allocations:
+                tracemalloc.stop()
+
+        return runs
+
+
+def summarize_runs(runs):
+    summaries = {}
+
+    for scenario_name in dict.fromkeys(run["scenario"] for run in runs):
+        scenario_runs = [run for run in runs if run["scenario"] == scenario_name]
+
+        # The first iteration pays for imports and lazy initialisation, so it
+        # is reported but only the warm iterations feed the medians.
+        warm_runs = scenario_runs[1:] or scenario_runs
+
+        turn_count = len(scenario_runs[0]["turns"])
+        turns = []
+
+        for turn_index in range(turn_count):
+            samples = [run["turns"][turn_index] for run in warm_runs]
+
+            turns.append(
+                {
+                    "turn": turn_index,
+                    "user": samples[0]["user"],
+                    "wall_ms": round(statistics.median(s["wall_ms"] for s in samples), 3),
+                    "alloc_peak_kb": round(
+                        statistics.median(s["alloc_peak_kb"] for s in samples), 1
+                    ),
+                    "llm_calls": max(s["llm_calls"] for s in samples),
+                    "prompt_tokens": max(s["prompt_tokens"] for s in samples),
+                    "tool_calls": max(s["tool_calls"] for s in samples),
+                    "sql_round_trips": max(s["sql_round_trips"] for s in samples),
+                    "firestore_round_trips": max(
+                        s["firestore_round_trips"] for s in samples
+                    ),
+                    "hops_saved": max(s["hops_saved"] for s in samples),
+                    "script_mismatches": max(s["script_mismatches"] for s in samples),
+                    "tool_errors": max(s["tool_errors"] for s in samples),
+                }
+            )
+
+        summaries[scenario_name] = {
+            "cold_wall_ms": round(sum(t["wall_ms"] for t in scenario_runs[0]["turns"]), 3),
+            "setup": {
+                "wall_ms": round(
+                    statistics.median(run["setup"]["wall_ms"] for run in warm_runs), 3
+                ),
+                "sql_round_trips": max(run["setup"]["sql_round_trips"] for run in warm_runs),
+                "firestore_round_trips": max(
+                    run["setup"]["firestore_round_trips"] for run in warm_runs
+                ),
+            },
+            "turns": turns,
+            "totals": {
+                metric: round(sum(turn[metric] for turn in turns), 3)
+                for metric in EXACT_METRICS + TOLERANCE_METRICS + ("prompt_tokens",)
+            },
+        }
+
+    return summaries
+
+
+def compare_to_baseline(summaries, baseline_summaries, tolerance):
+    regressions = []
+
+    for scenario_name, summary in summaries.items():
+        baseline = baseline_summaries.get(scenario_name)
+
+        if baseline is None:
+            continue
+
+        for metric in EXACT_METRICS:
+            if summary["totals"][metric] > baseline["totals"][metric]:
+                regressions.append(
+                    f"{scenario_name}: {metric} {baseline['totals'][metric]} -> "
+                    f"{summary['totals'][metric]}"
+                )
+
+        for metric in TOLERANCE_METRICS:
+            baseline_value = baseline["totals"][metric]
+
+            if baseline_value and summary["totals"][metric] > baseline_value * (
+                1 + tolerance
+            ):
+                regressions.append(
+                    f"{scenario_name}: {metric} {baseline_value} -> "
+                    f"{summary['totals'][metric]} (> {tolerance:.0%} slower)"
+                )
+
+    return regressions
+
+
+def print_report(summaries):
+    header = (
+        f"{'scenario':<26}{'turn':>5}{'wall ms':>10}{'llm':>5}{'tools':>6}"
+        f"{'sql':>5}{'fs':>5}{'tokens':>8}{'peak KB':>10}{'hops':>6}"
+    )
+    print(header)
+    print("-" * len(header))
+
+    for scenario_name, summary in summaries.items():
+        setup = summary["setup"]
+        print(
+            f"{scenario_name:<26}{'setup':>5}{setup['wall_ms']:>10.2f}{'':>5}{'':>6}"
+            f"{setup['sql_round_trips']:>5}{setup['firestore_round_trips']:>5}"
+        )
+
+        for turn in summary["turns"]:
+            print(
+                f"{'':<26}{turn['turn']:>5}{turn['wall_ms']:>10.2f}"
+                f"{turn['llm_calls']:>5}{turn['tool_calls']:>6}"
+                f"{turn['sql_round_trips']:>5}{turn['firestore_round_trips']:>5}"
+                f"{turn['prompt_tokens']:>8}{turn['alloc_peak_kb']:>10.1f}"
+                f"{turn['hops_saved']:>6}"
+            )
+
+            if turn["script_mismatches"]:
+                print(f"{'':<31}! {turn['script_mismatches']} unscripted model call(s)")
+
+            if turn["tool_errors"]:
+                print(f"{'':<31}! {turn['tool_errors']} tool call(s) returned an error")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Replay scripted conversations against the customer agent "
+        "with a fake LLM and local data stores."
+    )
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(BENCHMARK_SCENARIOS),
+        help="Scenario to run (repeatable). Defaults to all scenarios.",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--appliances", type=int, default=6)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--no-router", action="store_true")
+    parser.add_argument("--no-prefetch", action="store_true")
+    parser.add_argument("--skip-allocations", action="store_true")
+    parser.add_argument("--output", help="Write the raw runs and summary as JSON.")
+    parser.add_argument("--baseline", help="JSON output of an earlier run to compare.")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    benchmark = AgentBenchmark(
+        appliance_count=args.appliances,
+        llm_latency_seconds=args.llm_latency_ms / 1000,
+        use_router=not args.no_router,
+        prefetch=not args.no_prefetch,
+        trace_allocations=not args.skip_allocations,
+    )
+
+    scenario_names = args.scenario or list(BENCHMARK_SCENARIOS)
+    runs = asyncio.run(benchmark.run(scenario_names, repeat=max(1, args.repeat)))
+    summaries = summarize_runs(runs)
+
+    print_report(summaries)
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(
+                {"config": vars(args), "summary": summaries, "runs": runs},
+                output_file,
+                indent=2,
+                default=str,
+            )
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline_summaries = json.load(baseline_file)["summary"]
+
+        regressions = compare_to_baseline(summaries, baseline_summaries, args.tolerance)
+
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import threading
+from collections import Counter
+
+
+class FakeDocumentSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+
+        self._data = copy.deepcopy(data)
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self.exists else None
+
+    def get(self, field_path):
+        value = self._data
+
+        for key in field_path.split("."):
+            value = value[key]
+
+        return copy.deepcopy(value)
+
+
+class FakeDocumentReference:
+    def __init__(self, client, path):
+        self._client = client
+        self.path = path
+        self.id = path[-1]
+
+    def collection(self, collection_id):
+        return FakeCollectionReference(self._client, self.path + (collection_id,))
+
+    def get(self):
+        self._client._round_trip("get")
+        return FakeDocumentSnapshot(self, self._client._documents.get(self.path))
+
+    def set(self, document_data, merge=False):
+        self._client._round_trip("set")
+
+        with self._client._lock:
+            if merge and self.path in self._client._documents:
+                self._client._documents[self.path].update(copy.deepcopy(document_data))
+            else:
+                self._client._documents[self.path] = copy.deepcopy(document_data)
+
+    def update(self, field_updates):
+        self._client._round_trip("update")
+
+        with self._client._lock:
+            if self.path not in self._client._documents:
+                raise KeyError(f"No document to update: {'/'.join(self.path)}")
+
+            document = self._client._documents[self.path]
+
+            for field_path, value in field_updates.items():
+                target = document
+                keys = field_path.split(".")
+
+                for key in keys[:-1]:
+                    target = target.setdefault(key, {})
+
+                target[keys[-1]] = copy.deepcopy(value)
+
+    def delete(self):
+        self._client._round_trip("delete")
+
+        with self._client._lock:
+            self._client._documents.pop(self.path, None)
+
+
+class FakeCollectionReference:
+    def __init__(self, client, path, filters=None, limit_count=None):
+        self._client = client
+        self.path = path
+        self.id = path[-1]
+
+        self._filters = filters or []
+        self._limit_count = limit_count
+
+    def document(self, document_id):
+        return FakeDocumentReference(self._client, self.path + (document_id,))
+
+    def where(self, field_path, op_string, value):
+        return FakeCollectionReference(
+            self._client,
+            self.path,
+            self._filters + [(field_path, op_string, value)],
+            self._limit_count,
+        )
+
+    def limit(self, count):
+        return FakeCollectionReference(
+            self._client, self.path, self._filters, count
+        )
+
+    def _matches(self, document):
+        for field_path, op_string, value in self._filters:
+            field_value = document
+
+            for key in field_path.split("."):
+                field_value = (field_value or {}).get(key)
+
+            if op_string == "==" and field_value != value:
+                return False
+            if op_string == "in" and field_value not in value:
+                return False
+            if op_string == "!=" and field_value == value:
+                return False
+
+        return True
+
+    def _snapshots(self):
+        with self._client._lock:
+            documents = [
+                (path, document)
+                for path, document in self._client._documents.items()
+                if len(path) == len(self.path) + 1
+                and path[:-1] == self.path
+                and self._matches(document)
+            ]
+
+        if self._limit_count is not None:
+            documents = documents[: self._limit_count]
+
+        return [
+            FakeDocumentSnapshot(FakeDocumentReference(self._client, path), document)
+            for path, document in documents
+        ]
+
+    def get(self):
+        self._client._round_trip("query")
+        return self._snapshots()
+
+    def stream(self):
+        self._client._round_trip("query")
+        yield from self._snapshots()
+
+
+# In-memory stand-in for the parts of the Firestore client the agent tools
+# use; every call that would be a network round trip is counted.
+class FakeFirestoreClient:
+    def __init__(self):
+        self._documents = {}
+        self._lock = threading.Lock()
+
+        self.round_trips = Counter()
+
+    def _round_trip(self, operation):
+        self.round_trips[operation] += 1
+
+    def collection(self, collection_id):
+        return FakeCollectionReference(self, (collection_id,))
+
+    def seed(self, document_path, document_data):
+        self._documents[tuple(document_path.split("/"))] = copy.deepcopy(
+            document_data
+        )
+
+    def total_round_trips(self):
+        return sum(self.round_trips.values())
@@ -0,0 +1,305 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sqlite3
+from collections import Counter
+from datetime import date, timedelta
+
+import sqlalchemy
+from sqlalchemy.pool import StaticPool
+
+from .fake_firestore import FakeFirestoreClient
+
+BENCHMARK_CUSTOMER_ID = "benchmark_customer"
+
+
+def benchmark_customer_id(customer_index):
+    if customer_index == 0:
+        return BENCHMARK_CUSTOMER_ID
+
+    return f"{BENCHMARK_CUSTOMER_ID}_{customer_index:03d}"
+
+
+def benchmark_customer_context(customer_index):
+    # Placeholders the scenarios use for values that must be unique per
+    # customer (serial numbers and phone numbers are UNIQUE columns).
+    return {
+        "customer_id": benchmark_customer_id(customer_index),
+        "customer_full_name": "Asha Raman",
+        "serial_prefix": f"SN{customer_index:03d}",
+        "email": f"customer{customer_index:03d}@example.com",
+        "phone_number": f"98{customer_index:08d}",
+        "new_phone_number": f"981{customer_index:07d}",
+    }
+
+_APPLIANCE_CATALOG = [
+    ("LRFXS2503S", "LG 25 cu. ft. French Door Refrigerator", "LG", "Kitchen Appliances", "Refrigerator"),
+    ("WM3400CW", "LG Front Load Washer", "LG", "Laundry Appliances", "Washing Machine"),
+    ("MVW6230HW", "Maytag Top Load Washer", "Maytag", "Laundry Appliances", "Washing Machine"),
+    ("WED5605MW", "Whirlpool Electric Dryer", "Whirlpool", "Laundry Appliances", "Dryer"),
+    ("NX58R4311SS", "Samsung Gas Range", "Samsung", "Kitchen Appliances", "Gas Range"),
+    ("ME21R7051SS", "Samsung Over-the-Range Microwave", "Samsung", "Kitchen Appliances", "Microwave Oven"),
+    ("SHPM88Z75N", "Bosch 800 Series Dishwasher", "Bosch", "Kitchen Appliances", "Dishwasher"),
+    ("AMV6502REW", "Amana Over-the-Range Microwave", "Amana", "Kitchen Appliances", "Microwave Oven"),
+]
+
+_SCHEMA = [
+    """
+    CREATE TABLE customers (
+        username VARCHAR(255) PRIMARY KEY,
+        first_name VARCHAR(255) NOT NULL,
+        last_name VARCHAR(255) NOT NULL,
+        dob DATE NOT NULL,
+        gender VARCHAR(20),
+        email VARCHAR(255) NOT NULL UNIQUE,
+        phone_number VARCHAR(20) NOT NULL UNIQUE,
+        profile_picture TEXT NOT NULL,
+        street TEXT NOT NULL,
+        district VARCHAR(255) NOT NULL,
+        city VARCHAR(255) NOT NULL,
+        state VARCHAR(255) NOT NULL,
+        country VARCHAR(255) NOT NULL,
+        zip_code VARCHAR(20) NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE customer_appliances (
+        customer_appliance_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        customer_id VARCHAR(255) NOT NULL,
+        category VARCHAR(255) NOT NULL,
+        sub_category VARCHAR(255) NOT NULL,
+        brand VARCHAR(255) NOT NULL,
+        model_number VARCHAR(255) NOT NULL,
+        serial_number VARCHAR(255) NOT NULL UNIQUE,
+        purchase_date DATE NOT NULL,
+        warranty_period INTEGER NOT NULL,
+        warranty_expiration DATE NOT NULL,
+        purchased_from VARCHAR(255) NOT NULL,
+        seller VARCHAR(255) NOT NULL,
+        installation_date DATE NOT NULL,
+        created_on TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        status VARCHAR(255) NOT NULL DEFAULT 'active',
+        appliance_image_url VARCHAR(255) NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE appliances (
+        appliance_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        model_number VARCHAR(255) NOT NULL UNIQUE,
+        appliance_name VARCHAR(255) NOT NULL,
+        brand VARCHAR(255) NOT NULL,
+        category VARCHAR(255) NOT NULL,
+        sub_category VARCHAR(255) NOT NULL,
+        appliance_image_url VARCHAR(255) NOT NULL,
+        warranty_period INTEGER NOT NULL,
+        launch_date DATE NOT NULL,
+        energy_rating INTEGER NOT NULL,
+        availability_status VARCHAR(255) NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+    )
+    """,
+]
+
+
+class BenchmarkDataStores:
+    def __init__(self, customer_count=1, appliance_count=6, database_path=None):
+        self.customers = [
+            benchmark_customer_context(customer_index)
+            for customer_index in range(customer_count)
+        ]
+        self.customer_id = self.customers[0]["customer_id"]
+        self.sql_round_trips = Counter()
+
+        # DATE columns come back as date objects, as they do from MySQL, so
+        # the tools' strftime calls behave the same against SQLite.
+        connect_args = {
+            "detect_types": sqlite3.PARSE_DECLTYPES,
+            "check_same_thread": False,
+        }
+
+        if database_path:
+            # Concurrent users need a real connection pool; one shared
+            # in-memory connection would serialise (and interleave) them.
+            self.engine = sqlalchemy.create_engine(
+                f"sqlite:///{database_path}",
+                connect_args={**connect_args, "timeout": 30},
+            )
+        else:
+            self.engine = sqlalchemy.create_engine(
+                "sqlite://", connect_args=connect_args, poolclass=StaticPool
+            )
+        sqlalchemy.event.listen(
+            self.engine, "before_cursor_execute", self._count_sql_round_trip
+        )
+
+        self.firestore_client = FakeFirestoreClient()
+
+        self._seed_sql(appliance_count)
+        self._seed_firestore(appliance_count)
+        self.reset_counters()
+
+    def _count_sql_round_trip(self, conn, cursor, statement, parameters, context, executemany):
+        self.sql_round_trips[statement.lstrip().split(" ", 1)[0].upper()] += 1
+
+    def _seed_sql(self, appliance_count):
+        today = date.today()
+
+        with self.engine.begin() as db_conn:
+            for statement in _SCHEMA:
+                db_conn.execute(sqlalchemy.text(statement))
+
+            for idx, (model_number, appliance_name, brand, category, sub_category) in enumerate(
+                _APPLIANCE_CATALOG
+            ):
+                db_conn.execute(
+                    sqlalchemy.text(
+                        "INSERT INTO appliances (model_number, appliance_name, brand, "
+                        "category, sub_category, appliance_image_url, warranty_period, "
+                        "launch_date, energy_rating, availability_status) VALUES "
+                        "(:model_number, :appliance_name, :brand, :category, "
+                        ":sub_category, :image_url, 2, :launch_date, :energy_rating, "
+                        "'available')"
+                    ),
+                    {
+                        "model_number": model_number,
+                        "appliance_name": appliance_name,
+                        "brand": brand,
+                        "category": category,
+                        "sub_category": sub_category,
+                        "image_url": f"https://storage.googleapis.com/appliances/{model_number}.png",
+                        "launch_date": today - timedelta(days=365 + idx * 30),
+                        "energy_rating": 5 - idx % 3,
+                    },
+                )
+
+            for customer in self.customers:
+                db_conn.execute(
+                    sqlalchemy.text(
+                        "INSERT INTO customers (username, first_name, last_name, "
+                        "dob, gender, email, phone_number, profile_picture, street, "
+                        "district, city, state, country, zip_code) VALUES (:username, "
+                        "'Asha', 'Raman', :dob, 'Female', :email, :phone_number, '', "
+                        "'12 MG Road', 'Ernakulam', 'Kochi', 'Kerala', 'India', "
+                        "'682001')"
+                    ),
+                    {
+                        "username": customer["customer_id"],
+                        "dob": date(1990, 4, 5),
+                        "email": customer["email"],
+                        "phone_number": customer["phone_number"],
+                    },
+                )
+
+                for idx in range(appliance_count):
+                    self._seed_customer_appliance(db_conn, customer, idx, today)
+
+    def _seed_customer_appliance(self, db_conn, customer, idx, today):
+        model_number, _, brand, category, sub_category = _APPLIANCE_CATALOG[
+            idx % len(_APPLIANCE_CATALOG)
+        ]
+        purchase_date = today - timedelta(days=90 * (idx + 1))
+        serial_number = f"{customer['serial_prefix']}{idx:03d}"
+
+        db_conn.execute(
+            sqlalchemy.text(
+                "INSERT INTO customer_appliances (customer_id, category, "
+                "sub_category, brand, model_number, serial_number, "
+                "purchase_date, warranty_period, warranty_expiration, "
+                "purchased_from, seller, installation_date, "
+                "appliance_image_url, created_on) VALUES (:customer_id, "
+                ":category, :sub_category, :brand, :model_number, "
+                ":serial_number, :purchase_date, 2, :warranty_expiration, "
+                "'Online', 'LogIQ Store', :installation_date, :image_url, "
+                ":created_on)"
+            ),
+            {
+                "customer_id": customer["customer_id"],
+                "category": category,
+                "sub_category": sub_category,
+                "brand": brand,
+                "model_number": model_number,
+                "serial_number": serial_number,
+                "purchase_date": purchase_date,
+                "warranty_expiration": purchase_date + timedelta(days=730),
+                "installation_date": purchase_date + timedelta(days=3),
+                "image_url": (
+                    "https://storage.googleapis.com/customer_appliances/"
+                    f"{customer['customer_id']}/{serial_number}.png?X-Goog-Signature="
+                    + "0" * 128
+                ),
+                "created_on": f"2025-01-{idx + 1:02d} 10:00:00",
+            },
+        )
+
+    def _seed_service_requests(self, customer, appliance_count):
+        for idx in range(max(1, appliance_count // 2)):
+            model_number, _, brand, category, sub_category = _APPLIANCE_CATALOG[
+                idx % len(_APPLIANCE_CATALOG)
+            ]
+
+            self.firestore_client.seed(
+                f"service_requests/onsite/{customer['customer_id']}/20000000000{idx}",
+                {
+                    "appliance_details": {
+                        "brand": brand,
+                        "category": category,
+                        "sub_category": sub_category,
+                        "model_number": model_number,
+                        "serial_number": f"{customer['serial_prefix']}{idx:03d}",
+                        "appliance_image_url": "https://storage.googleapis.com/x.png",
+                    },
+                    "assigned_to": "ENGINEER01",
+                    "assignment_status": "confirmed",
+                    "created_on": f"2025-02-{idx + 1:02d} 09:30:00",
+                    "customer_contact": {
+                        "phone_number": customer["phone_number"],
+                        "email": customer["email"],
+                    },
+                    "description": f"The {sub_category.lower()} stopped working "
+                    "after a power cut and shows an error code on the display.",
+                    "request_title": f"{brand} {sub_category} not working",
+                    "request_type": "Repair",
+                    "resolution": {"action_performed": "", "start_date": ""},
+                    "ticket_status": "open",
+                    "total_cost": "",
+                },
+            )
+
+    def _seed_firestore(self, appliance_count):
+        for customer in self.customers:
+            self._seed_service_requests(customer, appliance_count)
+
+        for model_number, appliance_name, brand, _, sub_category in _APPLIANCE_CATALOG:
+            self.firestore_client.seed(
+                f"appliance_specifications/{model_number}",
+                {
+                    "appliance_name": appliance_name,
+                    "brand": brand,
+                    "sub_category": sub_category,
+                    "dimensions": "70 x 90 x 178 cm",
+                    "power_consumption": "350 kWh/year",
+                },
+            )
+
+    def reset_counters(self):
+        self.sql_round_trips.clear()
+        self.firestore_client.round_trips.clear()
+
+    def counters(self):
+        return {
+            "sql_round_trips": sum(self.sql_round_trips.values()),
+            "firestore_round_trips": self.firestore_client.total_round_trips(),
+        }
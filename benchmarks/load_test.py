@@ -0,0 +1,395 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+# Benchmark runs must not append to the production telemetry files.
+os.environ.setdefault("LLM_TELEMETRY_SINKS", "")
+
+import gc
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+import resource
+import tempfile
+import tracemalloc
+
+from customer_agent.runner import run_adk_async
+from customer_agent.sessions import SqliteSessionService, create_session_service
+from customer_agent.tools.prefetch import prefetch_customer_context
+from customer_agent.tools.tool_cache import get_customer_tool_cache
+
+from .agent_benchmark import AgentBenchmark
+from .fixtures import BenchmarkDataStores
+from .scenarios import BENCHMARK_SCENARIOS
+from .scripted_llm import ScriptPlayer, use_script_player
+
+# run_adk_async swallows agent errors and answers with this apology.
+ADK_ERROR_PREFIX = "Sorry, an error occurred"
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+
+    return ordered[rank - 1]
+
+
+def _latency_summary(values_ms):
+    return {
+        "count": len(values_ms),
+        "p50_ms": round(_percentile(values_ms, 50), 2),
+        "p95_ms": round(_percentile(values_ms, 95), 2),
+        "p99_ms": round(_percentile(values_ms, 99), 2),
+        "max_ms": round(max(values_ms, default=0.0), 2),
+    }
+
+
+class EventLoopLagMonitor:
+    def __init__(self, interval_seconds=0.01):
+        self.interval_seconds = interval_seconds
+        self.lag_ms = []
+
+        self._task = None
+
+    async def _watch(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            scheduled_at = loop.time()
+            await asyncio.sleep(self.interval_seconds)
+
+            # Anything past the requested sleep is time the loop spent
+            # running other callbacks, e.g. a synchronous tool or query.
+            self.lag_ms.append(
+                max(0.0, (loop.time() - scheduled_at - self.interval_seconds) * 1000)
+            )
+
+    def start(self):
+        self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        self._task.cancel()
+
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+class SimulatedCustomer:
+    def __init__(self, customer_context, scenario_names, conversations, think_time_seconds, seed):
+        self.customer_context = customer_context
+        self.customer_id = customer_context["customer_id"]
+        self.scenario_names = scenario_names
+        self.conversations = conversations
+        self.think_time_seconds = think_time_seconds
+
+        self.player = ScriptPlayer(customer_context)
+        self._random = random.Random(seed)
+
+        self.session_ids = []
+        self.setup_ms = []
+        self.turn_ms = []
+        self.llm_calls = 0
+        self.errors = 0
+        self.script_mismatches = 0
+
+    async def _think(self):
+        if self.think_time_seconds:
+            await asyncio.sleep(self.think_time_seconds * self._random.uniform(0.5, 1.5))
+
+    async def _start_session(self, runner, prefetch):
+        # Same steps as initialize_adk on login, minus the Streamlit caching.
+        session_id = f"adk_session_{int(time.time())}_{os.urandom(4).hex()}"
+        initial_state = {
+            "customer_full_name": self.customer_context["customer_full_name"],
+            "customer_id": self.customer_id,
+        }
+
+        started_at = time.perf_counter()
+
+        if prefetch:
+            initial_state.update(
+                await asyncio.to_thread(prefetch_customer_context, self.customer_id)
+            )
+
+        await runner.session_service.create_session(
+            app_name=runner.app_name,
+            user_id=self.customer_id,
+            session_id=session_id,
+            state=initial_state,
+        )
+
+        self.setup_ms.append((time.perf_counter() - started_at) * 1000)
+        self.session_ids.append(session_id)
+
+        return session_id
+
+    async def run(self, runner, prefetch, start_delay_seconds):
+        use_script_player(self.player)
+
+        await asyncio.sleep(start_delay_seconds)
+
+        for conversation in range(self.conversations):
+            scenario_name = self.scenario_names[conversation % len(self.scenario_names)]
+
+            # A scenario starts at the root agent, so every conversation gets
+            # its own session, like a customer logging in again.
+            session_id = await self._start_session(runner, prefetch)
+
+            for turn in BENCHMARK_SCENARIOS[scenario_name]:
+                await self._think()
+
+                self.player.load_turn(turn["steps"])
+                started_at = time.perf_counter()
+
+                response = await run_adk_async(
+                    self.customer_id,
+                    runner,
+                    session_id,
+                    self.player.user_message(turn["user"]),
+                )
+
+                self.turn_ms.append((time.perf_counter() - started_at) * 1000)
+                self.llm_calls += self.player.llm_calls
+                self.script_mismatches += self.player.mismatches
+
+                if response.startswith(ADK_ERROR_PREFIX):
+                    self.errors += 1
+
+
+def _traced_memory_kb():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0] / 1024
+
+
+def _max_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+
+async def run_load_level(
+    users,
+    scenario_names,
+    conversations=1,
+    think_time_seconds=1.0,
+    ramp_up_seconds=0.0,
+    appliance_count=6,
+    llm_latency_seconds=0.5,
+    session_backend="memory",
+    use_router=True,
+    prefetch=True,
+    trace_memory=True,
+    lag_interval_seconds=0.01,
+):
+    with tempfile.TemporaryDirectory(prefix="logiq_load_") as work_dir:
+        if session_backend == "sqlite":
+            session_service = SqliteSessionService(
+                db_path=os.path.join(work_dir, "sessions.db")
+            )
+        else:
+            session_service = create_session_service(session_backend)
+
+        benchmark = AgentBenchmark(
+            appliance_count=appliance_count,
+            llm_latency_seconds=llm_latency_seconds,
+            use_router=use_router,
+            prefetch=prefetch,
+            trace_allocations=False,
+            session_service=session_service,
+        )
+        benchmark.use_data_stores(
+            BenchmarkDataStores(
+                customer_count=users,
+                appliance_count=appliance_count,
+                database_path=os.path.join(work_dir, "customers.db"),
+            )
+        )
+
+        customers = [
+            SimulatedCustomer(
+                customer_context,
+                scenario_names[index % len(scenario_names):]
+                + scenario_names[: index % len(scenario_names)],
+                conversations,
+                think_time_seconds,
+                seed=index,
+            )
+            for index, customer_context in enumerate(benchmark.data_stores.customers)
+        ]
+
+        for customer in customers:
+            get_customer_tool_cache().invalidate(customer.customer_id)
+
+        if trace_memory:
+            tracemalloc.start()
+
+        memory_before_kb = _traced_memory_kb() if trace_memory else 0.0
+
+        lag_monitor = EventLoopLagMonitor(lag_interval_seconds)
+        lag_monitor.start()
+
+        started_at = time.perf_counter()
+
+        try:
+            await asyncio.gather(
+                *(
+                    customer.run(
+                        benchmark.runner,
+                        prefetch,
+                        ramp_up_seconds * index / max(1, users),
+                    )
+                    for index, customer in enumerate(customers)
+                )
+            )
+
+        finally:
+            elapsed_seconds = time.perf_counter() - started_at
+            await lag_monitor.stop()
+
+        session_memory_kb = 0.0
+        if trace_memory:
+            # Sessions are still held by the session service here, so what
+            # is left above the starting point is what they keep alive.
+            session_memory_kb = _traced_memory_kb() - memory_before_kb
+            tracemalloc.stop()
+
+        session_count = sum(len(customer.session_ids) for customer in customers)
+        turn_ms = [ms for customer in customers for ms in customer.turn_ms]
+        turns = len(turn_ms)
+
+        return {
+            "users": users,
+            "session_backend": session_backend,
+            "elapsed_seconds": round(elapsed_seconds, 3),
+            "sessions": session_count,
+            "turns": turns,
+            "errors": sum(customer.errors for customer in customers),
+            "script_mismatches": sum(customer.script_mismatches for customer in customers),
+            "throughput_turns_per_second": round(turns / elapsed_seconds, 2)
+            if elapsed_seconds
+            else 0.0,
+            "llm_calls_per_turn": round(
+                sum(customer.llm_calls for customer in customers) / max(1, turns), 2
+            ),
+            "turn_latency": _latency_summary(turn_ms),
+            "session_setup_latency": _latency_summary(
+                [ms for customer in customers for ms in customer.setup_ms]
+            ),
+            "event_loop_lag": _latency_summary(lag_monitor.lag_ms),
+            "memory_per_session_kb": round(session_memory_kb / max(1, session_count), 1),
+            "max_rss_mb": round(_max_rss_mb(), 1),
+            **benchmark.data_stores.counters(),
+        }
+
+
+def print_report(results):
+    header = (
+        f"{'users':>6}{'turns':>7}{'err':>5}{'turn/s':>8}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'p99 ms':>9}{'lag p95':>9}{'lag max':>9}{'KB/sess':>9}{'rss MB':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+
+    for result in results:
+        print(
+            f"{result['users']:>6}{result['turns']:>7}{result['errors']:>5}"
+            f"{result['throughput_turns_per_second']:>8.2f}"
+            f"{result['turn_latency']['p50_ms']:>9.1f}"
+            f"{result['turn_latency']['p95_ms']:>9.1f}"
+            f"{result['turn_latency']['p99_ms']:>9.1f}"
+            f"{result['event_loop_lag']['p95_ms']:>9.1f}"
+            f"{result['event_loop_lag']['max_ms']:>9.1f}"
+            f"{result['memory_per_session_kb']:>9.1f}"
+            f"{result['max_rss_mb']:>8.1f}"
+        )
+
+        if result["script_mismatches"]:
+            print(f"{'':>6}! {result['script_mismatches']} unscripted model call(s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Drive many simulated customers through the customer agent "
+        "runner at once with a fake LLM and local data stores."
+    )
+    parser.add_argument(
+        "--users",
+        default="1,10,50",
+        help="Comma-separated concurrency levels; each level is a separate run.",
+    )
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(BENCHMARK_SCENARIOS),
+        help="Scenario mix (repeatable). Defaults to all scenarios.",
+    )
+    parser.add_argument("--conversations", type=int, default=2)
+    parser.add_argument("--think-time-ms", type=float, default=1000.0)
+    parser.add_argument("--ramp-up-seconds", type=float, default=0.0)
+    parser.add_argument("--appliances", type=int, default=6)
+    parser.add_argument("--llm-latency-ms", type=float, default=500.0)
+    parser.add_argument(
+        "--session-backend", choices=("memory", "sqlite"), default="memory"
+    )
+    parser.add_argument("--no-router", action="store_true")
+    parser.add_argument("--no-prefetch", action="store_true")
+    parser.add_argument("--skip-memory", action="store_true")
+    parser.add_argument("--output", help="Write the per-level results as JSON.")
+    args = parser.parse_args(argv)
+
+    scenario_names = args.scenario or list(BENCHMARK_SCENARIOS)
+
+    results = []
+    for users in (int(level) for level in args.users.split(",") if level.strip()):
+        results.append(
+            asyncio.run(
+                run_load_level(
+                    users,
+                    scenario_names,
+                    conversations=max(1, args.conversations),
+                    think_time_seconds=args.think_time_ms / 1000,
+                    ramp_up_seconds=args.ramp_up_seconds,
+                    appliance_count=args.appliances,
+                    llm_latency_seconds=args.llm_latency_ms / 1000,
+                    session_backend=args.session_backend,
+                    use_router=not args.no_router,
+                    prefetch=not args.no_prefetch,
+                    trace_memory=not args.skip_memory,
+                )
+            )
+        )
+
+    print_report(results)
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump({"config": vars(args), "results": results}, output_file, indent=2)
+
+    return 1 if any(result["errors"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
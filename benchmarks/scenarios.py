@@ -0,0 +1,179 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Each turn lists the model steps the fake LLM plays back, in order: a
+# transfer to another agent, a tool call, or the final text. "{customer_id}"
+# and friends are filled in from the customer's benchmark context, in the
+# user message as well as in the steps.
+BENCHMARK_SCENARIOS = {
+    "appliance_overview": [
+        {
+            "user": "Show my appliances",
+            "steps": [
+                {"agent": "customer_agent", "transfer": "customer_appliances_agent"},
+                {
+                    "agent": "customer_appliances_agent",
+                    "tool": "get_all_customer_appliances_tool",
+                    "args": {"customer_id": "{customer_id}", "limit": -1},
+                },
+                {
+                    "agent": "customer_appliances_agent",
+                    "text": "You have the following appliances registered.",
+                },
+            ],
+        },
+        {
+            "user": "What are the specifications of my refrigerator?",
+            "steps": [
+                {
+                    "agent": "customer_appliances_agent",
+                    "tool": "get_appliance_specifications_tool",
+                    "args": {"model_number": "LRFXS2503S"},
+                },
+                {
+                    "agent": "customer_appliances_agent",
+                    "text": "Here are the specifications of your refrigerator.",
+                },
+            ],
+        },
+        {
+            "user": "Is it still under warranty?",
+            "steps": [
+                {
+                    "agent": "customer_appliances_agent",
+                    "tool": "get_all_customer_appliances_tool",
+                    "args": {"customer_id": "{customer_id}", "limit": -1},
+                },
+                {
+                    "agent": "customer_appliances_agent",
+                    "text": "Yes, your refrigerator is under warranty.",
+                },
+            ],
+        },
+    ],
+    "service_request_status": [
+        {
+            "user": "What is the status of my service requests?",
+            "steps": [
+                {"agent": "customer_agent", "transfer": "service_requests_agent"},
+                {
+                    "agent": "service_requests_agent",
+                    "tool": "get_all_service_requests_briefs_tool",
+                    "args": {"customer_id": "{customer_id}", "limit": -1},
+                },
+                {
+                    "agent": "service_requests_agent",
+                    "text": "You have the following service requests.",
+                },
+            ],
+        },
+        {
+            "user": "Show me the details of the first one",
+            "steps": [
+                {
+                    "agent": "service_requests_agent",
+                    "tool": "get_service_request_details_tool",
+                    "args": {
+                        "customer_id": "{customer_id}",
+                        "request_id": "200000000000",
+                    },
+                },
+                {
+                    "agent": "service_requests_agent",
+                    "text": "An engineer has been assigned to your request.",
+                },
+            ],
+        },
+    ],
+    "update_phone_number": [
+        {
+            "user": "Update my phone number to {new_phone_number}",
+            "steps": [
+                {"agent": "customer_agent", "transfer": "update_customer_profile_agent"},
+                {
+                    "agent": "update_customer_profile_agent",
+                    "tool": "get_customer_details_tool",
+                    "args": {"customer_id": "{customer_id}"},
+                },
+                {
+                    "agent": "update_customer_profile_agent",
+                    "text": "Please confirm the new phone number {new_phone_number}.",
+                },
+            ],
+        },
+        {
+            "user": "Yes, confirm",
+            "steps": [
+                {
+                    "agent": "update_customer_profile_agent",
+                    "tool": "update_customer_details_tool",
+                    "args": {
+                        "customer_id": "{customer_id}",
+                        "updates": {"phone_number": "{new_phone_number}"},
+                    },
+                },
+                {
+                    "agent": "update_customer_profile_agent",
+                    "text": "Your phone number has been updated.",
+                },
+            ],
+        },
+    ],
+    "register_service_request": [
+        {
+            "user": "My washing machine is broken, can someone come fix it?",
+            "steps": [
+                {
+                    "agent": "customer_agent",
+                    "transfer": "register_onsite_service_request_agent",
+                },
+                {
+                    "agent": "register_onsite_service_request_agent",
+                    "tool": "get_all_customer_appliances_tool",
+                    "args": {"customer_id": "{customer_id}", "limit": -1},
+                },
+                {
+                    "agent": "register_onsite_service_request_agent",
+                    "text": "Which washing machine needs service?",
+                },
+            ],
+        },
+        {
+            "user": "The LG one, serial {serial_prefix}001. It does not spin.",
+            "steps": [
+                {
+                    "agent": "register_onsite_service_request_agent",
+                    "tool": "register_onsite_service_request_tool",
+                    "args": {
+                        "customer_id": "{customer_id}",
+                        "serial_number": "{serial_prefix}001",
+                        "request_type": "Repair",
+                        "issue_description": "The drum does not spin.",
+                        "request_title": "Washing machine not spinning",
+                        "phone_number": "{phone_number}",
+                        "email": "{email}",
+                        "street": "12 MG Road",
+                        "city": "Kochi",
+                        "state": "Kerala",
+                        "zipcode": "682001",
+                    },
+                },
+                {
+                    "agent": "register_onsite_service_request_agent",
+                    "text": "Your service request has been registered.",
+                },
+            ],
+        },
+    ],
+}
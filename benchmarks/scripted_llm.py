@@ -0,0 +1,146 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+
+
+def _fill_placeholders(value: Any, context: Dict) -> Any:
+    if isinstance(value, str):
+        return value.format(**context)
+
+    if isinstance(value, dict):
+        return {key: _fill_placeholders(item, context) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [_fill_placeholders(item, context) for item in value]
+
+    return value
+
+
+class ScriptPlayer:
+    def __init__(self, context: Dict):
+        self.context = context
+
+        self._steps: List[Dict] = []
+        self._lock = threading.Lock()
+
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.skipped_transfers = 0
+        self.mismatches = 0
+
+    def user_message(self, text: str) -> str:
+        return _fill_placeholders(text, self.context)
+
+    def load_turn(self, steps: List[Dict]):
+        with self._lock:
+            self._steps = list(steps)
+            self.llm_calls = 0
+            self.prompt_tokens = 0
+            self.skipped_transfers = 0
+            self.mismatches = 0
+
+    def next_step(self, agent_name: str, prompt_tokens: int = 0) -> Dict:
+        with self._lock:
+            self.llm_calls += 1
+            self.prompt_tokens += prompt_tokens
+
+            while self._steps:
+                step = self._steps.pop(0)
+
+                if step["agent"] == agent_name:
+                    return step
+
+                # The intent router can start the turn at the sub-agent the
+                # root agent would have transferred to; that hop is skipped.
+                if step.get("transfer") == agent_name:
+                    self.skipped_transfers += 1
+                    continue
+
+                self.mismatches += 1
+                return {"agent": agent_name, "text": f"[unscripted {agent_name}]"}
+
+            return {"agent": agent_name, "text": "Is there anything else I can help with?"}
+
+
+# Agents and their models are shared by every session, so concurrent
+# simulated customers each bind their own player to the asyncio task that
+# drives them; tasks copy the context, so the binding follows the run.
+_active_player: ContextVar[Optional[ScriptPlayer]] = ContextVar(
+    "benchmark_script_player", default=None
+)
+
+
+def use_script_player(player: ScriptPlayer):
+    return _active_player.set(player)
+
+
+class ScriptedLlm(BaseLlm):
+    agent_name: str
+    player: Optional[ScriptPlayer] = None
+    latency_seconds: float = 0.0
+
+    def _response_for(self, step: Dict, player: ScriptPlayer) -> types.Content:
+        if "transfer" in step:
+            function_call = types.FunctionCall(
+                name="transfer_to_agent", args={"agent_name": step["transfer"]}
+            )
+            return types.Content(role="model", parts=[types.Part(function_call=function_call)])
+
+        if "tool" in step:
+            function_call = types.FunctionCall(
+                name=step["tool"],
+                args=_fill_placeholders(step.get("args", {}), player.context),
+            )
+            return types.Content(role="model", parts=[types.Part(function_call=function_call)])
+
+        return types.Content(
+            role="model",
+            parts=[types.Part(text=_fill_placeholders(step["text"], player.context))],
+        )
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        player = _active_player.get() or self.player
+
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+
+        # Same chars/4 estimate the payload stats use, so tool payload and
+        # history growth show up as prompt tokens in the telemetry.
+        prompt_tokens = (
+            sum(
+                len(content.model_dump_json(exclude_none=True))
+                for content in llm_request.contents
+            )
+            + len(str(llm_request.config.system_instruction or ""))
+        ) // 4
+
+        yield LlmResponse(
+            content=self._response_for(
+                player.next_step(self.agent_name, prompt_tokens), player
+            ),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=16,
+                total_token_count=prompt_tokens + 16,
+            ),
+        )
@@ -0,0 +1,228 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import urllib.request
+
+from database.cloud_storage.document_storage import CustomerRecordsBucket
+from database.cloud_storage.multimedia_storage import ProfilePicturesBucket
+from database.cloud_storage.signed_urls import get_signed_url_cache
+from database.cloud_storage.storage_backend import (
+    LocalStorageBackend,
+    set_storage_backend,
+)
+
+# Each operation runs through the same bucket classes the apps use, against
+# a throwaway local backend, so only the code path is measured.
+OPERATIONS = (
+    "upload_invoice",
+    "download_invoice",
+    "sign_invoice_url",
+    "fetch_signed_url",
+    "upload_profile_picture",
+    "sign_profile_picture_urls",
+)
+
+
+def _timed(samples, operation, function):
+    started_at = time.perf_counter()
+    result = function()
+    samples.setdefault(operation, []).append(
+        (time.perf_counter() - started_at) * 1000
+    )
+
+    return result
+
+
+def run_storage_benchmark(file_count=50, file_size_kb=256, fetch_urls=True):
+    samples = {}
+    payload = os.urandom(file_size_kb * 1024)
+
+    with tempfile.TemporaryDirectory(prefix="storage-benchmark-") as root:
+        backend = LocalStorageBackend(os.path.join(root, "buckets"))
+        previous_backend = set_storage_backend(backend)
+
+        try:
+            customer_records_bucket = CustomerRecordsBucket()
+            profile_pictures_bucket = ProfilePicturesBucket()
+
+            downloaded_file_path = os.path.join(root, "downloaded_invoice.pdf")
+
+            for index in range(file_count):
+                serial_number = f"SN{index:05d}"
+
+                _timed(
+                    samples,
+                    "upload_invoice",
+                    lambda: customer_records_bucket.upload_purchase_invoice(
+                        "BENCH", serial_number, "Refrigerator", io.BytesIO(payload)
+                    ),
+                )
+
+                _timed(
+                    samples,
+                    "download_invoice",
+                    lambda: customer_records_bucket.download_purchase_invoice(
+                        "BENCH", serial_number, "Refrigerator", downloaded_file_path
+                    ),
+                )
+
+                url = _timed(
+                    samples,
+                    "sign_invoice_url",
+                    lambda: customer_records_bucket.fetch_product_invoice_url(
+                        "BENCH", serial_number, "Refrigerator"
+                    ),
+                )
+
+                if fetch_urls:
+                    body = _timed(
+                        samples,
+                        "fetch_signed_url",
+                        lambda: urllib.request.urlopen(url).read(),
+                    )
+
+                    if body != payload:
+                        raise RuntimeError(f"{serial_number} came back corrupted")
+
+                _timed(
+                    samples,
+                    "upload_profile_picture",
+                    lambda: profile_pictures_bucket.upload_profile_picture(
+                        "customer", f"BENCH{index:05d}", io.BytesIO(payload[:16384])
+                    ),
+                )
+
+            user_ids = [f"BENCH{index:05d}" for index in range(file_count)]
+            _timed(
+                samples,
+                "sign_profile_picture_urls",
+                lambda: profile_pictures_bucket.fetch_profile_picture_urls(
+                    "customer", user_ids
+                ),
+            )
+
+        finally:
+            set_storage_backend(previous_backend)
+            backend.close()
+
+    summary = {}
+    for operation in OPERATIONS:
+        if operation not in samples:
+            continue
+
+        timings = sorted(samples[operation])
+        summary[operation] = {
+            "count": len(timings),
+            "mean_ms": round(statistics.fmean(timings), 3),
+            "p95_ms": round(timings[max(0, int(len(timings) * 0.95) - 1)], 3),
+            "mb_per_s": round(
+                len(timings) * file_size_kb / 1024 / (sum(timings) / 1000), 1
+            )
+            if operation in ("upload_invoice", "download_invoice", "fetch_signed_url")
+            and sum(timings)
+            else None,
+        }
+
+    summary["signed_url_cache"] = get_signed_url_cache().stats()
+    return summary
+
+
+def compare_to_baseline(summary, baseline_summary, tolerance):
+    regressions = []
+
+    for operation in OPERATIONS:
+        current = summary.get(operation)
+        baseline = baseline_summary.get(operation)
+
+        if not current or not baseline or not baseline["mean_ms"]:
+            continue
+
+        if current["mean_ms"] > baseline["mean_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{operation}: mean_ms {baseline['mean_ms']} -> "
+                f"{current['mean_ms']} (> {tolerance:.0%} slower)"
+            )
+
+    return regressions
+
+
+def print_report(summary):
+    header = f"{'operation':<28}{'count':>7}{'mean ms':>10}{'p95 ms':>10}{'MB/s':>8}"
+    print(header)
+    print("-" * len(header))
+
+    for operation in OPERATIONS:
+        if operation not in summary:
+            continue
+
+        row = summary[operation]
+        print(
+            f"{operation:<28}{row['count']:>7}{row['mean_ms']:>10.3f}"
+            f"{row['p95_ms']:>10.3f}{row['mb_per_s'] or '':>8}"
+        )
+
+    print(f"signed URL cache: {summary['signed_url_cache']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure uploads, downloads and signed URLs through the "
+        "storage bucket classes on the local filesystem backend."
+    )
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--file-size-kb", type=int, default=256)
+    parser.add_argument("--skip-fetch", action="store_true")
+    parser.add_argument("--output", help="Write the summary as JSON.")
+    parser.add_argument("--baseline", help="JSON output of an earlier run to compare.")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    summary = run_storage_benchmark(
+        file_count=args.files,
+        file_size_kb=args.file_size_kb,
+        fetch_urls=not args.skip_fetch,
+    )
+
+    print_report(summary)
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump({"config": vars(args), "summary": summary}, output_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline_summary = json.load(baseline_file)["summary"]
+
+        regressions = compare_to_baseline(summary, baseline_summary, args.tolerance)
+
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
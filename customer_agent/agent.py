@@ -12,15 +12,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import os
 import warnings
 
 from google.genai import types
 from google.adk.agents import Agent
-from google.adk.models.lite_llm import LiteLlm
 
-from .config import MODEL_DEEPSEEK_V3, MODEL_MAX_TOKENS, MODEL_TEMPERATURE
+from .config import MODEL_MAX_TOKENS, MODEL_TEMPERATURE
+from .model_routing import build_tiered_model
 from .prompts import ROOT_AGENT_INSTRUCTIONS, GLOBAL_INSTRUCTIONS
+from .telemetry import (
+    after_model_telemetry_callback,
+    before_model_telemetry_callback,
+)
 
 from .sub_agents.appliance_support_and_troubleshooting_agent.agent import (
     appliance_support_and_troubleshooting_agent,
@@ -41,10 +44,7 @@ warnings.filterwarnings("ignore")
 
 root_agent = Agent(
     name="customer_agent",
-    model=LiteLlm(
-        model=MODEL_DEEPSEEK_V3,
-        api_key=os.getenv("OPENROUTER_API_KEY")
-    ),
+    model=build_tiered_model("customer_agent"),
     description="""
     Customer service agent for LogIQ - a customer support application for 
     household appliances like refrigerators, gas ranges, microwave ovens etc.
@@ -65,4 +65,6 @@ root_agent = Agent(
         update_customer_profile_agent,
     ],
     global_instruction=GLOBAL_INSTRUCTIONS,
+    before_model_callback=before_model_telemetry_callback,
+    after_model_callback=after_model_telemetry_callback,
 )
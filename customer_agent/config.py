@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+
 MODEL_MAX_TOKENS: int = 4096
 MODEL_TEMPERATURE: float = 0.2
 
@@ -21,3 +23,78 @@ MODEL_GEMINI_2_FLASH_LITE: str = "gemini-2.0-flash-001"
 
 MODEL_DEEPSEEK_V3: str = "openrouter/deepseek/deepseek-chat-v3-0324:free"
 MODEL_MISTRAL_SMALL_3_2: str = "openrouter/mistralai/mistral-small-3.2-24b-instruct:free"
+
+SESSION_BACKEND: str = os.getenv("ADK_SESSION_BACKEND", "sqlite")
+SESSION_SQLITE_PATH: str = os.getenv("ADK_SESSION_SQLITE_PATH", ".adk/sessions.db")
+SESSION_DATABASE_URL: str = os.getenv("ADK_SESSION_DATABASE_URL", "")
+
+SESSION_MAX_STATE_BYTES: int = 256 * 1024
+SESSION_MAX_EVENTS: int = 80
+SESSION_IDLE_TTL_SECONDS: int = 24 * 60 * 60
+SESSION_EVICTION_INTERVAL_SECONDS: int = 10 * 60
+SESSION_PROTECTED_STATE_KEYS: tuple = (
+    "customer_id",
+    "customer_full_name",
+    "start_time",
+    "current_date",
+)
+
+CUSTOMER_CONTEXT_TTL_SECONDS: int = 5 * 60
+CUSTOMER_CONTEXT_PREFETCH_TIMEOUT_SECONDS: int = 10
+
+TOOL_CACHE_TTL_SECONDS: int = 60
+TOOL_CACHE_MAX_ENTRIES: int = 2048
+
+INTENT_ROUTER_ENABLED: bool = (
+    os.getenv("ADK_INTENT_ROUTER_ENABLED", "true").lower() == "true"
+)
+INTENT_ROUTER_CONFIDENCE_THRESHOLD: float = 0.85
+INTENT_ROUTER_MIN_KNOWN_TOKENS: int = 2
+INTENT_ROUTER_MAX_HISTORY_EXAMPLES: int = 5000
+# RoutedRunner overrides Runner._find_agent_to_run, which ADK keeps private;
+# it has been checked against these releases only.
+INTENT_ROUTER_SUPPORTED_ADK_VERSIONS: tuple = ("1.1.1",)
+
+MODEL_FINAL_TIER_TIMEOUT_SECONDS: float = 60.0
+MODEL_RATE_LIMIT_COOLDOWN_SECONDS: float = 60.0
+
+# Each agent tries its models in order; every tier but the last must start
+# responding within the latency budget or the next tier takes over.
+AGENT_MODEL_TIERS: dict = {
+    "customer_agent": {
+        "models": [MODEL_DEEPSEEK_V3, MODEL_GEMINI_2_FLASH_LITE],
+        "latency_budget_seconds": 8.0,
+    },
+    "appliance_support_and_troubleshooting_agent": {
+        "models": [MODEL_GEMINI_2_5_FLASH, MODEL_GEMINI_2_FLASH_LITE],
+        "latency_budget_seconds": 20.0,
+    },
+    "customer_appliances_agent": {
+        "models": [MODEL_MISTRAL_SMALL_3_2, MODEL_GEMINI_2_5_FLASH],
+        "latency_budget_seconds": 10.0,
+    },
+    "product_enquiry_agent": {
+        "models": [MODEL_GEMINI_2_FLASH_LITE, MODEL_GEMINI_2_5_FLASH],
+        "latency_budget_seconds": 10.0,
+    },
+    "register_appliance_agent": {
+        "models": [MODEL_GEMINI_2_5_PRO, MODEL_GEMINI_2_5_FLASH],
+        "latency_budget_seconds": 25.0,
+    },
+    "register_onsite_service_request_agent": {
+        "models": [MODEL_GEMINI_2_5_PRO, MODEL_GEMINI_2_5_FLASH],
+        "latency_budget_seconds": 25.0,
+    },
+    "service_requests_agent": {
+        "models": [MODEL_GEMINI_2_5_FLASH, MODEL_GEMINI_2_FLASH_LITE],
+        "latency_budget_seconds": 12.0,
+    },
+    "update_customer_profile_agent": {
+        "models": [MODEL_GEMINI_2_5_FLASH, MODEL_GEMINI_2_FLASH_LITE],
+        "latency_budget_seconds": 12.0,
+    },
+}
+
+TOOL_PAYLOAD_BRIEF_MAX_STRING_LENGTH: int = 200
+TOOL_PAYLOAD_DETAIL_MAX_STRING_LENGTH: int = 1000
+TOOL_PAYLOAD_DETAIL_MAX_LIMIT: int = 3
@@ -0,0 +1,121 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import atexit
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional
+
+
+class BackgroundEventLoop:
+    def __init__(self, name: str = "adk-event-loop"):
+        self.name = name
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+
+    def _run_forever(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        self._loop = loop
+        self._started.set()
+
+        try:
+            loop.run_forever()
+
+        finally:
+            pending_tasks = asyncio.all_tasks(loop)
+
+            for task in pending_tasks:
+                task.cancel()
+
+            if pending_tasks:
+                loop.run_until_complete(
+                    asyncio.gather(*pending_tasks, return_exceptions=True)
+                )
+
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            self._started.clear()
+            self._thread = threading.Thread(
+                target=self._run_forever, name=self.name, daemon=True
+            )
+            self._thread.start()
+
+        self._started.wait()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self.start()
+        return self._loop
+
+    def in_loop_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def submit(self, coro: Coroutine) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError(
+                "BackgroundEventLoop.run() cannot block on its own loop thread; "
+                "await the coroutine instead."
+            )
+
+        future = self.submit(coro)
+
+        try:
+            return future.result(timeout=timeout)
+
+        except BaseException:
+            future.cancel()
+            raise
+
+    def stop(self, timeout: float = 5.0):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                return
+
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+
+_background_event_loop = None
+_background_event_loop_lock = threading.Lock()
+
+
+def get_background_event_loop() -> BackgroundEventLoop:
+    global _background_event_loop
+
+    if _background_event_loop is None:
+        with _background_event_loop_lock:
+            if _background_event_loop is None:
+                _background_event_loop = BackgroundEventLoop()
+                _background_event_loop.start()
+
+                atexit.register(_background_event_loop.stop)
+
+    return _background_event_loop
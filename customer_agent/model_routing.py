@@ -0,0 +1,182 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from typing import AsyncGenerator, Dict, List
+
+from google.adk.models import BaseLlm, LLMRegistry, LlmRequest, LlmResponse
+from google.adk.models.lite_llm import LiteLlm
+
+from .config import (
+    AGENT_MODEL_TIERS,
+    MODEL_FINAL_TIER_TIMEOUT_SECONDS,
+    MODEL_RATE_LIMIT_COOLDOWN_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+_RATE_LIMIT_MARKERS = ("429", "rate limit", "ratelimit", "resource_exhausted", "quota")
+
+_model_cooldowns: Dict[str, float] = {}
+_model_cooldowns_lock = threading.Lock()
+
+
+def _failure_reason(error) -> str:
+    if isinstance(error, TimeoutError):
+        return "timeout"
+
+    if isinstance(error, StopAsyncIteration):
+        return "empty_response"
+
+    error_text = f"{type(error).__name__} {error}".lower()
+
+    if any(marker in error_text for marker in _RATE_LIMIT_MARKERS):
+        return "rate_limit"
+
+    return "error"
+
+
+def _cool_down(model_name: str, cooldown_seconds: float):
+    with _model_cooldowns_lock:
+        _model_cooldowns[model_name] = time.monotonic() + cooldown_seconds
+
+
+def _is_cooling_down(model_name: str) -> bool:
+    with _model_cooldowns_lock:
+        return _model_cooldowns.get(model_name, 0.0) > time.monotonic()
+
+
+class FallbackLlm(BaseLlm):
+    agent_name: str
+    tiers: List[BaseLlm]
+    latency_budget_seconds: float
+    final_tier_timeout_seconds: float = MODEL_FINAL_TIER_TIMEOUT_SECONDS
+    rate_limit_cooldown_seconds: float = MODEL_RATE_LIMIT_COOLDOWN_SECONDS
+
+    def _available_tiers(self):
+        available_tiers = [
+            (tier_index, tier_llm)
+            for tier_index, tier_llm in enumerate(self.tiers)
+            if not _is_cooling_down(tier_llm.model)
+        ]
+
+        # With every tier rate limited, trying them all beats failing outright.
+        return available_tiers or list(enumerate(self.tiers))
+
+    @staticmethod
+    async def _close(responses):
+        try:
+            await responses.aclose()
+
+        except Exception as error:
+            pass
+
+    @staticmethod
+    def _annotate(llm_response: LlmResponse, routing_metadata: Dict) -> LlmResponse:
+        llm_response.custom_metadata = {
+            **(llm_response.custom_metadata or {}),
+            **routing_metadata,
+        }
+        return llm_response
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        available_tiers = self._available_tiers()
+        fallback_reasons = []
+
+        for position, (tier_index, tier_llm) in enumerate(available_tiers):
+            is_final_tier = position == len(available_tiers) - 1
+            timeout_seconds = (
+                self.final_tier_timeout_seconds
+                if is_final_tier
+                else self.latency_budget_seconds
+            )
+
+            tier_request = llm_request.model_copy(
+                update={
+                    "model": tier_llm.model,
+                    "contents": list(llm_request.contents),
+                }
+            )
+            responses = tier_llm.generate_content_async(tier_request, stream=stream)
+
+            # Fail-over is only possible until the first response has been
+            # handed to the caller, so the budget bounds time to first token.
+            try:
+                first_response = await asyncio.wait_for(
+                    responses.__anext__(), timeout_seconds
+                )
+
+                if first_response.error_code and not is_final_tier:
+                    raise RuntimeError(
+                        f"{first_response.error_code}: {first_response.error_message}"
+                    )
+
+            except Exception as error:
+                await self._close(responses)
+
+                reason = _failure_reason(error)
+                fallback_reasons.append({"model": tier_llm.model, "reason": reason})
+
+                if reason == "rate_limit":
+                    _cool_down(tier_llm.model, self.rate_limit_cooldown_seconds)
+
+                logger.warning(
+                    "Model %s failed for %s (%s): %s",
+                    tier_llm.model, self.agent_name, reason, error,
+                )
+
+                if not is_final_tier:
+                    continue
+
+                if reason == "empty_response":
+                    return
+
+                raise
+
+            routing_metadata = {
+                "model_tier": tier_index,
+                "served_by_model": tier_llm.model,
+                "fallback_reasons": fallback_reasons,
+            }
+
+            yield self._annotate(first_response, routing_metadata)
+
+            async for llm_response in responses:
+                yield self._annotate(llm_response, routing_metadata)
+
+            return
+
+
+def _build_model(model_name: str) -> BaseLlm:
+    if model_name.startswith("openrouter/"):
+        return LiteLlm(model=model_name, api_key=os.getenv("OPENROUTER_API_KEY"))
+
+    return LLMRegistry.new_llm(model_name)
+
+
+def build_tiered_model(agent_name: str) -> FallbackLlm:
+    tier_config = AGENT_MODEL_TIERS[agent_name]
+
+    return FallbackLlm(
+        model=tier_config["models"][0],
+        agent_name=agent_name,
+        tiers=[_build_model(model_name) for model_name in tier_config["models"]],
+        latency_budget_seconds=tier_config["latency_budget_seconds"],
+    )
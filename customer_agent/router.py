@@ -0,0 +1,475 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import re
+import json
+import math
+import logging
+import inspect
+import sqlite3
+import threading
+from importlib.metadata import PackageNotFoundError, version
+from collections import Counter, OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from google.adk.agents import BaseAgent
+from google.adk.runners import Runner
+from google.adk.sessions import Session
+
+from .config import (
+    INTENT_ROUTER_CONFIDENCE_THRESHOLD,
+    INTENT_ROUTER_MAX_HISTORY_EXAMPLES,
+    INTENT_ROUTER_MIN_KNOWN_TOKENS,
+    INTENT_ROUTER_SUPPORTED_ADK_VERSIONS,
+    SESSION_BACKEND,
+    SESSION_SQLITE_PATH,
+)
+from .router_examples import INTENT_ROUTER_SEED_EXAMPLES
+
+logger = logging.getLogger(__name__)
+
+_APPLIANCE_PATTERN = (
+    r"(appliances?|refrigerators?|fridge|freezer|washing machine|washer|dryer"
+    r"|oven|microwave|dishwasher|gas range|stove|air conditioner|ac)"
+)
+
+INTENT_ROUTER_RULES = {
+    "appliance_support_and_troubleshooting_agent": [
+        r"\berror(?: code)?\s*[a-z]{0,2}-?\d+\b",
+        r"\b(?:not|isn'?t|won'?t|doesn'?t|stopped|not properly) (?:working|cooling"
+        r"|heating|draining|spinning|turning on|starting|igniting)\b",
+        r"\b(?:leaking|making (?:a )?(?:loud )?(?:noise|sound)|troubleshoot)\b",
+    ],
+    "customer_appliances_agent": [
+        rf"\b(?:show|list|view|see)\b.*\bmy (?:registered )?{_APPLIANCE_PATTERN}\b",
+        r"\bwhat appliances do i (?:have|own)\b",
+        rf"\bwarranty\b.*\bmy {_APPLIANCE_PATTERN}\b",
+        rf"\bmy {_APPLIANCE_PATTERN}\b.*\bwarranty\b",
+    ],
+    "product_enquiry_agent": [
+        r"\b(?:models?|brands?)\b.*\b(?:does logiq|do you|you) (?:sell|offer|have)\b",
+        r"\b(?:your|logiq) (?:catalog|catalogue|products)\b",
+        r"\benergy rating\b",
+    ],
+    "register_appliance_agent": [
+        rf"\b(?:register|add|link)\b(?!.*\b(?:service|repair|request|technician"
+        rf"|engineer)\b).*\b{_APPLIANCE_PATTERN}\b",
+    ],
+    "register_onsite_service_request_agent": [
+        r"\b(?:book|schedule|raise|create|register|open|log|new)\b.*\b(?:service "
+        r"(?:request|visit|appointment)|onsite service|repair (?:visit|ticket))\b",
+        r"\b(?:need|send) (?:a |an )?(?:technician|engineer|repairman)\b",
+        r"\bsomeone (?:to )?come\b",
+    ],
+    "service_requests_agent": [
+        r"\b(?:status|track|cancel|reschedule)\b.*\b(?:service request|request"
+        r"|ticket|appointment|repair)\b",
+        r"\b(?:show|list|view)\b.*\bmy (?:open |pending )?(?:service )?requests\b",
+    ],
+    "update_customer_profile_agent": [
+        r"\b(?:change|update|edit|modify|correct)\b.*\bmy (?:home )?(?:address"
+        r"|phone(?: number)?|mobile(?: number)?|contact(?: number)?|e-?mail"
+        r"|name|pincode|profile)\b",
+    ],
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text: str) -> List[str]:
+    words = _TOKEN_PATTERN.findall(text.lower())
+    bigrams = [f"{first}_{second}" for first, second in zip(words, words[1:])]
+
+    return words + bigrams
+
+
+class NaiveBayesIntentClassifier:
+    def __init__(self, alpha: float = 1.0):
+        self.alpha = alpha
+
+        self.labels: List[str] = []
+        self.vocabulary: set = set()
+
+        self._label_counts: Counter = Counter()
+        self._token_counts: Dict[str, Counter] = defaultdict(Counter)
+        self._token_totals: Counter = Counter()
+
+    def fit(self, examples: Iterable[Tuple[str, str]]):
+        for utterance, label in examples:
+            tokens = tokenize(utterance)
+
+            if not tokens:
+                continue
+
+            self._label_counts[label] += 1
+            self._token_counts[label].update(tokens)
+            self._token_totals[label] += len(tokens)
+            self.vocabulary.update(tokens)
+
+        self.labels = sorted(self._label_counts)
+
+        return self
+
+    def known_tokens(self, text: str) -> List[str]:
+        return [token for token in tokenize(text) if token in self.vocabulary]
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        tokens = self.known_tokens(text)
+
+        if not self.labels:
+            return {}
+
+        total_examples = sum(self._label_counts.values())
+        vocabulary_size = len(self.vocabulary)
+
+        log_scores = {}
+        for label in self.labels:
+            log_score = math.log(self._label_counts[label] / total_examples)
+            denominator = self._token_totals[label] + self.alpha * vocabulary_size
+
+            for token in tokens:
+                log_score += math.log(
+                    (self._token_counts[label][token] + self.alpha) / denominator
+                )
+
+            log_scores[label] = log_score
+
+        max_log_score = max(log_scores.values())
+        exp_scores = {
+            label: math.exp(log_score - max_log_score)
+            for label, log_score in log_scores.items()
+        }
+        normalizer = sum(exp_scores.values())
+
+        return {label: score / normalizer for label, score in exp_scores.items()}
+
+    def to_dict(self) -> Dict:
+        return {
+            "alpha": self.alpha,
+            "label_counts": dict(self._label_counts),
+            "token_counts": {
+                label: dict(counts) for label, counts in self._token_counts.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "NaiveBayesIntentClassifier":
+        classifier = cls(alpha=data.get("alpha", 1.0))
+
+        classifier._label_counts = Counter(data["label_counts"])
+
+        for label, counts in data["token_counts"].items():
+            classifier._token_counts[label] = Counter(counts)
+            classifier._token_totals[label] = sum(counts.values())
+            classifier.vocabulary.update(counts)
+
+        classifier.labels = sorted(classifier._label_counts)
+
+        return classifier
+
+
+def harvest_routing_examples(
+    db_path: str = SESSION_SQLITE_PATH,
+    root_agent_name: str = "customer_agent",
+    limit: int = INTENT_ROUTER_MAX_HISTORY_EXAMPLES,
+) -> List[Tuple[str, str]]:
+    # Historical turns where the root agent's first action after a user
+    # message was a transfer are labelled with the agent it transferred to.
+    if not os.path.exists(db_path):
+        return []
+
+    examples = []
+
+    try:
+        connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+        try:
+            rows = connection.execute(
+                "SELECT session_id, author, event FROM events "
+                "ORDER BY app_name, user_id, session_id, seq"
+            )
+
+            current_session_id = None
+            pending_utterance = None
+
+            for session_id, author, serialized_event in rows:
+                if session_id != current_session_id:
+                    current_session_id = session_id
+                    pending_utterance = None
+
+                parts = (json.loads(serialized_event).get("content") or {}).get(
+                    "parts"
+                ) or []
+
+                if author == "user":
+                    pending_utterance = " ".join(
+                        part["text"] for part in parts if part.get("text")
+                    ).strip() or None
+                    continue
+
+                if pending_utterance is None:
+                    continue
+
+                if author == root_agent_name:
+                    for part in parts:
+                        function_call = part.get("function_call") or {}
+
+                        if function_call.get("name") == "transfer_to_agent":
+                            agent_name = (function_call.get("args") or {}).get(
+                                "agent_name"
+                            )
+
+                            if agent_name:
+                                examples.append((pending_utterance, agent_name))
+                            break
+
+                pending_utterance = None
+
+                if len(examples) >= limit:
+                    break
+
+        finally:
+            connection.close()
+
+    except Exception as error:
+        logger.warning("Unable to harvest intent routing examples: %s", error)
+
+    return examples
+
+
+class IntentRouter:
+    def __init__(
+        self,
+        classifier: NaiveBayesIntentClassifier,
+        rules: Optional[Dict[str, List[str]]] = None,
+        confidence_threshold: float = INTENT_ROUTER_CONFIDENCE_THRESHOLD,
+        min_known_tokens: int = INTENT_ROUTER_MIN_KNOWN_TOKENS,
+    ):
+        self.classifier = classifier
+        self.confidence_threshold = confidence_threshold
+        self.min_known_tokens = min_known_tokens
+
+        self.rules = {
+            agent_name: [re.compile(pattern) for pattern in patterns]
+            for agent_name, patterns in (rules or INTENT_ROUTER_RULES).items()
+        }
+
+    def _matching_rules(self, text: str) -> List[str]:
+        return [
+            agent_name
+            for agent_name, patterns in self.rules.items()
+            if any(pattern.search(text) for pattern in patterns)
+        ]
+
+    def route(self, text: str) -> Dict:
+        text = (text or "").lower().strip()
+
+        decision = {
+            "agent_name": None,
+            "confidence": 0.0,
+            "method": "fallback",
+        }
+
+        if not text:
+            return decision
+
+        matched_agents = self._matching_rules(text)
+
+        if len(matched_agents) == 1:
+            decision.update(
+                agent_name=matched_agents[0], confidence=1.0, method="rules"
+            )
+            return decision
+
+        # Short replies ("yes", "the second one") carry no intent of their own
+        # and are left to the root agent, which can see the conversation.
+        if len(self.classifier.known_tokens(text)) < self.min_known_tokens:
+            return decision
+
+        probabilities = self.classifier.predict_proba(text)
+
+        # When several rules fire, the classifier only breaks the tie
+        # between the agents the rules agree on.
+        if matched_agents:
+            probabilities = {
+                agent_name: probabilities.get(agent_name, 0.0)
+                for agent_name in matched_agents
+            }
+            normalizer = sum(probabilities.values()) or 1.0
+            probabilities = {
+                agent_name: probability / normalizer
+                for agent_name, probability in probabilities.items()
+            }
+
+        if not probabilities:
+            return decision
+
+        agent_name, confidence = max(probabilities.items(), key=lambda item: item[1])
+        decision["confidence"] = round(confidence, 4)
+
+        if confidence >= self.confidence_threshold:
+            decision.update(
+                agent_name=agent_name,
+                method="rules+classifier" if matched_agents else "classifier",
+            )
+
+        return decision
+
+
+class IntentRouterStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = Counter()
+        self._routed_to = Counter()
+
+    def record(self, decision: Dict):
+        with self._lock:
+            self._counters["turns"] += 1
+            self._counters[f"outcome:{decision['outcome']}"] += 1
+            self._counters["hops_saved"] += decision["hops_saved"]
+
+            if decision["outcome"] == "routed":
+                self._routed_to[decision["agent_name"]] += 1
+
+    def summary(self) -> Dict:
+        with self._lock:
+            turns = self._counters["turns"]
+
+            return {
+                "turns": turns,
+                "routed": self._counters["outcome:routed"],
+                "root": self._counters["outcome:root"],
+                "sticky": self._counters["outcome:sticky"],
+                "hops_saved": self._counters["hops_saved"],
+                "hop_savings_ratio": round(
+                    self._counters["hops_saved"] / turns, 4
+                )
+                if turns
+                else 0.0,
+                "routed_to": dict(self._routed_to),
+            }
+
+
+def train_intent_router(
+    root_agent_name: str = "customer_agent",
+    include_history: bool = SESSION_BACKEND == "sqlite",
+) -> IntentRouter:
+    examples = [
+        (utterance, agent_name)
+        for agent_name, utterances in INTENT_ROUTER_SEED_EXAMPLES.items()
+        for utterance in utterances
+    ]
+
+    if include_history:
+        examples.extend(harvest_routing_examples(root_agent_name=root_agent_name))
+
+    return IntentRouter(NaiveBayesIntentClassifier().fit(examples))
+
+
+def _check_runner_hook():
+    # Runner._find_agent_to_run is private, so a google-adk upgrade may
+    # rename it or change its arguments. Then the override would silently
+    # stop routing, or break every turn. Refuse to build a RoutedRunner
+    # instead; get_adk_runner falls back to the plain Runner.
+    try:
+        adk_version = version("google-adk")
+    except PackageNotFoundError:
+        adk_version = None
+
+    hook = getattr(Runner, "_find_agent_to_run", None)
+
+    if hook is None or list(inspect.signature(hook).parameters) != [
+        "self",
+        "session",
+        "root_agent",
+    ]:
+        raise RuntimeError(
+            f"google-adk {adk_version} has no Runner._find_agent_to_run"
+            "(session, root_agent); intent routing is unavailable"
+        )
+
+    if adk_version not in INTENT_ROUTER_SUPPORTED_ADK_VERSIONS:
+        logger.warning(
+            "Intent routing overrides a private Runner method and is untested "
+            "on google-adk %s (checked: %s)",
+            adk_version,
+            ", ".join(INTENT_ROUTER_SUPPORTED_ADK_VERSIONS),
+        )
+
+
+class RoutedRunner(Runner):
+    def __init__(self, *, intent_router: IntentRouter, **kwargs):
+        _check_runner_hook()
+
+        super().__init__(**kwargs)
+
+        self.intent_router = intent_router
+        self.routing_stats = IntentRouterStats()
+
+        self._last_decisions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _find_agent_to_run(self, session: Session, root_agent: BaseAgent) -> BaseAgent:
+        default_agent = super()._find_agent_to_run(session, root_agent)
+
+        decision = {
+            "agent_name": default_agent.name,
+            "confidence": 0.0,
+            "method": "session",
+            "outcome": "sticky",
+            "hops_saved": 0,
+        }
+
+        # A sub-agent that is mid-conversation keeps the turn; the router only
+        # replaces the root agent's transfer hop at the start of a new intent.
+        if default_agent is root_agent:
+            user_event = session.events[-1] if session.events else None
+            user_text = ""
+
+            if user_event and user_event.author == "user" and user_event.content:
+                user_text = " ".join(
+                    part.text for part in user_event.content.parts or [] if part.text
+                )
+
+            decision.update(self.intent_router.route(user_text))
+
+            target_agent = (
+                root_agent.find_sub_agent(decision["agent_name"])
+                if decision["agent_name"]
+                else None
+            )
+
+            if target_agent is not None:
+                decision.update(outcome="routed", hops_saved=1)
+                default_agent = target_agent
+
+            else:
+                decision.update(agent_name=root_agent.name, outcome="root")
+
+        self.routing_stats.record(decision)
+
+        with self._lock:
+            self._last_decisions[session.id] = decision
+
+            while len(self._last_decisions) > 1024:
+                self._last_decisions.popitem(last=False)
+
+        logger.info("Intent routing for session %s: %s", session.id, decision)
+
+        return default_agent
+
+    def pop_route_decision(self, session_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self._last_decisions.pop(session_id, None)
@@ -0,0 +1,114 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+INTENT_ROUTER_SEED_EXAMPLES = {
+    "appliance_support_and_troubleshooting_agent": [
+        "my washing machine is not draining water and shows error e10",
+        "my refrigerator is not getting cold",
+        "what does this error code on my oven mean",
+        "the microwave stopped heating food",
+        "my dishwasher is leaking water from the bottom",
+        "the dryer is making a loud noise while spinning",
+        "gas range burner won't ignite",
+        "fridge is making a clicking sound",
+        "how do i fix my washer that won't spin",
+        "my oven display is blinking and not turning on",
+        "air conditioner is blowing warm air",
+        "there is ice build up in my freezer how do i troubleshoot it",
+    ],
+    "customer_appliances_agent": [
+        "show my appliances",
+        "what appliances do i have registered",
+        "list all my registered appliances",
+        "can you tell me about my washing machine",
+        "is my refrigerator still under warranty",
+        "when does the warranty on my oven expire",
+        "show me the details of my dishwasher",
+        "what is the serial number of my microwave",
+        "remove my old dryer from my account",
+        "delete the appliance i sold",
+        "update the installation date of my fridge",
+        "how many appliances are on my profile",
+    ],
+    "product_enquiry_agent": [
+        "what models of refrigerators does logiq sell",
+        "tell me about the features of the maytag model",
+        "what is the energy rating for the latest amana oven",
+        "which washing machines are available in your catalog",
+        "show me the best rated dishwashers",
+        "what brands of microwave ovens do you offer",
+        "compare two refrigerator models",
+        "what are the dimensions of this dryer model",
+        "when was this gas range model launched",
+        "recommend an energy efficient refrigerator",
+        "what are the specifications of the whirlpool washer",
+        "do you have any five star rated air conditioners",
+    ],
+    "register_appliance_agent": [
+        "register a new appliance",
+        "i want to register my new dryer",
+        "how do i add an appliance to my profile",
+        "help me register my recently purchased oven",
+        "add my new refrigerator to my account",
+        "i bought a new washing machine and want to register it",
+        "register my microwave",
+        "i want to add another appliance",
+        "can you register my dishwasher for me",
+        "please add a new gas range to my appliances",
+        "register appliance with serial number",
+        "link my new air conditioner to my account",
+    ],
+    "register_onsite_service_request_agent": [
+        "my gas range isn't working i need a technician",
+        "schedule a service visit for my refrigerator",
+        "can someone come fix my oven",
+        "book a repair for my washing machine",
+        "raise a new service request for my dishwasher",
+        "i need an engineer to look at my microwave",
+        "create a service request",
+        "send a technician to my home",
+        "i want to book an onsite service",
+        "open a repair ticket for my dryer",
+        "request installation service for my new fridge",
+        "log a complaint and send someone to repair it",
+    ],
+    "service_requests_agent": [
+        "what is the status of my repair request",
+        "can i reschedule my service appointment",
+        "i want to cancel service request 12345",
+        "show my service requests",
+        "when will the technician arrive",
+        "track my service ticket",
+        "list my open service requests",
+        "who is the engineer assigned to my request",
+        "change the date of my service visit",
+        "has my repair been completed",
+        "update the description of my service request",
+        "show the details of my last service request",
+    ],
+    "update_customer_profile_agent": [
+        "i need to change my address",
+        "update my phone number",
+        "how do i change my email address",
+        "edit my profile details",
+        "change my contact number",
+        "i moved to a new house please update my address",
+        "update my email",
+        "correct the spelling of my name on my profile",
+        "change my pincode",
+        "my mobile number has changed",
+        "update my personal information",
+        "what address do you have on file for me",
+    ],
+}
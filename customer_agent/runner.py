@@ -13,95 +13,127 @@
 # limitations under the License.
 
 import os
-import asyncio
+import queue
+import logging
 import streamlit as st
-from typing import Tuple
+from typing import AsyncGenerator, Dict, Generator, Tuple
 import time as py_time_module
 from dotenv import load_dotenv
 
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.genai import types as genai_types
 
 from customer_agent.agent import root_agent
+from customer_agent.config import INTENT_ROUTER_ENABLED
+from customer_agent.event_loop import get_background_event_loop
+from customer_agent.router import RoutedRunner, train_intent_router
+from customer_agent.sessions import create_session_service
+from customer_agent.tools.prefetch import prefetch_customer_context
+
+logger = logging.getLogger(__name__)
 
 dotenv_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env")
 load_dotenv(dotenv_path)
 
+APP_NAME = "LogIQ Customer App"
 
-def _run_coroutine_in_new_loop(coro):
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+ADK_ERROR_RESPONSE = """Sorry, an error occurred while processing your 
+request. Please try again later."""
 
-    try:
-        return loop.run_until_complete(coro)
+_STREAM_END = object()
 
-    finally:
-        loop.close()
-        asyncio.set_event_loop(None)
+
+def _run_coroutine_in_background_loop(coro):
+    # Every ADK coroutine runs on one long-lived loop per process, so the
+    # LiteLlm/httpx transports and other async pools survive across turns.
+    return get_background_event_loop().run(coro)
 
 
 @st.cache_resource
-def initialize_adk(user_id: str) -> Tuple:
-    APP_NAME = "LogIQ Customer App"
+def get_adk_runner() -> Runner:
+    # One runner and session service per process; sessions themselves live
+    # in the configured backend, so any replica can serve any user.
+    if INTENT_ROUTER_ENABLED:
+        try:
+            return RoutedRunner(
+                agent=root_agent,
+                app_name=APP_NAME,
+                session_service=create_session_service(),
+                intent_router=train_intent_router(root_agent.name),
+            )
 
+        except Exception as error:
+            logger.warning("Intent routing disabled: %s", error)
+
+    return Runner(
+        agent=root_agent,
+        app_name=APP_NAME,
+        session_service=create_session_service(),
+    )
+
+
+def _build_initial_state(user_id: str) -> Dict:
     initial_state = {
         "customer_full_name": st.session_state.customer_name,
         "customer_id": user_id,
     }
 
-    session_service = InMemorySessionService()
+    # Customer details, appliances and service request briefs are needed by
+    # almost every conversation, so they are loaded concurrently up front
+    # instead of one tool round trip at a time.
+    try:
+        initial_state.update(prefetch_customer_context(user_id))
+
+    except Exception as error:
+        pass
 
-    runner = Runner(
-        agent=root_agent,
-        app_name=APP_NAME,
-        session_service=session_service,
+    return initial_state
+
+
+def ensure_adk_session(runner: Runner, user_id: str, session_id: str) -> None:
+    # Sessions idle past SESSION_IDLE_TTL_SECONDS are evicted by the session
+    # service, while initialize_adk keeps handing out the cached id; a
+    # missing session is recreated under the same id before the next turn.
+    session_service = runner.session_service
+
+    existing_session = _run_coroutine_in_background_loop(
+        session_service.get_session(
+            app_name=APP_NAME,
+            user_id=user_id,
+            session_id=session_id,
+            config=GetSessionConfig(num_recent_events=1),
+        )
     )
 
+    if existing_session:
+        return
+
+    _run_coroutine_in_background_loop(
+        session_service.create_session(
+            app_name=APP_NAME,
+            user_id=user_id,
+            session_id=session_id,
+            state=_build_initial_state(user_id),
+        )
+    )
+
+
+@st.cache_resource
+def initialize_adk(user_id: str) -> Tuple:
+    runner = get_adk_runner()
+
     if "adk_session_id" not in st.session_state:
         random_hex = os.urandom(4).hex()
         session_id = f"adk_session_{int(py_time_module.time())}_{random_hex}"
 
         st.session_state["adk_session_id"] = session_id
 
-        try:
-            _run_coroutine_in_new_loop(
-                session_service.create_session(
-                    app_name=APP_NAME,
-                    user_id=user_id,
-                    session_id=session_id,
-                    state=initial_state,
-                )
-            )
-
-        except Exception as error:
-            raise
-
     else:
         session_id = st.session_state["adk_session_id"]
 
-        existing_session = _run_coroutine_in_new_loop(
-            session_service.get_session(
-                app_name=APP_NAME,
-                user_id=user_id,
-                session_id=session_id,
-            )
-        )
-
-        if not existing_session:
-
-            try:
-                _run_coroutine_in_new_loop(
-                    session_service.create_session(
-                        app_name=APP_NAME,
-                        user_id=user_id,
-                        session_id=session_id,
-                        state=initial_state,
-                    )
-                )
-
-            except Exception as error:
-                raise
+    ensure_adk_session(runner, user_id, session_id)
 
     return runner, session_id
 
@@ -157,7 +189,7 @@ def run_adk_sync(
     session_id: str,
     user_message_text: str,
 ) -> str:
-    return asyncio.run(
+    return _run_coroutine_in_background_loop(
         run_adk_async(
             user_id,
             runner,
@@ -165,3 +197,121 @@ def run_adk_sync(
             user_message_text,
         )
     )
+
+
+def _event_text(event) -> str:
+    if not event.content or not event.content.parts:
+        return ""
+
+    return "".join(
+        part.text
+        for part in event.content.parts
+        if part.text and not getattr(part, "thought", False)
+    )
+
+
+async def stream_adk_async(
+    user_id: str,
+    runner: Runner,
+    session_id: str,
+    user_message_text: str,
+) -> AsyncGenerator[Dict, None]:
+    content = genai_types.Content(
+        role="user", parts=[genai_types.Part(text=user_message_text)]
+    )
+
+    final_response_text = ""
+    streamed_partial_text = False
+
+    try:
+        async for event in runner.run_async(
+            user_id=user_id,
+            session_id=session_id,
+            new_message=content,
+            run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+        ):
+            if event.partial:
+                text = _event_text(event)
+
+                if text:
+                    streamed_partial_text = True
+                    yield {"type": "text", "text": text, "author": event.author}
+
+                continue
+
+            for function_call in event.get_function_calls():
+                yield {
+                    "type": "tool_start",
+                    "name": function_call.name,
+                    "args": function_call.args or {},
+                    "author": event.author,
+                }
+
+            for function_response in event.get_function_responses():
+                yield {
+                    "type": "tool_end",
+                    "name": function_response.name,
+                    "author": event.author,
+                }
+
+            text = _event_text(event)
+
+            # With SSE the model's chunks are followed by one aggregated,
+            # non-partial event carrying the same text, which must not be
+            # rendered twice. Models that do not stream only send the latter.
+            if text and not streamed_partial_text:
+                yield {"type": "text", "text": text, "author": event.author}
+
+            streamed_partial_text = False
+
+            if event.is_final_response() and text:
+                final_response_text = text.strip()
+
+    except Exception as error:
+        yield {"type": "error", "text": ADK_ERROR_RESPONSE}
+        final_response_text = ""
+
+    route_decision = None
+    if isinstance(runner, RoutedRunner):
+        route_decision = runner.pop_route_decision(session_id)
+
+    yield {
+        "type": "final",
+        "text": final_response_text or ADK_ERROR_RESPONSE,
+        "route": route_decision,
+    }
+
+
+def stream_adk_sync(
+    user_id: str,
+    runner: Runner,
+    session_id: str,
+    user_message_text: str,
+) -> Generator[Dict, None, None]:
+    stream_events = queue.Queue()
+
+    async def _pump_events():
+        try:
+            async for stream_event in stream_adk_async(
+                user_id, runner, session_id, user_message_text
+            ):
+                stream_events.put(stream_event)
+
+        finally:
+            stream_events.put(_STREAM_END)
+
+    future = get_background_event_loop().submit(_pump_events())
+
+    try:
+        while True:
+            stream_event = stream_events.get()
+
+            if stream_event is _STREAM_END:
+                break
+
+            yield stream_event
+
+    finally:
+        # Stop the agent run if the page stops consuming (e.g. a rerun).
+        if not future.done():
+            future.cancel()
@@ -0,0 +1,555 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import json
+import asyncio
+import time
+import uuid
+import logging
+import sqlite3
+import threading
+from typing import Any, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import (
+    BaseSessionService,
+    InMemorySessionService,
+    Session,
+    State,
+)
+from google.adk.sessions.base_session_service import (
+    GetSessionConfig,
+    ListSessionsResponse,
+)
+
+from .config import (
+    SESSION_BACKEND,
+    SESSION_DATABASE_URL,
+    SESSION_EVICTION_INTERVAL_SECONDS,
+    SESSION_IDLE_TTL_SECONDS,
+    SESSION_MAX_EVENTS,
+    SESSION_MAX_STATE_BYTES,
+    SESSION_PROTECTED_STATE_KEYS,
+    SESSION_SQLITE_PATH,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value):
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+
+    return str(value)
+
+
+def _dumps(value):
+    return json.dumps(value, default=_json_default)
+
+
+def _split_state(state):
+    app_state, user_state, session_state = {}, {}, {}
+
+    for key, value in (state or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            app_state[key.removeprefix(State.APP_PREFIX)] = value
+        elif key.startswith(State.USER_PREFIX):
+            user_state[key.removeprefix(State.USER_PREFIX)] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session_state[key] = value
+
+    return app_state, user_state, session_state
+
+
+def _merge_state(app_state, user_state, session_state):
+    merged_state = dict(session_state)
+
+    for key, value in app_state.items():
+        merged_state[State.APP_PREFIX + key] = value
+
+    for key, value in user_state.items():
+        merged_state[State.USER_PREFIX + key] = value
+
+    return merged_state
+
+
+class SqliteSessionService(BaseSessionService):
+    def __init__(
+        self,
+        db_path: str = SESSION_SQLITE_PATH,
+        max_state_bytes: int = SESSION_MAX_STATE_BYTES,
+        max_events: int = SESSION_MAX_EVENTS,
+        idle_ttl_seconds: int = SESSION_IDLE_TTL_SECONDS,
+        eviction_interval_seconds: int = SESSION_EVICTION_INTERVAL_SECONDS,
+        protected_state_keys: tuple = SESSION_PROTECTED_STATE_KEYS,
+    ):
+        self.db_path = db_path
+        self.max_state_bytes = max_state_bytes
+        self.max_events = max_events
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.eviction_interval_seconds = eviction_interval_seconds
+        self.protected_state_keys = set(protected_state_keys)
+
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._last_eviction_at = 0.0
+
+        self._conn = sqlite3.connect(
+            db_path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._create_tables()
+
+    def _create_tables(self):
+        with self._lock:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS sessions (
+                    app_name TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    create_time REAL NOT NULL,
+                    update_time REAL NOT NULL,
+                    PRIMARY KEY (app_name, user_id, id)
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_sessions_update_time
+                    ON sessions (update_time);
+
+                CREATE TABLE IF NOT EXISTS events (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    app_name TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    session_id TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    author TEXT,
+                    timestamp REAL NOT NULL,
+                    event TEXT NOT NULL,
+                    FOREIGN KEY (app_name, user_id, session_id)
+                        REFERENCES sessions (app_name, user_id, id)
+                        ON DELETE CASCADE
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_events_session
+                    ON events (app_name, user_id, session_id, seq);
+
+                CREATE TABLE IF NOT EXISTS app_states (
+                    app_name TEXT PRIMARY KEY,
+                    state TEXT NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS user_states (
+                    app_name TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    PRIMARY KEY (app_name, user_id)
+                );
+                """
+            )
+
+    def _fetch_state(self, query, params):
+        row = self._conn.execute(query, params).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def _fetch_app_and_user_state(self, app_name, user_id):
+        app_state = self._fetch_state(
+            "SELECT state FROM app_states WHERE app_name = ?", (app_name,)
+        )
+        user_state = self._fetch_state(
+            "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?",
+            (app_name, user_id),
+        )
+        return app_state, user_state
+
+    def _write_app_and_user_state(
+        self, app_name, user_id, app_state, user_state
+    ):
+        self._conn.execute(
+            "INSERT INTO app_states (app_name, state) VALUES (?, ?) "
+            "ON CONFLICT (app_name) DO UPDATE SET state = excluded.state",
+            (app_name, _dumps(app_state)),
+        )
+        self._conn.execute(
+            "INSERT INTO user_states (app_name, user_id, state) VALUES (?, ?, ?) "
+            "ON CONFLICT (app_name, user_id) DO UPDATE SET state = excluded.state",
+            (app_name, user_id, _dumps(user_state)),
+        )
+
+    def _bound_session_state(self, session_state):
+        # Prefetched lookups (appliances, service requests, ...) are the bulk
+        # of the state and are re-fetched by the agent callbacks when absent,
+        # so the largest of them are dropped first to keep rows bounded.
+        evicted_keys = []
+        serialized_state = _dumps(session_state)
+
+        if len(serialized_state.encode("utf-8")) <= self.max_state_bytes:
+            return session_state, evicted_keys
+
+        candidate_keys = sorted(
+            (
+                key for key in session_state
+                if key not in self.protected_state_keys
+            ),
+            key=lambda key: len(_dumps(session_state[key])),
+            reverse=True,
+        )
+
+        session_state = dict(session_state)
+
+        for key in candidate_keys:
+            session_state.pop(key)
+            evicted_keys.append(key)
+
+            if len(_dumps(session_state).encode("utf-8")) <= self.max_state_bytes:
+                break
+
+        logger.info("Evicted oversized session state keys: %s", evicted_keys)
+        return session_state, evicted_keys
+
+    def _compact_events(self, app_name, user_id, session_id):
+        event_count = self._conn.execute(
+            "SELECT COUNT(*) FROM events "
+            "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+            (app_name, user_id, session_id),
+        ).fetchone()[0]
+
+        # Compact in batches rather than on every turn once over the limit.
+        if event_count <= self.max_events + max(1, self.max_events // 4):
+            return 0
+
+        kept_events = self._conn.execute(
+            "SELECT seq, author FROM events "
+            "WHERE app_name = ? AND user_id = ? AND session_id = ? "
+            "ORDER BY seq DESC LIMIT ?",
+            (app_name, user_id, session_id, self.max_events),
+        ).fetchall()
+
+        # Start the retained window on a user turn so that the model never
+        # sees a function response without the function call preceding it.
+        cutoff_seq = kept_events[-1][0]
+        for seq, author in reversed(kept_events):
+            if author == "user":
+                cutoff_seq = seq
+                break
+
+        return self._conn.execute(
+            "DELETE FROM events "
+            "WHERE app_name = ? AND user_id = ? AND session_id = ? AND seq < ?",
+            (app_name, user_id, session_id, cutoff_seq),
+        ).rowcount
+
+    def evict_idle_sessions(self, idle_ttl_seconds: Optional[int] = None) -> int:
+        idle_ttl_seconds = (
+            self.idle_ttl_seconds if idle_ttl_seconds is None else idle_ttl_seconds
+        )
+
+        with self._lock:
+            self._last_eviction_at = time.time()
+
+            return self._conn.execute(
+                "DELETE FROM sessions WHERE update_time < ?",
+                (time.time() - idle_ttl_seconds,),
+            ).rowcount
+
+    def _maybe_evict_idle_sessions(self):
+        if time.time() - self._last_eviction_at < self.eviction_interval_seconds:
+            return
+
+        try:
+            evicted_sessions = self.evict_idle_sessions()
+
+            if evicted_sessions:
+                logger.info("Evicted %s idle ADK sessions", evicted_sessions)
+
+        except Exception as error:
+            logger.warning("Idle session eviction failed: %s", error)
+
+    # The async methods below run their sqlite work on a worker thread, so a
+    # write waiting on the lock or on busy_timeout never blocks the event
+    # loop that the other sessions' agent turns share.
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        return await asyncio.to_thread(
+            self._create_session, app_name, user_id, state, session_id
+        )
+
+    def _create_session(self, app_name, user_id, state, session_id):
+        self._maybe_evict_idle_sessions()
+
+        session_id = (
+            session_id.strip()
+            if session_id and session_id.strip()
+            else str(uuid.uuid4())
+        )
+        app_state_delta, user_state_delta, session_state = _split_state(state)
+        session_state, _ = self._bound_session_state(session_state)
+
+        now = time.time()
+
+        with self._lock:
+            # App and user state are read inside the write transaction, so
+            # another process sharing the database cannot update them between
+            # this read and the write below and have its update lost.
+            self._conn.execute("BEGIN IMMEDIATE")
+
+            try:
+                app_state, user_state = self._fetch_app_and_user_state(
+                    app_name, user_id
+                )
+                app_state.update(app_state_delta)
+                user_state.update(user_state_delta)
+
+                self._conn.execute(
+                    "INSERT INTO sessions "
+                    "(app_name, user_id, id, state, create_time, update_time) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (app_name, user_id, session_id, _dumps(session_state), now, now),
+                )
+                self._write_app_and_user_state(
+                    app_name, user_id, app_state, user_state
+                )
+                self._conn.execute("COMMIT")
+
+            except sqlite3.IntegrityError:
+                self._conn.execute("ROLLBACK")
+                raise ValueError(f"Session {session_id} already exists.")
+
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=_merge_state(app_state, user_state, session_state),
+            last_update_time=now,
+        )
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        return await asyncio.to_thread(
+            self._get_session, app_name, user_id, session_id, config
+        )
+
+    def _get_session(self, app_name, user_id, session_id, config):
+        self._maybe_evict_idle_sessions()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state, update_time FROM sessions "
+                "WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            query = (
+                "SELECT event FROM events "
+                "WHERE app_name = ? AND user_id = ? AND session_id = ?"
+            )
+            params = [app_name, user_id, session_id]
+
+            if config and config.after_timestamp:
+                query += " AND timestamp >= ?"
+                params.append(config.after_timestamp)
+
+            query += " ORDER BY seq DESC"
+
+            if config and config.num_recent_events:
+                query += " LIMIT ?"
+                params.append(config.num_recent_events)
+
+            event_rows = self._conn.execute(query, params).fetchall()
+            app_state, user_state = self._fetch_app_and_user_state(
+                app_name, user_id
+            )
+
+        return Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=_merge_state(app_state, user_state, json.loads(row[0])),
+            events=[
+                Event.model_validate_json(event_row[0])
+                for event_row in reversed(event_rows)
+            ],
+            last_update_time=row[1],
+        )
+
+    async def list_sessions(
+        self, *, app_name: str, user_id: str
+    ) -> ListSessionsResponse:
+        return await asyncio.to_thread(self._list_sessions, app_name, user_id)
+
+    def _list_sessions(self, app_name, user_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, update_time FROM sessions "
+                "WHERE app_name = ? AND user_id = ?",
+                (app_name, user_id),
+            ).fetchall()
+
+        return ListSessionsResponse(
+            sessions=[
+                Session(
+                    app_name=app_name,
+                    user_id=user_id,
+                    id=session_id,
+                    state={},
+                    last_update_time=update_time,
+                )
+                for session_id, update_time in rows
+            ]
+        )
+
+    async def delete_session(
+        self, *, app_name: str, user_id: str, session_id: str
+    ) -> None:
+        await asyncio.to_thread(self._delete_session, app_name, user_id, session_id)
+
+    def _delete_session(self, app_name, user_id, session_id):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id),
+            )
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+
+        now, evicted_keys = await asyncio.to_thread(
+            self._write_event, session, event
+        )
+
+        session.last_update_time = now
+        await super().append_event(session=session, event=event)
+
+        for key in evicted_keys:
+            session.state.pop(key, None)
+
+        return event
+
+    def _write_event(self, session, event):
+        app_state_delta, user_state_delta, session_state_delta = _split_state(
+            event.actions.state_delta if event.actions else None
+        )
+
+        with self._lock:
+            # Everything is read inside the write transaction, so a concurrent
+            # writer in another process can neither slip past the staleness
+            # check nor have its app / user state update overwritten.
+            self._conn.execute("BEGIN IMMEDIATE")
+
+            try:
+                row = self._conn.execute(
+                    "SELECT state, update_time FROM sessions "
+                    "WHERE app_name = ? AND user_id = ? AND id = ?",
+                    (session.app_name, session.user_id, session.id),
+                ).fetchone()
+
+                if row is None:
+                    raise ValueError(f"Session {session.id} not found.")
+
+                if row[1] > session.last_update_time:
+                    raise ValueError(
+                        f"Session {session.id} was updated elsewhere after it "
+                        "was loaded. Please check if it is a stale session."
+                    )
+
+                session_state = json.loads(row[0])
+                session_state.update(session_state_delta)
+                session_state, evicted_keys = self._bound_session_state(
+                    session_state
+                )
+
+                app_state, user_state = self._fetch_app_and_user_state(
+                    session.app_name, session.user_id
+                )
+                app_state.update(app_state_delta)
+                user_state.update(user_state_delta)
+
+                now = time.time()
+
+                self._conn.execute(
+                    "UPDATE sessions SET state = ?, update_time = ? "
+                    "WHERE app_name = ? AND user_id = ? AND id = ?",
+                    (
+                        _dumps(session_state),
+                        now,
+                        session.app_name,
+                        session.user_id,
+                        session.id,
+                    ),
+                )
+                self._write_app_and_user_state(
+                    session.app_name, session.user_id, app_state, user_state
+                )
+                self._conn.execute(
+                    "INSERT INTO events "
+                    "(app_name, user_id, session_id, id, author, timestamp, event) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        session.app_name,
+                        session.user_id,
+                        session.id,
+                        event.id,
+                        event.author,
+                        event.timestamp,
+                        event.model_dump_json(exclude_none=True),
+                    ),
+                )
+                self._compact_events(session.app_name, session.user_id, session.id)
+                self._conn.execute("COMMIT")
+
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return now, evicted_keys
+
+
+def create_session_service(backend: str = SESSION_BACKEND) -> BaseSessionService:
+    backend = (backend or "memory").lower()
+
+    if backend == "sqlite":
+        return SqliteSessionService()
+
+    if backend == "database":
+        # Networked store (Cloud SQL, Postgres, ...) shared by every replica.
+        from google.adk.sessions import DatabaseSessionService
+
+        return DatabaseSessionService(db_url=SESSION_DATABASE_URL)
+
+    return InMemorySessionService()
@@ -27,12 +27,13 @@ from google.adk.agents.callback_context import CallbackContext
 from google.adk.tools.retrieval.vertex_ai_rag_retrieval import VertexAiRagRetrieval
 
 from vertexai import rag
-from ...config import (
-    MODEL_GEMINI_2_5_FLASH, 
-    MODEL_MAX_TOKENS, 
-    MODEL_TEMPERATURE,
-)
+from ...config import MODEL_MAX_TOKENS, MODEL_TEMPERATURE
+from ...model_routing import build_tiered_model
 from .prompts import APPLIANCE_SUPPORT_AND_TROUBLESHOOTING_AGENT_INSTRUCTIONS
+from ...telemetry import (
+    after_model_telemetry_callback,
+    before_model_telemetry_callback,
+)
 
 load_dotenv()
 warnings.filterwarnings("ignore")
@@ -69,7 +70,7 @@ retrieve_service_manual_corpora_tool = VertexAiRagRetrieval(
 
 appliance_support_and_troubleshooting_agent = Agent(
     name="appliance_support_and_troubleshooting_agent",
-    model=MODEL_GEMINI_2_5_FLASH,
+    model=build_tiered_model("appliance_support_and_troubleshooting_agent"),
     description="""
     Agent to assist customers by answering appliance-related queries limited to 
     usage, cleaning, maintenance, and general product information. This agent 
@@ -83,4 +84,6 @@ appliance_support_and_troubleshooting_agent = Agent(
     ),
     tools=[retrieve_service_manual_corpora_tool],
     before_agent_callback=before_agent_callback,
+    before_model_callback=before_model_telemetry_callback,
+    after_model_callback=after_model_telemetry_callback,
 )
@@ -12,7 +12,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import os
 import json
 import warnings
 from typing import Optional
@@ -21,14 +20,14 @@ from datetime import datetime
 from google.genai import types
 from google.adk.agents import Agent
 from google.adk.agents.callback_context import CallbackContext
-from google.adk.models.lite_llm import LiteLlm
 
-from ...config import (
-    MODEL_MAX_TOKENS, 
-    MODEL_MISTRAL_SMALL_3_2, 
-    MODEL_TEMPERATURE, 
-)
+from ...config import MODEL_MAX_TOKENS, MODEL_TEMPERATURE
+from ...model_routing import build_tiered_model
 from .prompts import CUSTOMER_APPLIANCES_AGENT_INSTRUCTIONS
+from ...telemetry import (
+    after_model_telemetry_callback,
+    before_model_telemetry_callback,
+)
 
 from ...tools.customer_agent_tools import (
     get_all_customer_appliances_tool,
@@ -37,6 +36,8 @@ from ...tools.customer_agent_tools import (
     delete_customer_appliance_tool,
     get_all_customer_appliances_callback_func,
 )
+from ...tools.prefetch import is_state_fresh, store_state_value
+from ...tools.payloads import compact_tool_payload_callback
 
 warnings.filterwarnings("ignore")
 
@@ -44,7 +45,7 @@ warnings.filterwarnings("ignore")
 def before_agent_callback(callback_context: CallbackContext) -> Optional[types.Content]:
     state = callback_context.state
 
-    if "customer_appliances" not in state:
+    if not is_state_fresh(state, "customer_appliances"):
         try:
             customer_appliances = get_all_customer_appliances_callback_func(
                 customer_id=callback_context.state["customer_id"],
@@ -52,9 +53,11 @@ def before_agent_callback(callback_context: CallbackContext) -> Optional[types.C
             )
         except Exception as error:
             customer_appliances = {
-                "Data Unavailable. Use `get_all_customer_appliances_tool()`"}
+                "status": "error",
+                "message": "Data Unavailable. Use `get_all_customer_appliances_tool()`",
+            }
 
-        state["customer_appliances"] = customer_appliances
+        store_state_value(state, "customer_appliances", customer_appliances)
 
     if "start_time" not in state:
         state["start_time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -67,10 +70,7 @@ def before_agent_callback(callback_context: CallbackContext) -> Optional[types.C
 
 customer_appliances_agent = Agent(
     name="customer_appliances_agent",
-    model=LiteLlm(
-        model=MODEL_MISTRAL_SMALL_3_2,
-        api_key=os.getenv("OPENROUTER_API_KEY")
-    ),
+    model=build_tiered_model("customer_appliances_agent"),
     description="""
     Agent to help customers query and update details of their registered 
     appliances. This agent can NOT register a new appliances, but can delete an 
@@ -89,4 +89,7 @@ customer_appliances_agent = Agent(
         delete_customer_appliance_tool,
     ],
     before_agent_callback=before_agent_callback,
+    before_model_callback=before_model_telemetry_callback,
+    after_model_callback=after_model_telemetry_callback,
+    after_tool_callback=compact_tool_payload_callback,
 )
@@ -23,12 +23,13 @@ from google.adk.agents import Agent
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.models.lite_llm import LiteLlm
 
-from ...config import (
-    MODEL_GEMINI_2_FLASH_LITE, 
-    MODEL_MAX_TOKENS, 
-    MODEL_TEMPERATURE,
-)
+from ...config import MODEL_MAX_TOKENS, MODEL_TEMPERATURE
+from ...model_routing import build_tiered_model
 from .prompts import PRODUCT_ENQUIRY_AGENT_INSTRUCTIONS
+from ...telemetry import (
+    after_model_telemetry_callback,
+    before_model_telemetry_callback,
+)
 
 from ...tools.customer_agent_tools import (
     get_appliance_specifications_tool,
@@ -36,6 +37,7 @@ from ...tools.customer_agent_tools import (
     get_sub_categories_tool,
     get_filtered_appliances_tool,
 )
+from ...tools.payloads import compact_tool_payload_callback
 
 warnings.filterwarnings("ignore")
 
@@ -58,7 +60,7 @@ def before_agent_callback(callback_context: CallbackContext) -> Optional[types.C
 
 product_enquiry_agent = Agent(
     name="product_enquiry_agent",
-    model=MODEL_GEMINI_2_FLASH_LITE,
+    model=build_tiered_model("product_enquiry_agent"),
     description="""
     Agent to help customers query the details of various different appliances 
     offered by LogIQ. This agent does not answer queries related to customer 
@@ -79,4 +81,7 @@ product_enquiry_agent = Agent(
         get_filtered_appliances_tool,
     ],
     before_agent_callback=before_agent_callback,
+    before_model_callback=before_model_telemetry_callback,
+    after_model_callback=after_model_telemetry_callback,
+    after_tool_callback=compact_tool_payload_callback,
 )
@@ -22,8 +22,13 @@ from google.genai import types
 from google.adk.agents import Agent
 from google.adk.agents.callback_context import CallbackContext
 
-from ...config import MODEL_GEMINI_2_5_PRO, MODEL_MAX_TOKENS, MODEL_TEMPERATURE
+from ...config import MODEL_MAX_TOKENS, MODEL_TEMPERATURE
+from ...model_routing import build_tiered_model
 from .prompts import APPLIANCE_REGISTRATION_AGENT_INSTRUCTIONS
+from ...telemetry import (
+    after_model_telemetry_callback,
+    before_model_telemetry_callback,
+)
 
 from ...tools.customer_agent_tools import (
     get_categories_tool,
@@ -32,6 +37,7 @@ from ...tools.customer_agent_tools import (
     get_models_tool,
     register_new_appliance_tool,
 )
+from ...tools.payloads import compact_tool_payload_callback
 
 warnings.filterwarnings("ignore")
 
@@ -60,7 +66,7 @@ def before_agent_callback(callback_context: CallbackContext) -> Optional[types.C
 
 register_appliance_agent = Agent(
     name="register_appliance_agent",
-    model=MODEL_GEMINI_2_5_PRO,
+    model=build_tiered_model("register_appliance_agent"),
     description="""
     Agent to help the customers register a new appliance to their profile. This 
     agent can NOT answer questions about appliance details.
@@ -79,4 +85,7 @@ register_appliance_agent = Agent(
         register_new_appliance_tool,
     ],
     before_agent_callback=before_agent_callback,
+    before_model_callback=before_model_telemetry_callback,
+    after_model_callback=after_model_telemetry_callback,
+    after_tool_callback=compact_tool_payload_callback,
 )
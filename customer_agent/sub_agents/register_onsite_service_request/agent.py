@@ -22,8 +22,13 @@ from google.genai import types
 from google.adk.agents import Agent
 from google.adk.agents.callback_context import CallbackContext
 
-from ...config import MODEL_GEMINI_2_5_PRO, MODEL_MAX_TOKENS, MODEL_TEMPERATURE
+from ...config import MODEL_MAX_TOKENS, MODEL_TEMPERATURE
+from ...model_routing import build_tiered_model
 from .prompts import ONSITE_SERVICE_REQUEST_REGISTRATION_AGENT_INSTRUCTIONS
+from ...telemetry import (
+    after_model_telemetry_callback,
+    before_model_telemetry_callback,
+)
 
 from ...tools.customer_agent_tools import (
     get_all_customer_appliances_tool,
@@ -33,6 +38,7 @@ from ...tools.customer_agent_tools import (
     register_onsite_service_request_tool, 
     validate_and_format_address_tool, 
 )
+from ...tools.payloads import compact_tool_payload_callback
 
 warnings.filterwarnings("ignore")
 
@@ -61,7 +67,7 @@ def before_agent_callback(callback_context: CallbackContext) -> Optional[types.C
 
 register_onsite_service_request_agent = Agent(
     name="register_onsite_service_request_agent",
-    model=MODEL_GEMINI_2_5_PRO,
+    model=build_tiered_model("register_onsite_service_request_agent"),
     description="""
     Agent to help customers register a new onsite service request ticket.
     """,
@@ -80,4 +86,7 @@ register_onsite_service_request_agent = Agent(
         validate_and_format_address_tool, 
     ],
     before_agent_callback=before_agent_callback,
+    before_model_callback=before_model_telemetry_callback,
+    after_model_callback=after_model_telemetry_callback,
+    after_tool_callback=compact_tool_payload_callback,
 )
@@ -22,12 +22,13 @@ from google.adk.agents import Agent
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.models.lite_llm import LiteLlm
 
-from ...config import (
-    MODEL_GEMINI_2_5_FLASH, 
-    MODEL_MAX_TOKENS, 
-    MODEL_TEMPERATURE,
-)
+from ...config import MODEL_MAX_TOKENS, MODEL_TEMPERATURE
+from ...model_routing import build_tiered_model
 from .prompts import ONSITE_SERVICE_REQUEST_AGENT_INSTRUCTIONS
+from ...telemetry import (
+    after_model_telemetry_callback,
+    before_model_telemetry_callback,
+)
 
 from ...tools.customer_agent_tools import (
     get_all_service_requests_briefs_tool,
@@ -36,6 +37,8 @@ from ...tools.customer_agent_tools import (
     delete_service_request_tool,
     get_all_service_requests_briefs_callback_func,
 )
+from ...tools.prefetch import is_state_fresh, store_state_value
+from ...tools.payloads import compact_tool_payload_callback
 
 warnings.filterwarnings("ignore")
 
@@ -43,7 +46,7 @@ warnings.filterwarnings("ignore")
 def before_agent_callback(callback_context: CallbackContext) -> Optional[types.Content]:
     state = callback_context.state
 
-    if "customer_service_requests" not in state:
+    if not is_state_fresh(state, "customer_service_requests"):
         try:
             service_requests = get_all_service_requests_briefs_callback_func(
                 customer_id=callback_context.state["customer_id"],
@@ -52,9 +55,11 @@ def before_agent_callback(callback_context: CallbackContext) -> Optional[types.C
 
         except Exception as error:
             service_requests = {
-                "Data Unavailable. Use get_all_service_requests_briefs_tool()"}
+                "status": "error",
+                "message": "Data Unavailable. Use get_all_service_requests_briefs_tool()",
+            }
             
-        state["customer_service_requests"] = service_requests
+        store_state_value(state, "customer_service_requests", service_requests)
 
     if "start_time" not in state:
         state["start_time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -67,7 +72,7 @@ def before_agent_callback(callback_context: CallbackContext) -> Optional[types.C
 
 service_requests_agent = Agent(
     name="service_requests_agent",
-    model=MODEL_GEMINI_2_5_FLASH,
+    model=build_tiered_model("service_requests_agent"),
     description="""
     Agent to help customers query and update details of their service requests. 
     This agent can NOT register a new service request ticket, but can update or 
@@ -86,4 +91,7 @@ service_requests_agent = Agent(
         delete_service_request_tool,
     ],
     before_agent_callback=before_agent_callback,
+    before_model_callback=before_model_telemetry_callback,
+    after_model_callback=after_model_telemetry_callback,
+    after_tool_callback=compact_tool_payload_callback,
 )
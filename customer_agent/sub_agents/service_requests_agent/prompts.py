@@ -120,8 +120,9 @@ ONSITE_SERVICE_REQUEST_AGENT_INSTRUCTIONS = """
             item represents a single request with the key being the 
             `request_id`, and the corresponding value being a dictionary with 
             information including the `request_title`, `request_type`, and the 
-            `appliance_name`. This tool does not provide the complete details 
-            of the service request.
+            `appliance_name`; short listings (a small `limit`) also include the 
+            `ticket_status` and `created_on`. This tool does not provide the 
+            complete details of the service request.
                 e.g.: `{
                         'SR-12345':{
                             "request_title": "Oven Turntable not Rotating",
@@ -22,12 +22,13 @@ from google.adk.agents import Agent
 from google.adk.models.lite_llm import LiteLlm
 from google.adk.agents.callback_context import CallbackContext
 
-from ...config import (
-    MODEL_GEMINI_2_5_FLASH, 
-    MODEL_MAX_TOKENS, 
-    MODEL_TEMPERATURE,
-)
+from ...config import MODEL_MAX_TOKENS, MODEL_TEMPERATURE
+from ...model_routing import build_tiered_model
 from .prompts import UPDATE_CUSTOMER_PROFILE_AGENT_INSTRUCTIONS
+from ...telemetry import (
+    after_model_telemetry_callback,
+    before_model_telemetry_callback,
+)
 
 from ...tools.customer_agent_tools import (
     get_customer_details_tool,
@@ -35,6 +36,8 @@ from ...tools.customer_agent_tools import (
     validate_and_format_address_tool,
     get_customer_details_callback_func,
 )
+from ...tools.prefetch import is_state_fresh, store_state_value
+from ...tools.payloads import compact_tool_payload_callback
 
 warnings.filterwarnings("ignore")
 
@@ -42,16 +45,18 @@ warnings.filterwarnings("ignore")
 def before_agent_callback(callback_context: CallbackContext) -> Optional[types.Content]:
     state = callback_context.state
 
-    if "customer_details" not in state:
+    if not is_state_fresh(state, "customer_details"):
         try:
             customer_details = get_customer_details_callback_func(
                 customer_id=state["customer_id"],
             )
         except Exception as error:
             customer_details = {
-                "Data Unavailable. Use get_customer_details_tool()"}
+                "status": "error",
+                "message": "Data Unavailable. Use get_customer_details_tool()",
+            }
 
-        state["customer_details"] = customer_details
+        store_state_value(state, "customer_details", customer_details)
 
     if "current_date" not in state:
         state["current_date"] = datetime.now().strftime("%Y-%m-%d")
@@ -64,7 +69,7 @@ def before_agent_callback(callback_context: CallbackContext) -> Optional[types.C
 
 update_customer_profile_agent = Agent(
     name="update_customer_profile_agent",
-    model=MODEL_GEMINI_2_5_FLASH,
+    model=build_tiered_model("update_customer_profile_agent"),
     description="""
     Agent to help customers update their personal profile and contact details. 
     This agent can update and query user's first and last name, date of birth, 
@@ -82,4 +87,7 @@ update_customer_profile_agent = Agent(
         validate_and_format_address_tool,
     ],
     before_agent_callback=before_agent_callback,
+    before_model_callback=before_model_telemetry_callback,
+    after_model_callback=after_model_telemetry_callback,
+    after_tool_callback=compact_tool_payload_callback,
 )
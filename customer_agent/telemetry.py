@@ -0,0 +1,72 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+from backend.utils.llm_telemetry import get_llm_telemetry
+
+TELEMETRY_SOURCE: str = "customer_agent"
+
+
+def _call_key(callback_context: CallbackContext):
+    return (callback_context.invocation_id, callback_context.agent_name)
+
+
+def before_model_telemetry_callback(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    get_llm_telemetry().start_call(
+        _call_key(callback_context),
+        TELEMETRY_SOURCE,
+        callback_context.agent_name,
+        llm_request.model,
+    )
+
+    return None
+
+
+def after_model_telemetry_callback(
+    callback_context: CallbackContext, llm_response: LlmResponse
+) -> Optional[LlmResponse]:
+    llm_telemetry = get_llm_telemetry()
+    call_key = _call_key(callback_context)
+
+    # In streaming mode this fires once per chunk; the first chunk marks the
+    # time-to-first-token and only the final response closes the call.
+    if llm_response.partial:
+        llm_telemetry.mark_first_token(call_key)
+        return None
+
+    # Tiered models report which tier actually answered; recording it as the
+    # call's model keeps the per-model aggregates honest after a fail-over.
+    routing_metadata = llm_response.custom_metadata or {}
+
+    if "served_by_model" in routing_metadata:
+        llm_telemetry.update_call(
+            call_key,
+            model=routing_metadata["served_by_model"],
+            model_tier=routing_metadata.get("model_tier"),
+            fallback_reasons=routing_metadata.get("fallback_reasons", []),
+        )
+
+    llm_telemetry.finish_call(
+        call_key,
+        usage_metadata=llm_response.usage_metadata,
+        error=llm_response.error_code,
+    )
+
+    return None
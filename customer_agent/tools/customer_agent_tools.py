@@ -15,7 +15,7 @@
 import os
 import json
 import random
-import requests
+import logging
 import warnings
 import streamlit as st
 from typing import Any, Dict
@@ -25,17 +25,25 @@ import dateutil
 from datetime import date, datetime, timedelta
 
 import sqlalchemy
-import firebase_admin
-from firebase_admin import credentials, firestore
-
-import googlemaps
 from google.cloud.sql.connector import Connector
 from google.oauth2.service_account import Credentials
 from google.adk.tools.tool_context import ToolContext
 
+from backend.module.assignment_dispatcher import (
+    get_engineer_assignment_dispatcher,
+)
+from backend.utils.client_factory import get_client
+from backend.utils.address_cache import cached_address_validation, lookup_pincode
+from database.cloud_sql.catalog import get_appliance_catalog
+
+from .prefetch import get_fresh_state_value, mark_state_stale, store_state_value
+from .tool_cache import cached_customer_tool, invalidates_customer_tool_cache
+
 load_dotenv()
 warnings.filterwarnings("ignore")
 
+logger = logging.getLogger(__name__)
+
 
 def _initialize_cloud_sql_mysql_db():
     credentials = Credentials.from_service_account_info(
@@ -62,17 +70,7 @@ def _initialize_cloud_sql_mysql_db():
 
 
 def _initialize_firebase_firestore():
-    try:
-        cred = credentials.Certificate(
-            json.loads(st.secrets["FIREBASE_SERVICE_ACCOUNT_KEY"])
-        )
-        firebase_admin.initialize_app(cred)
-
-    except BaseException:
-        pass
-
-    firebase_client = firestore.client()
-    return firebase_client
+    return get_client("firestore")
 
 
 def get_categories_tool() -> Dict[str, Any]:
@@ -94,18 +92,7 @@ def get_categories_tool() -> Dict[str, Any]:
               On failure, an error message is returned
     """
     try:
-        pool = _initialize_cloud_sql_mysql_db()
-
-        with pool.connect() as db_conn:
-            query = sqlalchemy.text(
-                """
-                SELECT DISTINCT category
-                FROM appliances
-                """
-            )
-
-            result = db_conn.execute(query).fetchall()
-            categories = [category[0] for category in result]
+        categories = get_appliance_catalog().categories()
 
         return {
             "status": "success",
@@ -142,22 +129,7 @@ def get_sub_categories_tool(
               for 'Refrigerator'.
     """
     try:
-        pool = _initialize_cloud_sql_mysql_db()
-
-        with pool.connect() as db_conn:
-            query = sqlalchemy.text(
-                """
-                SELECT DISTINCT sub_category
-                FROM appliances
-                WHERE category = :category
-                """
-            )
-
-            result = db_conn.execute(
-                query, parameters={"category": category}
-            ).fetchall()
-
-        sub_categories = [sub_category[0] for sub_category in result]
+        sub_categories = get_appliance_catalog().sub_categories(category)
 
         return {
             "status": "success",
@@ -196,26 +168,7 @@ def get_brands_tool(
               Example: {'brands': ['Maytag', 'Amana', 'Mystic']}
     """
     try:
-        pool = _initialize_cloud_sql_mysql_db()
-
-        with pool.connect() as db_conn:
-            query = sqlalchemy.text(
-                """
-                SELECT DISTINCT brand
-                FROM appliances
-                WHERE category = :category AND sub_category = :sub_category
-                """
-            )
-
-            result = db_conn.execute(
-                query,
-                parameters={
-                    "category": category,
-                    "sub_category": sub_category,
-                },
-            ).fetchall()
-
-        brands = [brand[0] for brand in result]
+        brands = get_appliance_catalog().brands(category, sub_category)
 
         return {
             "status": "success",
@@ -250,29 +203,9 @@ def get_models_tool(
               Example: {'models': ['MX23198123A', 'ABR982004B', 'RTX552414C']}
     """
     try:
-        pool = _initialize_cloud_sql_mysql_db()
-
-        with pool.connect() as db_conn:
-            query = sqlalchemy.text(
-                """
-                SELECT DISTINCT model_number
-                FROM appliances
-                WHERE category = :category
-                AND brand = :brand
-                AND sub_category = :sub_category
-                """
-            )
-
-            result = db_conn.execute(
-                query,
-                parameters={
-                    "category": category,
-                    "brand": brand,
-                    "sub_category": sub_category,
-                },
-            ).fetchall()
-
-        model_numbers = [model_number[0] for model_number in result]
+        model_numbers = get_appliance_catalog().model_numbers(
+            category, sub_category, brand
+        )
 
         return {
             "status": "success",
@@ -286,6 +219,7 @@ def get_models_tool(
         }
 
 
+@invalidates_customer_tool_cache("appliances")
 def register_new_appliance_tool(
     category: str,
     sub_category: str,
@@ -340,32 +274,16 @@ def register_new_appliance_tool(
                 """,
             }
 
+        mark_state_stale(tool_context.state, "customer_appliances")
+
         def _fetch_warranty_period_and_appliance_image_url(
             sub_category: str, brand: str, model_number: str
         ):
-            _pool = _initialize_cloud_sql_mysql_db()
-
-            with _pool.connect() as _db_conn:
-                query = sqlalchemy.text(
-                    """
-                    SELECT warranty_period, appliance_image_url
-                    FROM appliances
-                    WHERE brand = :brand
-                    AND sub_category = :sub_category
-                    AND model_number = :model_number
-                    """
-                )
-
-                result = _db_conn.execute(
-                    query,
-                    parameters={
-                        "brand": brand,
-                        "sub_category": sub_category,
-                        "model_number": model_number,
-                    },
-                ).fetchone()
+            appliance = get_appliance_catalog().appliance(
+                model_number, brand=brand, sub_category=sub_category
+            )
 
-            return int(result[0]), result[1]
+            return appliance["warranty_period"], appliance["appliance_image_url"]
 
         warranty_period_in_months, appliance_image_gcs_url = (
             _fetch_warranty_period_and_appliance_image_url(
@@ -431,6 +349,7 @@ def register_new_appliance_tool(
         }
 
 
+@cached_customer_tool("appliances")
 def get_all_customer_appliances_tool(
     customer_id: str,
     limit: int,
@@ -468,6 +387,16 @@ def get_all_customer_appliances_tool(
                 """,
             }
 
+        customer_appliances = get_fresh_state_value(
+            tool_context.state, "customer_appliances"
+        )
+
+        if customer_appliances is not None:
+            if limit == -1:
+                return customer_appliances
+
+            return dict(list(customer_appliances.items())[:limit])
+
         pool = _initialize_cloud_sql_mysql_db()
 
         with pool.connect() as db_conn:
@@ -525,6 +454,11 @@ def get_all_customer_appliances_tool(
 
             customer_appliances[serial_number] = appliance_details
 
+        if limit == -1:
+            store_state_value(
+                tool_context.state, "customer_appliances", customer_appliances
+            )
+
         return customer_appliances
 
     except Exception as error:
@@ -605,6 +539,7 @@ def get_all_customer_appliances_callback_func(
         }
 
 
+@invalidates_customer_tool_cache("service_requests")
 def register_onsite_service_request_tool(
     customer_id: str,
     serial_number: str,
@@ -673,6 +608,8 @@ def register_onsite_service_request_tool(
                 """,
             }
 
+        mark_state_stale(tool_context.state, "customer_service_requests")
+
         firestore_client = _initialize_firebase_firestore()
 
         def _fetch_appliance_details(customer_id: str, serial_number: str) -> Dict:
@@ -793,33 +730,21 @@ def register_onsite_service_request_tool(
             .set(onsite_service_request_data)
         )
 
-        engineer_assignment_cloud_run_payload = {
-            "customer_id": str(customer_id),
-            "request_id": str(service_request_id),
-        }
-
-        response = requests.post(
-            st.secrets["URL_CLOUD_RUN_ONSITE_ENGINEER_ASSIGNMENT_SERVICE"],
-            json=engineer_assignment_cloud_run_payload,
-        )
-
-        if response.status_code != 200:
-            try:
-                (
-                    firestore_client.collection("service_requests")
-                    .document("onsite")
-                    .collection(customer_id)
-                    .document(service_request_id)
-                    .update(
-                        {
-                            "assigned_to": "ADMIN",
-                            "assignment_status": "pending_confirmation",
-                        }
-                    )
-                )
+        # Engineer assignment runs in the background from a durable outbox;
+        # the worker falls back to ADMIN once its retries are exhausted, and
+        # dispatch() does so at once if the request cannot be queued.
+        try:
+            get_engineer_assignment_dispatcher().dispatch(
+                customer_id, service_request_id
+            )
 
-            except Exception as error:
-                pass
+        except Exception as error:
+            logger.error(
+                "Engineer assignment for %s failed, including the ADMIN "
+                "fallback: %s",
+                service_request_id,
+                error,
+            )
 
         return {
             "status": "success",
@@ -834,6 +759,7 @@ def register_onsite_service_request_tool(
         }
 
 
+@invalidates_customer_tool_cache("appliances")
 def update_customer_appliance_details_tool(
     customer_id: str,
     serial_number: str,
@@ -893,6 +819,8 @@ def update_customer_appliance_details_tool(
                 """,
             }
 
+        mark_state_stale(tool_context.state, "customer_appliances")
+
         for field_name in updates.keys():
             if field_name in IMMUTABLE_APPLIANCE_FIELDS:
                 return {
@@ -936,6 +864,7 @@ def update_customer_appliance_details_tool(
         }
 
 
+@invalidates_customer_tool_cache("appliances")
 def delete_customer_appliance_tool(
     customer_id: str, serial_number: str, tool_context: ToolContext
 ) -> Dict[str, Any]:
@@ -975,6 +904,8 @@ def delete_customer_appliance_tool(
                 """,
             }
 
+        mark_state_stale(tool_context.state, "customer_appliances")
+
         pool = _initialize_cloud_sql_mysql_db()
 
         with pool.connect() as db_conn:
@@ -1007,6 +938,7 @@ def delete_customer_appliance_tool(
         }
 
 
+@cached_customer_tool("service_requests")
 def get_all_service_requests_briefs_tool(
     customer_id: str,
     limit: int,
@@ -1044,6 +976,16 @@ def get_all_service_requests_briefs_tool(
                 """,
             }
 
+        service_requests = get_fresh_state_value(
+            tool_context.state, "customer_service_requests"
+        )
+
+        if service_requests is not None:
+            if limit > 0:
+                return dict(list(service_requests.items())[:limit])
+
+            return service_requests
+
         firestore_client = _initialize_firebase_firestore()
 
         if limit > 0:
@@ -1075,8 +1017,15 @@ def get_all_service_requests_briefs_tool(
                     + request_data["appliance_details"]["sub_category"]
                 ),
                 "request_type": str(request_data["request_type"]),
+                "ticket_status": str(request_data.get("ticket_status", "")),
+                "created_on": str(request_data.get("created_on", "")),
             }
 
+        if limit <= 0:
+            store_state_value(
+                tool_context.state, "customer_service_requests", service_requests
+            )
+
         return service_requests
 
     except Exception as error:
@@ -1122,6 +1071,8 @@ def get_all_service_requests_briefs_callback_func(
                     + request_data["appliance_details"]["sub_category"]
                 ),
                 "request_type": str(request_data["request_type"]),
+                "ticket_status": str(request_data.get("ticket_status", "")),
+                "created_on": str(request_data.get("created_on", "")),
             }
 
         return service_requests
@@ -1133,6 +1084,7 @@ def get_all_service_requests_briefs_callback_func(
         }
 
 
+@cached_customer_tool("service_requests")
 def get_service_request_details_tool(
     customer_id: str,
     request_id: str,
@@ -1192,6 +1144,7 @@ def get_service_request_details_tool(
         }
 
 
+@invalidates_customer_tool_cache("service_requests")
 def update_service_request_details_tool(
     customer_id: str,
     request_id: str,
@@ -1227,6 +1180,8 @@ def update_service_request_details_tool(
                 """,
             }
 
+        mark_state_stale(tool_context.state, "customer_service_requests")
+
         firestore_client = _initialize_firebase_firestore()
 
         updated_data_fields = updated_data.keys()
@@ -1280,6 +1235,7 @@ def update_service_request_details_tool(
         }
 
 
+@invalidates_customer_tool_cache("service_requests")
 def delete_service_request_tool(
     customer_id: str,
     request_id: str,
@@ -1328,6 +1284,8 @@ def delete_service_request_tool(
                 """,
             }
 
+        mark_state_stale(tool_context.state, "customer_service_requests")
+
         firestore_client = _initialize_firebase_firestore()
 
         doc_ref = (
@@ -1362,6 +1320,7 @@ def delete_service_request_tool(
         }
 
 
+@cached_customer_tool("customer")
 def get_customer_details_tool(
     customer_id: str,
     tool_context: ToolContext,
@@ -1396,6 +1355,13 @@ def get_customer_details_tool(
                 """,
             }
 
+        customer_details = get_fresh_state_value(
+            tool_context.state, "customer_details"
+        )
+
+        if customer_details is not None:
+            return customer_details
+
         pool = _initialize_cloud_sql_mysql_db()
 
         with pool.connect() as db_conn:
@@ -1430,6 +1396,8 @@ def get_customer_details_tool(
             "zip_code": result.zip_code,
         }
 
+        store_state_value(tool_context.state, "customer_details", customer_details)
+
         return customer_details
 
     except Exception as error:
@@ -1486,6 +1454,7 @@ def get_customer_details_callback_func(
         }
 
 
+@invalidates_customer_tool_cache("customer")
 def update_customer_details_tool(
     customer_id: str,
     updates: Dict[str, str],
@@ -1535,6 +1504,8 @@ def update_customer_details_tool(
                 """,
             }
 
+        mark_state_stale(tool_context.state, "customer_details")
+
         pool = _initialize_cloud_sql_mysql_db()
 
         with pool.connect() as db_conn:
@@ -1602,11 +1573,11 @@ def validate_and_format_address_tool(address: str, state: str) -> Dict[str, Any]
     """
     try:
         is_valid = False
-        gmaps = googlemaps.Client(
-            key=st.secrets["GOOGLE_MAPS_DISTANCE_MATRIX_API_KEY"]
-        )
 
-        response = gmaps.addressvalidation(
+        # Customers re-validate the same few addresses across sessions, so
+        # validations are shared through the persistent address cache.
+        response = cached_address_validation(
+            lambda: get_client("google_maps"),
             [address],
             regionCode="IN",
             locality=state,
@@ -1690,23 +1661,12 @@ def validate_and_format_address_tool(address: str, state: str) -> Dict[str, Any]
             combined_street = " ".join(street_parts).strip()
 
             if zipcode:
-                try:
-                    url = f"https://api.postalpincode.in/pincode/{zipcode}"
-                    api_response = requests.get(url).json()[0]
+                post_office = lookup_pincode(zipcode)
 
-                    post_offices = api_response.get("PostOffice")
+                if post_office and post_office.get("District"):
+                    district = post_office["District"]
 
-                    if (
-                        post_offices
-                        and isinstance(post_offices, list)
-                        and len(post_offices) > 0
-                    ):
-                        district = post_offices[0].get("District")
-
-                    else:
-                        district = city
-
-                except Exception as error:
+                else:
                     district = city
 
             custom_standardized_address = {
@@ -1899,6 +1859,7 @@ def get_appliance_specifications_tool(
         }
 
 
+@cached_customer_tool("customer")
 def get_customer_phone_number_tool(
     customer_id: str,
     tool_context: ToolContext,
@@ -1963,6 +1924,7 @@ def get_customer_phone_number_tool(
         }
 
 
+@cached_customer_tool("customer")
 def get_customer_email_tool(
     customer_id: str,
     tool_context: ToolContext,
@@ -2026,6 +1988,7 @@ def get_customer_email_tool(
         }
 
 
+@cached_customer_tool("customer")
 def get_customer_address_tool(
     customer_id: str,
     tool_context: ToolContext,
@@ -0,0 +1,309 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+from ..config import (
+    TOOL_PAYLOAD_BRIEF_MAX_STRING_LENGTH,
+    TOOL_PAYLOAD_DETAIL_MAX_LIMIT,
+    TOOL_PAYLOAD_DETAIL_MAX_STRING_LENGTH,
+)
+
+logger = logging.getLogger(__name__)
+
+PAYLOAD_MODE_STATE_KEY = "tool_payload_mode"
+PAYLOAD_STATS_STATE_KEY = "tool_payload_stats"
+
+# "brief"/"detail" list the fields kept for each record (None keeps all of
+# them); "omit" is always removed. Keyed collections map an id, such as the
+# serial number or request id, to one record each.
+TOOL_PAYLOAD_SHAPES = {
+    "get_all_customer_appliances_tool": {
+        "keyed_collection": True,
+        "default_mode": "brief",
+        # The appliances agent reads and updates purchased_from, seller,
+        # installation_date and warranty_period, so brief keeps them; it
+        # still drops ids, image URLs and audit timestamps.
+        "brief": [
+            "category",
+            "sub_category",
+            "brand",
+            "model_number",
+            "purchased_from",
+            "seller",
+            "purchase_date",
+            "installation_date",
+            "warranty_period",
+            "warranty_expiration",
+        ],
+        "detail": [
+            "category",
+            "sub_category",
+            "brand",
+            "model_number",
+            "serial_number",
+            "purchased_from",
+            "seller",
+            "purchase_date",
+            "installation_date",
+            "warranty_period",
+            "warranty_expiration",
+            "appliance_image_url",
+        ],
+        "omit": [],
+    },
+    "get_all_service_requests_briefs_tool": {
+        "keyed_collection": True,
+        "default_mode": "brief",
+        "brief": ["request_title", "appliance_name", "request_type"],
+        "detail": [
+            "request_title",
+            "appliance_name",
+            "request_type",
+            "ticket_status",
+            "created_on",
+        ],
+        "omit": [],
+    },
+    "get_service_request_details_tool": {
+        "keyed_collection": False,
+        "default_mode": "detail",
+        "brief": [
+            "request_title",
+            "request_type",
+            "description",
+            "ticket_status",
+            "assignment_status",
+            "assigned_to",
+            "created_on",
+            "appliance_details.brand",
+            "appliance_details.sub_category",
+            "appliance_details.model_number",
+            "appliance_details.serial_number",
+        ],
+        "detail": None,
+        "omit": ["appliance_details.appliance_image_url"],
+    },
+}
+
+
+def estimate_tokens(payload: Any) -> int:
+    return len(json.dumps(payload, default=str)) // 4
+
+
+def _truncate(value: Any, max_string_length: int) -> Any:
+    if isinstance(value, str):
+        if len(value) > max_string_length:
+            return value[: max_string_length - 3].rstrip() + "..."
+        return value
+
+    if isinstance(value, dict):
+        return {
+            key: _truncate(nested_value, max_string_length)
+            for key, nested_value in value.items()
+        }
+
+    if isinstance(value, list):
+        return [_truncate(item, max_string_length) for item in value]
+
+    return value
+
+
+def _get_path(record: Dict, path: str) -> Any:
+    value = record
+
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+
+    return value
+
+
+def _set_path(record: Dict, path: str, value: Any):
+    keys = path.split(".")
+
+    for key in keys[:-1]:
+        record = record.setdefault(key, {})
+
+    record[keys[-1]] = value
+
+
+def _without_path(record: Dict, path: str) -> Dict:
+    key, _, nested_path = path.partition(".")
+
+    if key not in record:
+        return record
+
+    record = dict(record)
+
+    if not nested_path:
+        record.pop(key)
+
+    elif isinstance(record[key], dict):
+        record[key] = _without_path(record[key], nested_path)
+
+    return record
+
+
+def _shape_record(record: Any, fields, omit) -> Any:
+    if not isinstance(record, dict):
+        return record
+
+    # Selected fields are always present, even when null, so the model sees
+    # the same keys on every call.
+    if fields is not None:
+        shaped_record = {}
+        for field_path in fields:
+            _set_path(shaped_record, field_path, _get_path(record, field_path))
+        record = shaped_record
+
+    for field_path in omit:
+        record = _without_path(record, field_path)
+
+    return record
+
+
+def _compact_error(tool_response: Dict) -> Dict:
+    # Multi-line guidance prose collapses to a single line.
+    return {
+        key: " ".join(value.split()) if isinstance(value, str) else value
+        for key, value in tool_response.items()
+    }
+
+
+def resolve_payload_mode(tool_name: str, args: Dict, state) -> str:
+    shape = TOOL_PAYLOAD_SHAPES.get(tool_name, {})
+    mode_override = state.get(PAYLOAD_MODE_STATE_KEY)
+
+    if mode_override in ("brief", "detail"):
+        return mode_override
+
+    # Asking for just a handful of records signals interest in the details.
+    limit = args.get("limit")
+    if (
+        shape.get("keyed_collection")
+        and isinstance(limit, int)
+        and 0 < limit <= TOOL_PAYLOAD_DETAIL_MAX_LIMIT
+    ):
+        return "detail"
+
+    return shape.get("default_mode", "detail")
+
+
+def shape_tool_payload(tool_name: str, tool_response: Any, mode: str) -> Any:
+    if not isinstance(tool_response, dict):
+        return tool_response
+
+    if tool_response.get("status") == "error":
+        return _compact_error(tool_response)
+
+    shape = TOOL_PAYLOAD_SHAPES.get(tool_name)
+
+    if shape is not None:
+        fields = shape[mode]
+
+        if shape["keyed_collection"]:
+            tool_response = {
+                record_id: _shape_record(record, fields, shape["omit"])
+                for record_id, record in tool_response.items()
+            }
+        else:
+            tool_response = _shape_record(tool_response, fields, shape["omit"])
+
+    max_string_length = (
+        TOOL_PAYLOAD_BRIEF_MAX_STRING_LENGTH
+        if mode == "brief"
+        else TOOL_PAYLOAD_DETAIL_MAX_STRING_LENGTH
+    )
+
+    return _truncate(tool_response, max_string_length)
+
+
+class ToolPayloadStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tools = {}
+
+    def record(self, tool_name: str, tokens_before: int, tokens_after: int):
+        with self._lock:
+            tool_stats = self._tools.setdefault(
+                tool_name, {"calls": 0, "tokens_before": 0, "tokens_after": 0}
+            )
+            tool_stats["calls"] += 1
+            tool_stats["tokens_before"] += tokens_before
+            tool_stats["tokens_after"] += tokens_after
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return {
+                tool_name: {
+                    **tool_stats,
+                    "tokens_saved": tool_stats["tokens_before"]
+                    - tool_stats["tokens_after"],
+                }
+                for tool_name, tool_stats in self._tools.items()
+            }
+
+
+_tool_payload_stats = None
+_tool_payload_stats_lock = threading.Lock()
+
+
+def get_tool_payload_stats() -> ToolPayloadStats:
+    global _tool_payload_stats
+
+    if _tool_payload_stats is None:
+        with _tool_payload_stats_lock:
+            if _tool_payload_stats is None:
+                _tool_payload_stats = ToolPayloadStats()
+
+    return _tool_payload_stats
+
+
+def compact_tool_payload_callback(
+    tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext, tool_response: Any
+) -> Optional[Any]:
+    try:
+        mode = resolve_payload_mode(tool.name, args, tool_context.state)
+        shaped_response = shape_tool_payload(tool.name, tool_response, mode)
+
+        tokens_before = estimate_tokens(tool_response)
+        tokens_after = estimate_tokens(shaped_response)
+
+    except Exception as error:
+        # The unshaped response still goes to the model; only the trimming
+        # is lost.
+        logger.warning("Could not shape the %s payload: %s", tool.name, error)
+        return None
+
+    get_tool_payload_stats().record(tool.name, tokens_before, tokens_after)
+
+    conversation_stats = dict(
+        tool_context.state.get(PAYLOAD_STATS_STATE_KEY)
+        or {"calls": 0, "tokens_before": 0, "tokens_after": 0, "tokens_saved": 0}
+    )
+    conversation_stats["calls"] += 1
+    conversation_stats["tokens_before"] += tokens_before
+    conversation_stats["tokens_after"] += tokens_after
+    conversation_stats["tokens_saved"] += tokens_before - tokens_after
+    tool_context.state[PAYLOAD_STATS_STATE_KEY] = conversation_stats
+
+    return shaped_response
@@ -0,0 +1,142 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+from typing import Any, Dict, Iterable, Optional
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from ..config import (
+    CUSTOMER_CONTEXT_PREFETCH_TIMEOUT_SECONDS,
+    CUSTOMER_CONTEXT_TTL_SECONDS,
+)
+
+CUSTOMER_CONTEXT_KEYS = (
+    "customer_details",
+    "customer_appliances",
+    "customer_service_requests",
+)
+
+
+def fetched_at_key(state_key: str) -> str:
+    return f"{state_key}_fetched_at"
+
+
+def _is_error_response(value: Any) -> bool:
+    return isinstance(value, dict) and value.get("status") == "error"
+
+
+def is_state_fresh(
+    state, state_key: str, ttl_seconds: int = CUSTOMER_CONTEXT_TTL_SECONDS
+) -> bool:
+    fetched_at = state.get(fetched_at_key(state_key))
+
+    if state_key not in state or not fetched_at:
+        return False
+
+    return time.time() - fetched_at <= ttl_seconds
+
+
+def get_fresh_state_value(
+    state, state_key: str, ttl_seconds: int = CUSTOMER_CONTEXT_TTL_SECONDS
+) -> Optional[Any]:
+    if not is_state_fresh(state, state_key, ttl_seconds):
+        return None
+
+    return state.get(state_key)
+
+
+def store_state_value(state, state_key: str, value: Any) -> bool:
+    state[state_key] = value
+
+    # Failed lookups are kept for the prompt but never marked fresh, so the
+    # next tool call or agent hand-off retries them.
+    if _is_error_response(value):
+        state[fetched_at_key(state_key)] = None
+        return False
+
+    state[fetched_at_key(state_key)] = time.time()
+    return True
+
+
+def mark_state_stale(state, *state_keys: str) -> None:
+    for state_key in state_keys:
+        state[fetched_at_key(state_key)] = None
+
+
+def _customer_context_loaders():
+    from .customer_agent_tools import (
+        get_all_customer_appliances_callback_func,
+        get_all_service_requests_briefs_callback_func,
+        get_customer_details_callback_func,
+    )
+
+    return {
+        "customer_details": lambda customer_id: get_customer_details_callback_func(
+            customer_id=customer_id,
+        ),
+        "customer_appliances": lambda customer_id: (
+            get_all_customer_appliances_callback_func(
+                customer_id=customer_id,
+                limit=-1,
+            )
+        ),
+        "customer_service_requests": lambda customer_id: (
+            get_all_service_requests_briefs_callback_func(
+                customer_id=customer_id,
+                limit=-1,
+            )
+        ),
+    }
+
+
+def load_customer_context_value(customer_id: str, state_key: str) -> Any:
+    return _customer_context_loaders()[state_key](customer_id)
+
+
+def prefetch_customer_context(
+    customer_id: str,
+    state_keys: Iterable[str] = CUSTOMER_CONTEXT_KEYS,
+    timeout_seconds: int = CUSTOMER_CONTEXT_PREFETCH_TIMEOUT_SECONDS,
+) -> Dict[str, Any]:
+    loaders = _customer_context_loaders()
+    state_keys = [state_key for state_key in state_keys if state_key in loaders]
+
+    prefetched_state = {}
+
+    executor = ThreadPoolExecutor(max_workers=max(1, len(state_keys)))
+
+    try:
+        futures = {
+            executor.submit(loaders[state_key], customer_id): state_key
+            for state_key in state_keys
+        }
+
+        done, _ = wait(futures, timeout=timeout_seconds)
+
+        # Lookups that time out or fail are left out of the initial state and
+        # are fetched on demand by the sub-agent callbacks instead.
+        for future in done:
+            try:
+                value = future.result()
+
+            except Exception as error:
+                continue
+
+            if not _is_error_response(value):
+                store_state_value(prefetched_state, futures[future], value)
+
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return prefetched_state
@@ -0,0 +1,160 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import inspect
+import functools
+import threading
+from typing import Any, Optional
+
+from backend.utils.tagged_cache import MISSING, TaggedCache
+
+from ..config import TOOL_CACHE_MAX_ENTRIES, TOOL_CACHE_TTL_SECONDS
+
+
+class CustomerToolCache(TaggedCache):
+    # Entries are keyed (customer_id, cache_key) and tagged with the customer
+    # and (customer, domain), so a write evicts only that customer's entries
+    # in the domains it touched.
+    def __init__(
+        self,
+        ttl_seconds: int = TOOL_CACHE_TTL_SECONDS,
+        max_entries: int = TOOL_CACHE_MAX_ENTRIES,
+    ):
+        super().__init__(ttl_seconds, max_entries)
+
+    def get(self, customer_id: str, cache_key: tuple) -> Optional[Any]:
+        value = super().get((customer_id, cache_key))
+
+        return None if value is MISSING else value
+
+    def set(
+        self,
+        customer_id: str,
+        cache_key: tuple,
+        value: Any,
+        domains: tuple,
+        ttl_seconds: Optional[int] = None,
+    ) -> None:
+        tags = {customer_id}
+        tags.update((customer_id, domain) for domain in domains)
+
+        super().set((customer_id, cache_key), value, tags, ttl_seconds)
+
+    def invalidate(self, customer_id: str, domains: Optional[tuple] = None) -> int:
+        if domains:
+            return super().invalidate(*((customer_id, domain) for domain in domains))
+
+        return super().invalidate(customer_id)
+
+
+_customer_tool_cache = None
+_customer_tool_cache_lock = threading.Lock()
+
+
+def get_customer_tool_cache() -> CustomerToolCache:
+    global _customer_tool_cache
+
+    if _customer_tool_cache is None:
+        with _customer_tool_cache_lock:
+            if _customer_tool_cache is None:
+                _customer_tool_cache = CustomerToolCache()
+
+    return _customer_tool_cache
+
+
+def _bind_tool_arguments(func, args, kwargs):
+    bound_arguments = inspect.signature(func).bind_partial(*args, **kwargs)
+    bound_arguments.apply_defaults()
+
+    return dict(bound_arguments.arguments)
+
+
+def _session_customer_id(tool_arguments):
+    tool_context = tool_arguments.get("tool_context")
+
+    if tool_context is None:
+        return None
+
+    return tool_context.state.get("customer_id", None)
+
+
+def _is_error_response(value: Any) -> bool:
+    return isinstance(value, dict) and (
+        value.get("status") == "error" or "error" in value
+    )
+
+
+def cached_customer_tool(*domains: str, ttl_seconds: Optional[int] = None):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tool_arguments = _bind_tool_arguments(func, args, kwargs)
+            customer_id = _session_customer_id(tool_arguments)
+
+            # Only serve the cache for the customer bound to the session, so a
+            # cached result never bypasses the tool's own customer validation.
+            if customer_id is None or tool_arguments.get(
+                "customer_id", customer_id
+            ) != customer_id:
+                return func(*args, **kwargs)
+
+            cache_key = (
+                func.__name__,
+                json.dumps(
+                    {
+                        name: value
+                        for name, value in tool_arguments.items()
+                        if name != "tool_context"
+                    },
+                    sort_keys=True,
+                    default=str,
+                ),
+            )
+
+            tool_cache = get_customer_tool_cache()
+            cached_result = tool_cache.get(customer_id, cache_key)
+
+            if cached_result is not None:
+                return cached_result
+
+            result = func(*args, **kwargs)
+
+            if not _is_error_response(result):
+                tool_cache.set(customer_id, cache_key, result, domains, ttl_seconds)
+
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def invalidates_customer_tool_cache(*domains: str):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tool_arguments = _bind_tool_arguments(func, args, kwargs)
+            customer_id = _session_customer_id(tool_arguments)
+
+            try:
+                return func(*args, **kwargs)
+
+            finally:
+                if customer_id is not None:
+                    get_customer_tool_cache().invalidate(customer_id, domains)
+
+        return wrapper
+
+    return decorator
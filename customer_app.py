@@ -13,10 +13,11 @@
 # limitations under the License.
 
 import os
+import sys
 import time
 import uuid
 import bleach
-import requests
+import logging
 import warnings
 
 import datetime
@@ -27,26 +28,13 @@ import streamlit as st
 import streamlit_antd_components as sac
 from streamlit_extras.stylable_container import stylable_container
 
-from backend.utils.geo_operations import LocationServices
-from backend.channels.email_client import TransactionalEmails
-from backend.channels.sms_client import NotificationSMS
-
-from database.cloud_sql.migrations import MigrateCustomers
-from database.cloud_sql.models import ModelCustomers, ModelCustomerAppliances
-from database.cloud_sql.queries import (
-    Appliances,
-    QueryCustomerAppliances,
-    QueryCustomers,
-    QueryEngineers,
+from backend.utils.scoped_cache import invalidate_scope, scoped_cache
+from backend.utils.import_profiler import (
+    install_import_profiler,
+    log_import_profile,
 )
 
-from database.cloud_storage.document_storage import CustomerRecordsBucket
-from database.cloud_storage.multimedia_storage import (
-    OnsiteServiceRequestsBucket,
-    ProfilePicturesBucket,
-)
-
-from database.firebase.firestore import OnsiteServiceRequestCollection
+install_import_profiler()
 
 
 st.set_page_config(
@@ -58,6 +46,8 @@ st.set_page_config(
 
 warnings.filterwarnings("ignore")
 
+logger = logging.getLogger(__name__)
+
 ################################ [CUSTOM CSS] #################################
 
 st.html(
@@ -225,15 +215,6 @@ if "customer_email" not in st.session_state:
 if "customer_details" not in st.session_state:
     st.session_state.customer_details = ""
 
-if "distinct_appliance_data" not in st.session_state:
-    try:
-        query_appliances = Appliances()
-        st.session_state.distinct_appliance_data = (
-            query_appliances.fetch_distinct_appliance_data_with_category()
-        )
-    except Exception as error:
-        st.session_state.distinct_appliance_data = {}
-
 ############################ [STREAMLIT DIALOGS] ##############################
 
 @st.dialog("Manage Account", width="large")
@@ -402,7 +383,9 @@ def dialog_manage_account():
                 )
 
                 try:
-                    get_customer_details.clear()
+                    invalidate_scope(
+                        "customer", st.session_state.customer_id, "profile"
+                    )
                 except Exception as error:
                     pass
 
@@ -465,19 +448,12 @@ def dialog_manage_account():
         )
 
         def fetch_district_and_state_from_zipcode(zip_code):
-            url = f"https://api.postalpincode.in/pincode/{zip_code}"
-            api_response = requests.get(url).json()[0]
+            post_office = lookup_pincode(zip_code)
 
-            post_offices = api_response.get("PostOffice")
-
-            if (
-                post_offices
-                and isinstance(post_offices, list)
-                and len(post_offices) > 0
-            ):
-                district = post_offices[0].get("District")
-                state = post_offices[0].get("State")
-                country = post_offices[0].get("Country")
+            if post_office:
+                district = post_office.get("District")
+                state = post_office.get("State")
+                country = post_office.get("Country")
 
                 return district, state, country
 
@@ -542,7 +518,9 @@ def dialog_manage_account():
                 )
 
                 try:
-                    get_customer_details.clear()
+                    invalidate_scope(
+                        "customer", st.session_state.customer_id, "profile"
+                    )
                 except Exception as error:
                     pass
 
@@ -607,83 +585,48 @@ def register_new_appliance():
     if step_register_appliance == "Appliance Details":
         cola, colb, colc = st.columns(3)
 
-        @st.cache_data(show_spinner=False)
+        # Catalog lookups are in-memory reads on the shared snapshot, so
+        # they no longer need a per-session st.cache_data copy.
         def fetch_and_cache_appliance_categories(session_id):
             try:
-                st.session_state.ra_available_appliance_categories = list(
-                    st.session_state.distinct_appliance_data.keys()
+                st.session_state.ra_available_appliance_categories = (
+                    get_appliance_catalog().categories()
                 )
 
             except Exception as error:
                 st.error(error)
 
-        @st.cache_data(show_spinner=False)
         def fetch_and_cache_appliance_sub_categories(category, session_id):
             try:
-                if st.session_state.distinct_appliance_data.get(category):
-                    result = list(
-                        st.session_state.distinct_appliance_data.get(
-                            category
-                        ).keys()
-                    )
-                else:
-                    result = None
-
-                st.session_state.ra_available_appliance_sub_categories = result
+                st.session_state.ra_available_appliance_sub_categories = (
+                    get_appliance_catalog().sub_categories(category) or None
+                    if category
+                    else None
+                )
 
             except Exception as error:
                 st.error(error)
 
-        @st.cache_data(show_spinner=False)
         def fetch_and_cache_appliance_brands(sub_category, session_id):
             try:
-                if st.session_state.distinct_appliance_data.get(
-                    st.session_state.ra_category
-                ) and st.session_state.distinct_appliance_data.get(
-                    st.session_state.ra_category
-                ).get(
-                    sub_category
-                ):
-                    st.session_state.ra_available_appliance_brands = list(
-                        st.session_state.distinct_appliance_data.get(
-                            st.session_state.ra_category
-                        )
-                        .get(sub_category)
-                        .keys()
+                st.session_state.ra_available_appliance_brands = (
+                    get_appliance_catalog().brands(
+                        st.session_state.ra_category, sub_category
                     )
-                else:
-                    st.session_state.ra_available_appliance_brands = None
+                    or None
+                )
 
             except Exception as error:
                 st.error(error)
 
-        @st.cache_data(show_spinner=False)
         def fetch_and_cache_model_numbers(brand, sub_category, session_id):
             try:
-                if (
-                    st.session_state.distinct_appliance_data.get(
-                        st.session_state.ra_category
-                    )
-                    and st.session_state.distinct_appliance_data.get(
-                        st.session_state.ra_category
-                    ).get(sub_category)
-                    and st.session_state.distinct_appliance_data.get(
-                        st.session_state.ra_category
+                st.session_state.ra_available_appliance_model_numbers = (
+                    get_appliance_catalog().model_numbers(
+                        st.session_state.ra_category, sub_category, brand
                     )
-                    .get(st.session_state.ra_sub_category)
-                    .get(brand)
-                ):
-                    result = list(
-                        st.session_state.distinct_appliance_data.get(
-                            st.session_state.ra_category
-                        )
-                        .get(st.session_state.ra_sub_category)
-                        .get(brand)
-                    )
-                else:
-                    result = None
-
-                st.session_state.ra_available_appliance_model_numbers = result
+                    or None
+                )
 
             except Exception as error:
                 st.error(error)
@@ -940,33 +883,21 @@ def register_new_appliance():
                 )
 
                 try:
-                    # Upload Invoice to blob
-                    uploaded_purchase_invoice_to_bucket = (
-                        customer_records_bucket.upload_purchase_invoice(
-                            customer_id=st.session_state.customer_id,
-                            serial_number=st.session_state.ra_serial_number,
-                            sub_category=st.session_state.ra_sub_category,
-                            file=ra_purchase_invoice_file,
-                        )
-                    )
-
-                    progress_bar.progress(
-                        50,
-                        "Registering your appliance warranty",
-                    )
-
-                except Exception as error:
-                    uploaded_purchase_invoice_to_bucket = False
-                    flag_appliance_registration_status = False
-
-                try:
-                    # Upload Warranty to blob
-                    uploaded_warranty_certificate_to_bucket = (
-                        customer_records_bucket.upload_warranty_certificate(
+                    # Invoice and warranty certificate upload side by side;
+                    # the bar moves from 25 to 75 as their bytes go out.
+                    uploaded_documents_to_bucket = (
+                        customer_records_bucket.upload_appliance_documents(
                             customer_id=st.session_state.customer_id,
                             serial_number=st.session_state.ra_serial_number,
                             sub_category=st.session_state.ra_sub_category,
-                            file=ra_warranty_certificate_file,
+                            purchase_invoice=ra_purchase_invoice_file,
+                            warranty_certificate=ra_warranty_certificate_file,
+                            progress_callback=lambda done_bytes, total_bytes: (
+                                progress_bar.progress(
+                                    25 + int(50 * done_bytes / max(total_bytes, 1)),
+                                    "Uploading your invoice and warranty certificate",
+                                )
+                            ),
                         )
                     )
 
@@ -976,24 +907,22 @@ def register_new_appliance():
                     )
 
                 except Exception as error:
-                    uploaded_warranty_certificate_to_bucket = False
+                    uploaded_documents_to_bucket = False
                     flag_appliance_registration_status = False
 
                 # Store data in cloud sql
-                if (
-                    uploaded_purchase_invoice_to_bucket
-                    and uploaded_warranty_certificate_to_bucket
-                ):
-                    query_appliances = Appliances()
+                if uploaded_documents_to_bucket:
                     model_customer_appliances = ModelCustomerAppliances()
 
                     try:
+                        appliance = get_appliance_catalog().appliance(
+                            st.session_state.ra_model_number,
+                            brand=st.session_state.ra_brand,
+                            sub_category=st.session_state.ra_sub_category,
+                        )
                         warranty_period_in_months, appliance_image_gcs_url = (
-                            query_appliances.fetch_warranty_period_and_appliance_image_url_by_brand_sub_category_and_model_number(
-                                brand=st.session_state.ra_brand,
-                                sub_category=st.session_state.ra_sub_category,
-                                model_number=st.session_state.ra_model_number,
-                            )
+                            appliance["warranty_period"],
+                            appliance["appliance_image_url"],
                         )
 
                         warranty_expiration_date = (
@@ -1031,7 +960,9 @@ def register_new_appliance():
 
                 if flag_appliance_registration_status == True:
                     try:
-                        fetch_and_cache_customer_appliance_details.clear()
+                        invalidate_scope(
+                            "customer", st.session_state.customer_id, "appliances"
+                        )
 
                     except Exception as error:
                         pass
@@ -1151,7 +1082,7 @@ def create_new_onsite_service_request():
 
     with st.spinner("Fetching data...", show_time=True):
 
-        @st.cache_data(show_spinner=False)
+        @scoped_cache("customer", "appliances")
         def fetch_and_cache_customer_appliance_serials(session_id):
             query_customer_appliances = QueryCustomerAppliances()
 
@@ -1421,12 +1352,18 @@ def create_new_onsite_service_request():
                     if cosr_attachments:
                         onsite_service_requests_bucket = OnsiteServiceRequestsBucket()
 
-                        for attachment in cosr_attachments:
-                            onsite_service_requests_bucket.upload_customer_attachment(
-                                request_id=service_request_id,
-                                image_file=attachment,
-                                image_filename=attachment.name,
-                            )
+                        # All attachments upload as one batch; the bar moves
+                        # from 60 to 80 as their bytes go out.
+                        onsite_service_requests_bucket.upload_customer_attachments(
+                            request_id=service_request_id,
+                            attachments=cosr_attachments,
+                            progress_callback=lambda done_bytes, total_bytes: (
+                                progress_bar.progress(
+                                    60 + int(20 * done_bytes / max(total_bytes, 1)),
+                                    "Uploading your attachments",
+                                )
+                            ),
+                        )
 
                         progress_bar.progress(80, "Finalizing your service request")
 
@@ -1437,37 +1374,28 @@ def create_new_onsite_service_request():
                     )
                     time.sleep(2)
 
-                engineer_assignment_cloud_run_payload = {
-                    "customer_id": str(st.session_state.customer_id),
-                    "request_id": str(service_request_id),
-                }
-
-                response = requests.post(
-                    str(st.secrets[
-                        "URL_CLOUD_RUN_ONSITE_ENGINEER_ASSIGNMENT_SERVICE"
-                    ]),
-                    json=engineer_assignment_cloud_run_payload,
-                )
+                # dispatch() assigns the request to ADMIN itself if it cannot
+                # be queued; reaching this means that fallback failed too.
+                try:
+                    get_engineer_assignment_dispatcher().dispatch(
+                        st.session_state.customer_id, service_request_id
+                    )
 
-                if response.status_code != 200:
-                    try:
-                        onsite_service_request_collection = (
-                            OnsiteServiceRequestCollection()
-                        )
-                        onsite_service_request_collection.update_engineer_for_service_request(
-                            str(st.session_state.customer_id),
-                            service_request_id,
-                            "ADMIN",
-                        )
-                    except Exception as error:
-                        pass
+                except Exception as error:
+                    logger.error(
+                        "Engineer assignment for %s failed, including the ADMIN "
+                        "fallback: %s",
+                        service_request_id,
+                        error,
+                    )
 
+                # Email and SMS are queued and delivered in the background.
                 try:
-                    transaction_email_channel = TransactionalEmails()
-
-                    transaction_email_channel.send_onsite_service_request_confirmation_mail(
+                    get_notification_dispatcher().send_email(
+                        "onsite_service_request_confirmation",
+                        idempotency_key=service_request_id,
                         receiver_full_name=st.session_state.customer_name,
-                        receiver_email=st.session_state.st.session_state.cosr_email,
+                        receiver_email=st.session_state.cosr_email,
                         service_request_id=service_request_id,
                     )
 
@@ -1475,9 +1403,9 @@ def create_new_onsite_service_request():
                     pass
 
                 try:
-                    notification_sms_channel = NotificationSMS()
-
-                    notification_sms_channel.send_onsite_service_request_confirmation_sms(
+                    get_notification_dispatcher().send_sms(
+                        "onsite_service_request_confirmation",
+                        idempotency_key=service_request_id,
                         receivers_phone_number=st.session_state.cosr_phone_number,
                         service_request_id=service_request_id,
                     )
@@ -1500,7 +1428,9 @@ def create_new_onsite_service_request():
                 del st.session_state.customer_appliances
 
                 try:
-                    fetch_and_cache_customers_service_requests.clear()
+                    invalidate_scope(
+                        "customer", st.session_state.customer_id, "service_requests"
+                    )
                 except Exception as error:
                     pass
 
@@ -1536,7 +1466,7 @@ def view_service_request_details(service_request_id, service_request_details):
         if service_request_details.get("assignment_status").lower() == "confirmed":
             assigned_to_engineer_id = service_request_details.get("assigned_to")
 
-            @st.cache_data(show_spinner=False)
+            @scoped_cache("customer", "service_requests")
             def get_engineer_name(assigned_to_engineer_id, session_id):
                 query_engineers = QueryEngineers()
 
@@ -1773,7 +1703,7 @@ def view_service_request_details(service_request_id, service_request_details):
         with colb:
             st.button("Post Update", use_container_width=True)
 
-        @st.cache_data(show_spinner=False)
+        @scoped_cache("customer", "service_requests")
         def fetch_and_cache_ticket_activity(customer_id, request_id, session_id):
             onsite_service_request_collection = OnsiteServiceRequestCollection()
             return onsite_service_request_collection.fetch_service_request_activity(
@@ -1925,7 +1855,9 @@ def edit_service_request_details(service_request_id, service_request_details):
             )
 
             try:
-                fetch_and_cache_customers_service_requests.clear()
+                invalidate_scope(
+                    "customer", st.session_state.customer_id, "service_requests"
+                )
             except Exception as error:
                 pass
 
@@ -1946,7 +1878,7 @@ def edit_service_request_details(service_request_id, service_request_details):
 
 ############################# [CACHED FUNCTIONS] ##############################
 
-@st.cache_data(show_spinner=False)
+@scoped_cache("customer", "appliances")
 def fetch_and_cache_customer_appliance_details(session_id):
     query_customer_appliances = QueryCustomerAppliances()
 
@@ -2042,7 +1974,7 @@ def fetch_and_cache_customer_appliance_details(session_id):
                 pass
 
 
-@st.cache_data(show_spinner=False)
+@scoped_cache("customer", "service_requests")
 def fetch_and_cache_customers_service_requests(session_id):
     onsite_service_request_collection = OnsiteServiceRequestCollection()
 
@@ -2054,16 +1986,15 @@ def fetch_and_cache_customers_service_requests(session_id):
     )
 
 
-@st.cache_data(show_spinner=False)
-def fetch_and_cache_best_appliances_by_energy_rating(session_id):
+# The same four appliances for every customer, so one entry serves them all.
+@scoped_cache("global", "catalog")
+def fetch_and_cache_best_appliances_by_energy_rating():
     query_appliances = Appliances()
 
-    st.session_state.best_appliancs_by_energy_rating = (
-        query_appliances.fetch_best_appliances_by_energy_rating(count=4)
-    )
+    return query_appliances.fetch_best_appliances_by_energy_rating(count=4)
 
 
-@st.cache_data(show_spinner=False)
+@scoped_cache("customer", "service_requests")
 def fetch_and_cache_all_customer_service_requests(session_id):
     onsite_service_request_collection = OnsiteServiceRequestCollection()
 
@@ -2097,7 +2028,7 @@ def get_greetings(is_ist, session_id):
     return greeting
 
 
-@st.cache_data(show_spinner=False)
+@scoped_cache("customer", "profile")
 def get_customer_details(full_name, session_id):
     query_customers = QueryCustomers()
 
@@ -2122,6 +2053,41 @@ def get_customer_details(full_name, session_id):
 
     return st.session_state.customer_name
 
+
+@st.cache_resource(show_spinner=False)
+def start_engineer_assignment_dispatcher():
+    engineer_assignment_dispatcher = get_engineer_assignment_dispatcher()
+    engineer_assignment_dispatcher.start()
+
+    return engineer_assignment_dispatcher
+
+
+@st.cache_resource(show_spinner=False)
+def start_notification_dispatcher():
+    notification_dispatcher = get_notification_dispatcher()
+    notification_dispatcher.start()
+
+    return notification_dispatcher
+
+
+def clear_customer_caches():
+    # Only this customer's entries are evicted: other signed-in customers
+    # keep a warm cache, and process-wide resources (dispatchers, catalog,
+    # the ADK runner) stay up.
+    invalidate_scope("customer", st.session_state.customer_id)
+
+    fetch_and_cache_username_by_customer_email.clear(
+        session_id=st.session_state.current_session
+    )
+
+    # The agent page may never have been opened in this process, in which
+    # case there is no ADK session to drop and ADK need not be imported.
+    customer_agent_runner = sys.modules.get("customer_agent.runner")
+    if customer_agent_runner is not None:
+        customer_agent_runner.initialize_adk.clear(
+            user_id=st.session_state.customer_id
+        )
+
 ################################# [THEMEING] ##################################
 
 if "themes" not in st.session_state:
@@ -2250,10 +2216,51 @@ if __name__ == "__main__":
 
                     st.markdown(" ", unsafe_allow_html=True)
 
+        log_import_profile("customer_app: landing page")
         st.stop()
 
     ########################### [ON AUTHENTICATION] ###########################
 
+    # The SDKs behind these (Cloud SQL connector, Firestore, Cloud Storage,
+    # Maps, Brevo, Twilio) are imported only once a customer has signed in,
+    # so the landing page starts without them. The dialogs defined above
+    # look the names up when they run, which is always after this point.
+    from backend.utils.address_cache import lookup_pincode
+    from backend.utils.geo_operations import LocationServices
+    from backend.module.assignment_dispatcher import get_engineer_assignment_dispatcher
+    from backend.module.notification_dispatcher import get_notification_dispatcher
+
+    from database.cloud_sql.catalog import get_appliance_catalog
+    from database.cloud_sql.migrations import MigrateCustomers
+    from database.cloud_sql.models import ModelCustomers, ModelCustomerAppliances
+    from database.cloud_sql.queries import (
+        Appliances,
+        QueryCustomerAppliances,
+        QueryCustomers,
+        QueryEngineers,
+    )
+
+    from database.cloud_storage.document_storage import CustomerRecordsBucket
+    from database.cloud_storage.multimedia_storage import (
+        OnsiteServiceRequestsBucket,
+        ProfilePicturesBucket,
+    )
+
+    from database.firebase.firestore import OnsiteServiceRequestCollection
+
+    log_import_profile("customer_app: signed in")
+
+    # The catalog is the same for every user, so all sessions share one
+    # process-wide snapshot that refreshes itself when the table changes.
+    try:
+        st.session_state.distinct_appliance_data = (
+            get_appliance_catalog().as_nested_dict()
+        )
+    except Exception as error:
+        if "distinct_appliance_data" not in st.session_state:
+            st.session_state.distinct_appliance_data = {}
+
+
     auth_exception_flag = False
 
     @st.cache_data(show_spinner=False)
@@ -2294,6 +2301,15 @@ if __name__ == "__main__":
             session_id=st.session_state.current_session,
         )
 
+        # Drains assignments and notifications left in the outbox by an
+        # earlier process.
+        try:
+            start_engineer_assignment_dispatcher()
+            start_notification_dispatcher()
+
+        except Exception as error:
+            pass
+
         if "customer_appliances" not in st.session_state:
             query_customer_appliances = QueryCustomerAppliances()
 
@@ -2408,9 +2424,8 @@ if __name__ == "__main__":
                     st.session_state.themes["refreshed"] = False
                     st.session_state.themes["current_theme"] = "light"
 
+                    clear_customer_caches()
                     st.session_state.clear()
-                    st.cache_data.clear()
-                    st.cache_resource.clear()
 
                     st.logout()
                     st.stop()
@@ -2946,8 +2961,8 @@ if __name__ == "__main__":
 
             col1, col2, col3, col4 = st.columns(4)
 
-            fetch_and_cache_best_appliances_by_energy_rating(
-                session_id=st.session_state.current_session
+            st.session_state.best_appliancs_by_energy_rating = (
+                fetch_and_cache_best_appliances_by_energy_rating()
             )
 
             if st.session_state.best_appliancs_by_energy_rating:
@@ -3744,9 +3759,8 @@ if __name__ == "__main__":
                             use_container_width=True,
                             help="Log Out",
                         ):
+                            clear_customer_caches()
                             st.session_state.clear()
-                            st.cache_data.clear()
-                            st.cache_resource.clear()
 
                             st.logout()
                             st.stop()
@@ -0,0 +1,300 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import json
+import time
+import logging
+import threading
+import sqlalchemy
+
+import streamlit as st
+from dotenv import load_dotenv
+
+from google.cloud.sql.connector import Connector
+from google.oauth2.service_account import Credentials
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# How often a process asks Cloud SQL whether the catalog changed. Writes made
+# through MigrateAppliances / ModelAppliances invalidate it immediately; this
+# only bounds how long other replicas serve a stale snapshot.
+APPLIANCE_CATALOG_VERSION_CHECK_SECONDS: int = int(
+    os.getenv("APPLIANCE_CATALOG_VERSION_CHECK_SECONDS", "60")
+)
+
+
+def _catalog_key(name):
+    # MySQL compares these columns case-insensitively and ignores trailing
+    # spaces, and the agents pass user wording through, so lookups do too.
+    return str(name or "").strip().casefold()
+
+
+def _find(mapping, name):
+    if name in mapping:
+        return mapping[name]
+
+    key = _catalog_key(name)
+
+    for candidate, value in mapping.items():
+        if _catalog_key(candidate) == key:
+            return value
+
+    return None
+
+
+# Immutable view of the appliances table; a refresh builds a new one and
+# swaps it in, so readers never see a half-built index.
+class _CatalogSnapshot:
+    def __init__(self, rows, version):
+        self.version = version
+        self.tree = {}
+        self.tree_by_sub_category = {}
+        self.appliances = {}
+
+        for (
+            category,
+            sub_category,
+            brand,
+            model_number,
+            appliance_name,
+            warranty_period,
+            appliance_image_url,
+        ) in rows:
+            models = (
+                self.tree.setdefault(category, {})
+                .setdefault(sub_category, {})
+                .setdefault(brand, [])
+            )
+            if model_number not in models:
+                models.append(model_number)
+
+            models = self.tree_by_sub_category.setdefault(sub_category, {}).setdefault(
+                brand, []
+            )
+            if model_number not in models:
+                models.append(model_number)
+
+            self.appliances[_catalog_key(model_number)] = {
+                "model_number": model_number,
+                "appliance_name": appliance_name,
+                "brand": brand,
+                "category": category,
+                "sub_category": sub_category,
+                "warranty_period": int(warranty_period),
+                "appliance_image_url": appliance_image_url,
+            }
+
+
+class ApplianceCatalog:
+    def __init__(
+        self,
+        engine_factory=None,
+        version_check_seconds=APPLIANCE_CATALOG_VERSION_CHECK_SECONDS,
+    ):
+        self.engine_factory = engine_factory or self._create_engine
+        self.version_check_seconds = version_check_seconds
+
+        self.connector = None
+
+        self._engine = None
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._rebuild_requested = False
+        self._lock = threading.Lock()
+
+        self.builds = 0
+
+    def _get_connection(self):
+        if self.connector is None:
+            credentials = Credentials.from_service_account_info(
+                json.loads(st.secrets["CLOUD_SQL_SERVICE_ACCOUNT_KEY"])
+            )
+
+            self.connector = Connector(credentials=credentials)
+
+        conn = self.connector.connect(
+            st.secrets["CLOUD_SQL_MYSQL_INSTANCE_CONNECTION_STRING"],
+            st.secrets["CLOUD_SQL_MYSQL_DRIVER"],
+            user=st.secrets["CLOUD_SQL_MYSQL_USER"],
+            password=st.secrets["CLOUD_SQL_PASSWORD"],
+            db=st.secrets["CLOUD_SQL_MYSQL_DB"],
+        )
+        return conn
+
+    def _create_engine(self):
+        return sqlalchemy.create_engine(
+            "mysql+pymysql://",
+            creator=self._get_connection,
+            pool_pre_ping=True,
+        )
+
+    def _get_engine(self):
+        if self._engine is None:
+            self._engine = self.engine_factory()
+
+        return self._engine
+
+    def bind(self, engine_factory):
+        with self._lock:
+            self.engine_factory = engine_factory
+            self._engine = None
+            self._snapshot = None
+            self._checked_at = 0.0
+
+    def _fetch_version(self, db_conn):
+        # COUNT and MAX(appliance_id) catch inserts and deletes, which
+        # updated_at alone would miss.
+        result = db_conn.execute(
+            sqlalchemy.text(
+                """
+                SELECT COUNT(*), MAX(appliance_id), MAX(updated_at)
+                FROM appliances
+                """
+            )
+        ).fetchone()
+
+        return tuple(str(value) for value in result)
+
+    def _build(self, db_conn, version):
+        rows = db_conn.execute(
+            sqlalchemy.text(
+                """
+                SELECT category, sub_category, brand, model_number,
+                appliance_name, warranty_period, appliance_image_url
+                FROM appliances
+                ORDER BY appliance_id
+                """
+            )
+        ).fetchall()
+
+        self.builds += 1
+        return _CatalogSnapshot(rows, version)
+
+    def _is_fresh(self, snapshot):
+        return (
+            snapshot is not None
+            and not self._rebuild_requested
+            and time.monotonic() - self._checked_at < self.version_check_seconds
+        )
+
+    def _current(self):
+        snapshot = self._snapshot
+
+        if self._is_fresh(snapshot):
+            return snapshot
+
+        with self._lock:
+            if self._is_fresh(self._snapshot):
+                return self._snapshot
+
+            try:
+                with self._get_engine().connect() as db_conn:
+                    version = self._fetch_version(db_conn)
+
+                    if (
+                        self._snapshot is None
+                        or self._rebuild_requested
+                        or self._snapshot.version != version
+                    ):
+                        self._snapshot = self._build(db_conn, version)
+                        self._rebuild_requested = False
+
+            except Exception as error:
+                # Serve the last good snapshot through a database blip; with
+                # nothing loaded yet the caller sees the error as before.
+                if self._snapshot is None:
+                    raise
+
+                logger.warning("Appliance catalog refresh failed: %s", error)
+
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def invalidate(self):
+        # The snapshot is kept so a failed rebuild can still fall back to
+        # it, but the next read rebuilds whatever the version probe says.
+        with self._lock:
+            self._rebuild_requested = True
+
+    def categories(self):
+        return list(self._current().tree)
+
+    def sub_categories(self, category=None):
+        snapshot = self._current()
+
+        if category is None:
+            return list(snapshot.tree_by_sub_category)
+
+        return list(_find(snapshot.tree, category) or {})
+
+    def brands(self, category, sub_category):
+        sub_categories = _find(self._current().tree, category) or {}
+        return list(_find(sub_categories, sub_category) or {})
+
+    def model_numbers(self, category, sub_category, brand):
+        sub_categories = _find(self._current().tree, category) or {}
+        brands = _find(sub_categories, sub_category) or {}
+        return list(_find(brands, brand) or [])
+
+    def category_for_sub_category(self, sub_category):
+        for category, sub_categories in self._current().tree.items():
+            if _find(sub_categories, sub_category) is not None:
+                return category
+
+        return None
+
+    def appliance(self, model_number, brand=None, sub_category=None):
+        appliance = self._current().appliances.get(_catalog_key(model_number))
+
+        if appliance is None:
+            return None
+
+        if brand is not None and _catalog_key(brand) != _catalog_key(
+            appliance["brand"]
+        ):
+            return None
+
+        if sub_category is not None and _catalog_key(sub_category) != _catalog_key(
+            appliance["sub_category"]
+        ):
+            return None
+
+        return dict(appliance)
+
+    def as_nested_dict(self, include_category=True):
+        # Shared with every session; callers must treat it as read-only.
+        snapshot = self._current()
+        return snapshot.tree if include_category else snapshot.tree_by_sub_category
+
+
+_appliance_catalog = None
+_appliance_catalog_lock = threading.Lock()
+
+
+def get_appliance_catalog() -> ApplianceCatalog:
+    global _appliance_catalog
+
+    if _appliance_catalog is None:
+        with _appliance_catalog_lock:
+            if _appliance_catalog is None:
+                _appliance_catalog = ApplianceCatalog()
+
+    return _appliance_catalog
+
+
+def invalidate_appliance_catalog():
+    if _appliance_catalog is not None:
+        _appliance_catalog.invalidate()
@@ -23,6 +23,8 @@ from dotenv import load_dotenv
 from google.cloud.sql.connector import Connector
 from google.oauth2.service_account import Credentials
 
+from database.cloud_sql.catalog import invalidate_appliance_catalog
+
 load_dotenv()
 logger = logging.getLogger(__name__).setLevel(logging.ERROR)
 warnings.filterwarnings("ignore")
@@ -69,6 +71,8 @@ class MigrateAppliances:
             db_conn.execute(query, parameters=update_values)
             db_conn.commit()
 
+        invalidate_appliance_catalog()
+
     def delete_appliance(self, model_number):
         pool = sqlalchemy.create_engine(
             "mysql+pymysql://",
@@ -86,6 +90,8 @@ class MigrateAppliances:
 
             db_conn.commit()
 
+        invalidate_appliance_catalog()
+
 
 class MigrateCustomers:
     def __init__(self):
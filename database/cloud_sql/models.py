@@ -23,6 +23,8 @@ from dotenv import load_dotenv
 from google.cloud.sql.connector import Connector
 from google.oauth2.service_account import Credentials
 
+from database.cloud_sql.catalog import invalidate_appliance_catalog
+
 load_dotenv()
 warnings.filterwarnings("ignore")
 
@@ -123,6 +125,8 @@ class ModelAppliances:
 
             db_conn.commit()
 
+        invalidate_appliance_catalog()
+
 
 class ModelCustomerAppliances:
     def __init__(self):
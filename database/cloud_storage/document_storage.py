@@ -13,58 +13,51 @@
 # limitations under the License.
 
 import os
-import json
 import warnings
 
-import streamlit as st
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
 
-from google.cloud import storage
-from google.oauth2.service_account import Credentials
+from database.cloud_storage.storage_backend import get_storage_backend
+from database.cloud_storage.upload_manager import get_upload_manager
+from database.cloud_storage.signed_urls import (
+    sign_blob_url,
+    sign_blob_urls,
+    storage_path_slug,
+)
 
 load_dotenv()
 warnings.filterwarnings("ignore")
 
 
+def _purchase_invoice_path(customer_id, serial_number, sub_category):
+    return (
+        f"purchase_invoices/{storage_path_slug(customer_id)}_"
+        f"{storage_path_slug(serial_number)}_{storage_path_slug(sub_category)}"
+        "_purchase_invoice.pdf"
+    )
+
+
+def _warranty_certificate_path(customer_id, serial_number, sub_category):
+    return (
+        f"warranty_certificates/{storage_path_slug(customer_id)}_"
+        f"{storage_path_slug(serial_number)}_{storage_path_slug(sub_category)}"
+        "_warranty_certificate.pdf"
+    )
+
+
 class CustomerRecordsBucket:
     def __init__(self):
-        credentials = Credentials.from_service_account_info(
-            json.loads(st.secrets["CLOUD_STORAGE_SERVICE_ACCOUNT_KEY"])
-        )
-
-        self.storage_client = storage.Client(credentials=credentials)
+        self.storage_client = get_storage_backend()
 
     def upload_purchase_invoice(
         self, customer_id, serial_number, sub_category, file,
     ):
         bucket = self.storage_client.bucket("customer_records_bucket")
-
-        blob = bucket.blob(
-            f"purchase_invoices/{
-                customer_id.replace(
-                    '/',
-                    '_').replace(
-                    '-',
-                    '_').replace(
-                    ' ',
-                    '_').lower()}_{
-                        serial_number.replace(
-                            '/',
-                            '_').replace(
-                                '-',
-                                '_').replace(
-                                    ' ',
-                                    '_').lower()}_{
-                                        sub_category.replace(
-                                            '/',
-                                            '_').replace(
-                                                '-',
-                                                '_').replace(
-                                                    ' ',
-                                            '_').lower()}_purchase_invoice.pdf"
+        get_upload_manager().upload(
+            bucket,
+            _purchase_invoice_path(customer_id, serial_number, sub_category),
+            file,
         )
-        blob.upload_from_file(file)
 
         return True
 
@@ -74,28 +67,7 @@ class CustomerRecordsBucket:
         bucket = self.storage_client.bucket("customer_records_bucket")
 
         blob = bucket.blob(
-            f"purchase_invoices/{
-                customer_id.replace(
-                    '/',
-                    '_').replace(
-                    '-',
-                    '_').replace(
-                    ' ',
-                    '_').lower()}_{
-                        serial_number.replace(
-                            '/',
-                            '_').replace(
-                                '-',
-                                '_').replace(
-                                    ' ',
-                                    '_').lower()}_{
-                                        sub_category.replace(
-                                            '/',
-                                            '_').replace(
-                                                '-',
-                                                '_').replace(
-                                                    ' ',
-                                            '_').lower()}_purchase_invoice.pdf"
+            _purchase_invoice_path(customer_id, serial_number, sub_category)
         )
 
         blob.download_to_filename(downloaded_file_path)
@@ -106,67 +78,51 @@ class CustomerRecordsBucket:
         customer_id,
         serial_number,
         sub_category,
-        expire_in=datetime.today() + timedelta(3),
+        expire_in=None,
     ):
         bucket = self.storage_client.bucket("customer_records_bucket")
 
-        image_url = bucket.blob(
-            f"purchase_invoices/{
-                customer_id.replace(
-                    '/',
-                    '_').replace(
-                    '-',
-                    '_').replace(
-                    ' ',
-                    '_').lower()}_{
-                        serial_number.replace(
-                            '/',
-                            '_').replace(
-                                '-',
-                                '_').replace(
-                                    ' ',
-                                    '_').lower()}_{
-                                        sub_category.replace(
-                                            '/',
-                                            '_').replace(
-                                                '-',
-                                                '_').replace(
-                                                    ' ',
-                                            '_').lower()}_purchase_invoice.pdf"
-        ).generate_signed_url(expire_in)
-        return image_url
+        return sign_blob_url(
+            bucket,
+            _purchase_invoice_path(customer_id, serial_number, sub_category),
+            expire_in,
+        )
 
     def upload_warranty_certificate(
         self, customer_id, serial_number, sub_category, file,
     ):
         bucket = self.storage_client.bucket("customer_records_bucket")
+        get_upload_manager().upload(
+            bucket,
+            _warranty_certificate_path(customer_id, serial_number, sub_category),
+            file,
+        )
 
-        blob = bucket.blob(
-            f"warranty_certificates/{
-                customer_id.replace(
-                    '/',
-                    '_').replace(
-                    '-',
-                    '_').replace(
-                    ' ',
-                    '_').lower()}_{
-                        serial_number.replace(
-                            '/',
-                            '_').replace(
-                                '-',
-                                '_').replace(
-                                    ' ',
-                                    '_').lower()}_{
-                                        sub_category.replace(
-                                            '/',
-                                            '_').replace(
-                                                '-',
-                                                '_').replace(
-                                                    ' ',
-                                            '_').lower()
-                                            }_warranty_certificate.pdf"
+        return True
+
+    def upload_appliance_documents(
+        self,
+        customer_id,
+        serial_number,
+        sub_category,
+        purchase_invoice,
+        warranty_certificate,
+        progress_callback=None,
+    ):
+        bucket = self.storage_client.bucket("customer_records_bucket")
+
+        get_upload_manager().upload_many(
+            bucket,
+            {
+                _purchase_invoice_path(
+                    customer_id, serial_number, sub_category
+                ): purchase_invoice,
+                _warranty_certificate_path(
+                    customer_id, serial_number, sub_category
+                ): warranty_certificate,
+            },
+            progress_callback=progress_callback,
         )
-        blob.upload_from_file(file)
 
         return True
 
@@ -176,29 +132,7 @@ class CustomerRecordsBucket:
         bucket = self.storage_client.bucket("customer_records_bucket")
 
         blob = bucket.blob(
-            f"warranty_certificates/{
-                customer_id.replace(
-                    '/',
-                    '_').replace(
-                    '-',
-                    '_').replace(
-                    ' ',
-                    '_').lower()}_{
-                        serial_number.replace(
-                            '/',
-                            '_').replace(
-                                '-',
-                                '_').replace(
-                                    ' ',
-                                    '_').lower()}_{
-                                        sub_category.replace(
-                                            '/',
-                                            '_').replace(
-                                                '-',
-                                                '_').replace(
-                                                    ' ',
-                                            '_').lower()
-                                            }_warranty_certificate.pdf"
+            _warranty_certificate_path(customer_id, serial_number, sub_category)
         )
         blob.download_to_filename(downloaded_file_path)
 
@@ -209,51 +143,66 @@ class CustomerRecordsBucket:
         customer_id,
         serial_number,
         sub_category,
-        expire_in=datetime.today() + timedelta(3),
+        expire_in=None,
     ):
         bucket = self.storage_client.bucket("customer_records_bucket")
 
-        image_url = bucket.blob(
-            f"warranty_certificates/{
-                customer_id.replace(
-                    '/',
-                    '_').replace(
-                    '-',
-                    '_').replace(
-                    ' ',
-                    '_').lower()}_{
-                        serial_number.replace(
-                            '/',
-                            '_').replace(
-                                '-',
-                                '_').replace(
-                                    ' ',
-                                    '_').lower()}_{
-                                        sub_category.replace(
-                                            '/',
-                                            '_').replace(
-                                                '-',
-                                                '_').replace(
-                                                    ' ',
-                                            '_').lower()
-                                            }_warranty_certificate.pdf"
-        ).generate_signed_url(expire_in)
-        return image_url
+        return sign_blob_url(
+            bucket,
+            _warranty_certificate_path(customer_id, serial_number, sub_category),
+            expire_in,
+        )
 
+    def fetch_appliance_document_urls(self, appliances, expire_in=None):
+        # One call for a whole appliance list or ticket queue; each item needs
+        # customer_id, serial_number and sub_category.
+        bucket = self.storage_client.bucket("customer_records_bucket")
 
-class ServiceManualBucket:
-    def __init__(self):
-        credentials = Credentials.from_service_account_info(
-            json.loads(st.secrets["CLOUD_STORAGE_SERVICE_ACCOUNT_KEY"])
+        document_paths = {
+            appliance["serial_number"]: (
+                _purchase_invoice_path(
+                    appliance["customer_id"],
+                    appliance["serial_number"],
+                    appliance["sub_category"],
+                ),
+                _warranty_certificate_path(
+                    appliance["customer_id"],
+                    appliance["serial_number"],
+                    appliance["sub_category"],
+                ),
+            )
+            for appliance in appliances
+        }
+
+        urls = sign_blob_urls(
+            bucket,
+            [path for paths in document_paths.values() for path in paths],
+            expire_in,
         )
 
-        self.storage_client = storage.Client(credentials=credentials)
+        return {
+            serial_number: {
+                "product_invoice_url": urls[invoice_path],
+                "warranty_certificate_url": urls[certificate_path],
+            }
+            for serial_number, (
+                invoice_path,
+                certificate_path,
+            ) in document_paths.items()
+        }
+
+
+class ServiceManualBucket:
+    def __init__(self):
+        self.storage_client = get_storage_backend()
 
     def upload_service_manual(self, local_file_path, cloud_storage_path):
         bucket = self.storage_client.bucket("service_manual_bucket")
 
-        blob = bucket.blob(cloud_storage_path)
-        blob.upload_from_filename(local_file_path)
+        with open(local_file_path, "rb") as service_manual_file:
+            get_upload_manager().upload(
+                bucket, cloud_storage_path, service_manual_file
+            )
 
         return cloud_storage_path
 
@@ -265,12 +214,21 @@ class ServiceManualBucket:
 
         return local_file_path
 
-    def fetch_service_manual_url(
-        self, file_name, expire_in=datetime.today() + timedelta(3)
-    ):
+    def fetch_service_manual_url(self, file_name, expire_in=None):
+        bucket = self.storage_client.bucket("service_manual_bucket")
+
+        return sign_blob_url(bucket, file_name, expire_in)
+
+    def fetch_service_manual_urls(self, file_names, expire_in=None):
+        bucket = self.storage_client.bucket("service_manual_bucket")
+
+        return sign_blob_urls(bucket, file_names, expire_in)
+
+    def fetch_service_manual_generation(self, file_name):
         bucket = self.storage_client.bucket("service_manual_bucket")
+        blob = bucket.get_blob(file_name)
 
-        service_manual_url = bucket.blob(
-            file_name).generate_signed_url(expire_in)
+        if blob is None:
+            return None
 
-        return service_manual_url
+        return str(blob.generation)
@@ -0,0 +1,206 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+IMAGE_UPLOAD_FORMAT: str = os.getenv("IMAGE_UPLOAD_FORMAT", "WEBP").upper()
+IMAGE_UPLOAD_QUALITY: int = int(os.getenv("IMAGE_UPLOAD_QUALITY", "80"))
+ATTACHMENT_MAX_DIMENSION: int = int(os.getenv("ATTACHMENT_MAX_DIMENSION", "1600"))
+PROFILE_PICTURE_MAX_DIMENSION: int = int(
+    os.getenv("PROFILE_PICTURE_MAX_DIMENSION", "512")
+)
+IMAGE_PIPELINE_WORKERS: int = int(os.getenv("IMAGE_PIPELINE_WORKERS", "2"))
+
+_OUTPUT_FORMATS = {
+    "WEBP": ("image/webp", "webp"),
+    "JPEG": ("image/jpeg", "jpg"),
+}
+
+
+def _read_upload(file):
+    # Streamlit's UploadedFile is a BytesIO; getvalue() ignores wherever an
+    # earlier reader left the cursor.
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+
+    if hasattr(file, "seek"):
+        file.seek(0)
+
+    return file.read()
+
+
+def _encode(image, output_format, quality):
+    if output_format == "JPEG" and image.mode not in ("RGB", "L"):
+        if "A" in image.getbands() or "transparency" in image.info:
+            # JPEG has no alpha channel; flatten onto white like a browser.
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        else:
+            image = image.convert("RGB")
+
+    elif output_format == "WEBP" and image.mode not in ("RGB", "RGBA"):
+        image = image.convert(
+            "RGBA"
+            if "A" in image.getbands() or "transparency" in image.info
+            else "RGB"
+        )
+
+    if output_format == "WEBP":
+        save_options = {"quality": quality, "method": 4}
+    else:
+        save_options = {"quality": quality, "optimize": True, "progressive": True}
+
+    # No exif= or icc_profile= is passed, so camera metadata (GPS position,
+    # device, timestamps) is not written to the stored file.
+    buffer = io.BytesIO()
+    image.save(buffer, output_format, **save_options)
+
+    return buffer.getvalue()
+
+
+def process_image(
+    data,
+    max_dimension,
+    output_format=IMAGE_UPLOAD_FORMAT,
+    quality=IMAGE_UPLOAD_QUALITY,
+):
+    try:
+        image = Image.open(io.BytesIO(data))
+        has_metadata = bool(image.getexif())
+
+        # Lets the JPEG decoder scale down by up to 8x while decoding, which
+        # is most of the cost for a 12 MP phone photo.
+        image.draft("RGB", (max_dimension, max_dimension))
+
+        # Orientation lives in EXIF, which is dropped below, so it is
+        # applied to the pixels first.
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+        # Some images decode but cannot be converted or saved in the target
+        # format (e.g. 16-bit or unusual CMYK modes); they are stored as they
+        # came, like anything else Pillow cannot process.
+        encoded = _encode(image, output_format, quality)
+
+    except (
+        UnidentifiedImageError,
+        Image.DecompressionBombError,
+        OSError,
+        ValueError,
+    ):
+        return None
+
+    content_type, extension = _OUTPUT_FORMATS[output_format]
+
+    # Small or already well-compressed images can grow when re-encoded. The
+    # original is kept then, unless it carries metadata that must go.
+    if len(encoded) >= len(data) and not has_metadata:
+        return None
+
+    return {
+        "data": encoded,
+        "content_type": content_type,
+        "extension": extension,
+        "width": image.width,
+        "height": image.height,
+    }
+
+
+class ImageProcessingPipeline:
+    def __init__(self, max_workers=IMAGE_PIPELINE_WORKERS):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="image-processing"
+        )
+        self._lock = threading.Lock()
+
+        self.images = 0
+        self.original_bytes = 0
+        self.stored_bytes = 0
+
+    def _process(self, data, max_dimension):
+        started_at = time.perf_counter()
+
+        processed = process_image(data, max_dimension)
+
+        if processed is None:
+            # PDFs, anything Pillow cannot decode and images that would not
+            # shrink are stored as they came.
+            processed = {
+                "data": data,
+                "content_type": None,
+                "extension": None,
+            }
+
+        processed["report"] = {
+            "original_bytes": len(data),
+            "stored_bytes": len(processed["data"]),
+            "bytes_saved": len(data) - len(processed["data"]),
+            "elapsed_ms": round((time.perf_counter() - started_at) * 1000, 2),
+        }
+
+        with self._lock:
+            self.images += 1
+            self.original_bytes += processed["report"]["original_bytes"]
+            self.stored_bytes += processed["report"]["stored_bytes"]
+
+        logger.info(
+            "Image processing kept %s of %s bytes (%s saved) in %s ms",
+            processed["report"]["stored_bytes"],
+            processed["report"]["original_bytes"],
+            processed["report"]["bytes_saved"],
+            processed["report"]["elapsed_ms"],
+        )
+
+        return processed
+
+    def submit(self, file, max_dimension):
+        # The bytes are read here, on the caller's thread, because the
+        # uploaded file belongs to the script run that received it. Workers
+        # only decode, resize and encode; uploading is left to the caller.
+        return self._executor.submit(self._process, _read_upload(file), max_dimension)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "images": self.images,
+                "original_bytes": self.original_bytes,
+                "stored_bytes": self.stored_bytes,
+                "bytes_saved": self.original_bytes - self.stored_bytes,
+            }
+
+
+_image_processing_pipeline = None
+_image_processing_pipeline_lock = threading.Lock()
+
+
+def get_image_processing_pipeline() -> ImageProcessingPipeline:
+    global _image_processing_pipeline
+
+    if _image_processing_pipeline is None:
+        with _image_processing_pipeline_lock:
+            if _image_processing_pipeline is None:
+                _image_processing_pipeline = ImageProcessingPipeline()
+
+    return _image_processing_pipeline
@@ -13,27 +13,46 @@
 # limitations under the License.
 
 import os
-import json
 import warnings
 
-import streamlit as st
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
 
-from google.cloud import storage
-from google.oauth2.service_account import Credentials
+from database.cloud_storage.storage_backend import get_storage_backend
+from database.cloud_storage.upload_manager import get_upload_manager
+from database.cloud_storage.image_pipeline import (
+    ATTACHMENT_MAX_DIMENSION,
+    PROFILE_PICTURE_MAX_DIMENSION,
+    get_image_processing_pipeline,
+)
+from database.cloud_storage.signed_urls import (
+    PROFILE_PICTURE_URL_LIFETIME_SECONDS,
+    sign_blob_url,
+    sign_blob_urls,
+    storage_path_slug,
+)
 
 load_dotenv()
 warnings.filterwarnings("ignore")
 
 
+def _profile_picture_path(user_type, user_id):
+    # Kept at ".png" so existing links and records still resolve; the object
+    # is stored with the content type it was actually encoded as.
+    return f"{user_type}/{storage_path_slug(user_id)}.png"
+
+
+def _customer_attachment_path(request_id, image_filename, extension=None):
+    file_name = storage_path_slug(image_filename)
+
+    if extension:
+        file_name = f"{os.path.splitext(file_name)[0]}.{extension}"
+
+    return f"{request_id}/customer_attachments/{file_name}"
+
+
 class AppliancesBucket:
     def __init__(self):
-        credentials = Credentials.from_service_account_info(
-            json.loads(st.secrets["CLOUD_STORAGE_SERVICE_ACCOUNT_KEY"])
-        )
-
-        self.storage_client = storage.Client(credentials=credentials)
+        self.storage_client = get_storage_backend()
 
     def upload_appliance_image(self, brand, sub_category, local_image_path):
         bucket = self.storage_client.bucket("appliance_catalogue_bucket")
@@ -78,11 +97,11 @@ class AppliancesBucket:
         return downloaded_file_path
 
     def fetch_appliance_image_url(
-        self, brand, sub_category, expire_in=datetime.today() + timedelta(3)
+        self, brand, sub_category, expire_in=None
     ):
         bucket = self.storage_client.bucket("appliance_catalogue_bucket")
 
-        image_url = bucket.blob(
+        blob_path = (
             f"appliance_images/{
                 brand.replace(
                     '-',
@@ -94,17 +113,14 @@ class AppliancesBucket:
                     '_').replace(
                     ' ',
                     '_').lower()}.jpg"
-        ).generate_signed_url(expire_in)
-        return image_url
+        )
+
+        return sign_blob_url(bucket, blob_path, expire_in)
 
 
 class InventoryItems:
     def __init__(self):
-        credentials = Credentials.from_service_account_info(
-            json.loads(st.secrets["CLOUD_STORAGE_SERVICE_ACCOUNT_KEY"])
-        )
-
-        self.storage_client = storage.Client(credentials=credentials)
+        self.storage_client = get_storage_backend()
 
     def upload_item_image(self, local_file_path, cloud_storage_path):
         bucket = self.storage_client.bucket("inventory_items_bucket")
@@ -122,92 +138,119 @@ class InventoryItems:
 
         return local_file_path
 
-    def fetch_appliance_image_url(
-        self, file_name, expire_in=datetime.today() + timedelta(3)
-    ):
+    def fetch_appliance_image_url(self, file_name, expire_in=None):
         bucket = self.storage_client.bucket("inventory_items_bucket")
-        image_url = bucket.blob(file_name).generate_signed_url(expire_in)
 
-        return image_url
+        return sign_blob_url(bucket, file_name, expire_in)
 
 
 class ProfilePicturesBucket:
     def __init__(self):
-        credentials = Credentials.from_service_account_info(
-            json.loads(st.secrets["CLOUD_STORAGE_SERVICE_ACCOUNT_KEY"])
-        )
-
-        self.storage_client = storage.Client(credentials=credentials)
+        self.storage_client = get_storage_backend()
 
     def upload_profile_picture(self, user_type, user_id, file):
+        bucket = self.storage_client.bucket("profile_pictures_bucket")
+
         try:
-            bucket = self.storage_client.bucket("profile_pictures_bucket")
-
-            blob = bucket.blob(
-                f"{user_type}/{
-                    user_id.replace(
-                        '/',
-                        '_').replace(
-                        '-',
-                        '_').replace(
-                        ' ',
-                        '_').lower()}.png"
+            processed = get_image_processing_pipeline().submit(
+                file, PROFILE_PICTURE_MAX_DIMENSION
+            ).result()
+
+            get_upload_manager().upload(
+                bucket,
+                _profile_picture_path(user_type, user_id),
+                processed["data"],
+                processed["content_type"],
             )
-            blob.upload_from_file(file)
-
             return True
 
         except Exception as error:
             return False
 
     def fetch_profile_picture_url(
-        self, 
-        user_type, 
-        user_id, 
-        expire_in=datetime.today() + timedelta(minutes=5),
+        self,
+        user_type,
+        user_id,
+        expire_in=None,
     ):
         bucket = self.storage_client.bucket("profile_pictures_bucket")
 
-        blob = bucket.blob(
-            f"{user_type}/{
-                user_id.replace(
-                    '/',
-                    '_').replace(
-                    '-',
-                    '_').replace(
-                    ' ',
-                    '_').lower()}.png"
+        return sign_blob_url(
+            bucket,
+            _profile_picture_path(user_type, user_id),
+            expire_in,
+            default_lifetime_seconds=PROFILE_PICTURE_URL_LIFETIME_SECONDS,
+            with_generation=True,
         )
 
-        blob.reload()
-        updated_time = str(int(blob.updated.timestamp()))
+    def fetch_profile_picture_urls(self, user_type, user_ids, expire_in=None):
+        bucket = self.storage_client.bucket("profile_pictures_bucket")
+
+        blob_paths = {
+            user_id: _profile_picture_path(user_type, user_id) for user_id in user_ids
+        }
+
+        urls = sign_blob_urls(
+            bucket,
+            blob_paths.values(),
+            expire_in,
+            default_lifetime_seconds=PROFILE_PICTURE_URL_LIFETIME_SECONDS,
+            with_generation=True,
+        )
 
-        return blob.generate_signed_url(expire_in) + f"&updated={updated_time}"
+        return {user_id: urls[blob_path] for user_id, blob_path in blob_paths.items()}
 
 
 class OnsiteServiceRequestsBucket:
     def __init__(self):
-        credentials = Credentials.from_service_account_info(
-            json.loads(st.secrets["CLOUD_STORAGE_SERVICE_ACCOUNT_KEY"])
-        )
-
-        self.storage_client = storage.Client(credentials=credentials)
+        self.storage_client = get_storage_backend()
 
     def upload_customer_attachment(
         self, request_id, image_file, image_filename,
     ):
         bucket = self.storage_client.bucket("onsite_service_requests_bucket")
 
-        blob = bucket.blob(
-            f"{request_id}/customer_attachments/{
-                image_filename.replace(
-                    '/',
-                    '_').replace(
-                    '-',
-                    '_').replace(
-                    ' ',
-                    '_').lower()}"
+        processed = get_image_processing_pipeline().submit(
+            image_file, ATTACHMENT_MAX_DIMENSION
+        ).result()
+
+        get_upload_manager().upload(
+            bucket,
+            _customer_attachment_path(
+                request_id, image_filename, processed["extension"]
+            ),
+            processed["data"],
+            processed["content_type"],
         )
-        blob.upload_from_file(image_file)
 
         return True
+
+    def upload_customer_attachments(
+        self, request_id, attachments, progress_callback=None,
+    ):
+        # The pipeline re-encodes every attachment in parallel, then all of
+        # them go to the upload manager as one batch. progress_callback gets
+        # (done_bytes, total_bytes) across the whole batch. The reports
+        # (bytes before and after) come back in the order given.
+        bucket = self.storage_client.bucket("onsite_service_requests_bucket")
+        pipeline = get_image_processing_pipeline()
+
+        futures = [
+            (attachment.name, pipeline.submit(attachment, ATTACHMENT_MAX_DIMENSION))
+            for attachment in attachments
+        ]
+
+        files = {}
+        reports = []
+        for image_filename, future in futures:
+            processed = future.result()
+
+            blob_path = _customer_attachment_path(
+                request_id, image_filename, processed["extension"]
+            )
+            files[blob_path] = (processed["data"], processed["content_type"])
+            reports.append(processed["report"])
+
+        get_upload_manager().upload_many(bucket, files, progress_callback)
+
+        return reports
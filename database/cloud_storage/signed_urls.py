@@ -0,0 +1,266 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+DOCUMENT_URL_LIFETIME_SECONDS: int = 3 * 24 * 60 * 60
+PROFILE_PICTURE_URL_LIFETIME_SECONDS: int = 5 * 60
+
+# A cached URL is handed out again while at least this share of the
+# requested lifetime is left, so a link rendered now stays usable for a
+# reasonable while after the page loads.
+SIGNED_URL_MIN_REMAINING_FRACTION: float = float(
+    os.getenv("SIGNED_URL_MIN_REMAINING_FRACTION", "0.5")
+)
+SIGNED_URL_CACHE_MAX_ENTRIES: int = 4096
+SIGNED_URL_METADATA_WORKERS: int = 8
+
+
+def storage_path_slug(value):
+    return str(value).replace("/", "_").replace("-", "_").replace(" ", "_").lower()
+
+
+def _lifetime_seconds(expire_in, default_seconds):
+    if expire_in is None:
+        return default_seconds
+
+    if isinstance(expire_in, timedelta):
+        return expire_in.total_seconds()
+
+    if isinstance(expire_in, datetime):
+        # Callers pass naive local datetimes, as datetime.today() returns.
+        return (expire_in - datetime.today()).total_seconds()
+
+    return float(expire_in)
+
+
+class SignedUrlCache:
+    def __init__(
+        self,
+        max_entries=SIGNED_URL_CACHE_MAX_ENTRIES,
+        min_remaining_fraction=SIGNED_URL_MIN_REMAINING_FRACTION,
+    ):
+        self.max_entries = max_entries
+        self.min_remaining_fraction = min_remaining_fraction
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, bucket_name, blob_path, lifetime_seconds):
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get((bucket_name, blob_path))
+
+            if (
+                entry is None
+                or entry["url"] is None
+                or entry["expires_at"] - now
+                < lifetime_seconds * self.min_remaining_fraction
+            ):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end((bucket_name, blob_path))
+
+            return entry["url"]
+
+    def put(self, bucket_name, blob_path, url, lifetime_seconds, generation=None):
+        with self._lock:
+            self._entries[(bucket_name, blob_path)] = {
+                "url": url,
+                "expires_at": time.time() + lifetime_seconds,
+                "generation": generation,
+            }
+            self._entries.move_to_end((bucket_name, blob_path))
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generation(self, bucket_name, blob_path):
+        # A generation read from GCS is trusted for as long as the URL that
+        # carried it; one this process wrote itself is kept until evicted.
+        with self._lock:
+            entry = self._entries.get((bucket_name, blob_path))
+
+            if entry is None:
+                return None
+
+            if entry["url"] is not None and entry["expires_at"] <= time.time():
+                return None
+
+            return entry["generation"]
+
+    def record_upload(self, bucket_name, blob_path, generation):
+        with self._lock:
+            self._entries[(bucket_name, blob_path)] = {
+                "url": None,
+                "expires_at": 0.0,
+                "generation": generation,
+            }
+            self._entries.move_to_end((bucket_name, blob_path))
+
+    def invalidate(self, bucket_name, blob_path):
+        with self._lock:
+            self._entries.pop((bucket_name, blob_path), None)
+
+    def stats(self):
+        with self._lock:
+            entries = len(self._entries)
+
+        lookups = self.hits + self.misses
+
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+_signed_url_cache = None
+_signed_url_cache_lock = threading.Lock()
+
+
+def get_signed_url_cache() -> SignedUrlCache:
+    global _signed_url_cache
+
+    if _signed_url_cache is None:
+        with _signed_url_cache_lock:
+            if _signed_url_cache is None:
+                _signed_url_cache = SignedUrlCache()
+
+    return _signed_url_cache
+
+
+def _fetch_generation(bucket, blob_path):
+    blob = bucket.get_blob(blob_path)
+
+    if blob is None:
+        raise FileNotFoundError(f"gs://{bucket.name}/{blob_path} does not exist")
+
+    return str(blob.generation)
+
+
+def _sign(bucket, blob_path, lifetime_seconds, generation=None):
+    url = bucket.blob(blob_path).generate_signed_url(
+        expiration=timedelta(seconds=lifetime_seconds)
+    )
+
+    # Browsers cache images by URL, so the object generation is appended to
+    # make a re-uploaded picture show up immediately.
+    if generation is not None:
+        url += f"&version={generation}"
+
+    return url
+
+
+def sign_blob_url(
+    bucket,
+    blob_path,
+    expire_in=None,
+    default_lifetime_seconds=DOCUMENT_URL_LIFETIME_SECONDS,
+    with_generation=False,
+):
+    cache = get_signed_url_cache()
+    lifetime_seconds = _lifetime_seconds(expire_in, default_lifetime_seconds)
+
+    url = cache.get(bucket.name, blob_path, lifetime_seconds)
+
+    if url is not None:
+        return url
+
+    generation = None
+    if with_generation:
+        generation = cache.generation(bucket.name, blob_path) or _fetch_generation(
+            bucket, blob_path
+        )
+
+    url = _sign(bucket, blob_path, lifetime_seconds, generation)
+    cache.put(bucket.name, blob_path, url, lifetime_seconds, generation)
+
+    return url
+
+
+def sign_blob_urls(
+    bucket,
+    blob_paths,
+    expire_in=None,
+    default_lifetime_seconds=DOCUMENT_URL_LIFETIME_SECONDS,
+    with_generation=False,
+):
+    # Signing is local; only the generation lookups for uncached blobs go to
+    # GCS, and those run concurrently. Missing blobs map to None.
+    cache = get_signed_url_cache()
+    lifetime_seconds = _lifetime_seconds(expire_in, default_lifetime_seconds)
+
+    urls = {}
+    pending = []
+
+    for blob_path in dict.fromkeys(blob_paths):
+        url = cache.get(bucket.name, blob_path, lifetime_seconds)
+
+        if url is None:
+            pending.append(blob_path)
+        else:
+            urls[blob_path] = url
+
+    generations = {}
+    if with_generation and pending:
+        unknown = []
+
+        for blob_path in pending:
+            generation = cache.generation(bucket.name, blob_path)
+
+            if generation is None:
+                unknown.append(blob_path)
+            else:
+                generations[blob_path] = generation
+
+        def _fetch_or_none(blob_path):
+            try:
+                return _fetch_generation(bucket, blob_path)
+
+            except Exception as error:
+                return None
+
+        if unknown:
+            with ThreadPoolExecutor(
+                max_workers=min(SIGNED_URL_METADATA_WORKERS, len(unknown))
+            ) as executor:
+                generations.update(
+                    zip(unknown, executor.map(_fetch_or_none, unknown))
+                )
+
+    for blob_path in pending:
+        if with_generation and generations.get(blob_path) is None:
+            urls[blob_path] = None
+            continue
+
+        generation = generations.get(blob_path)
+        url = _sign(bucket, blob_path, lifetime_seconds, generation)
+        cache.put(bucket.name, blob_path, url, lifetime_seconds, generation)
+
+        urls[blob_path] = url
+
+    return urls
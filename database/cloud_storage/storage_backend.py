@@ -0,0 +1,500 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import re
+import hmac
+import json
+import mmap
+import base64
+import time
+import shutil
+import hashlib
+import secrets
+import tempfile
+import threading
+import mimetypes
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+from dotenv import load_dotenv
+
+from google.cloud import storage
+from google.oauth2.service_account import Credentials
+
+load_dotenv()
+
+# "gcs" talks to Cloud Storage; "local" keeps every bucket under
+# LOCAL_STORAGE_ROOT and serves signed URLs from an in-process HTTP server,
+# so uploads, downloads and URL signing can be measured with no network.
+CLOUD_STORAGE_BACKEND: str = os.getenv("CLOUD_STORAGE_BACKEND", "gcs")
+LOCAL_STORAGE_ROOT: str = os.getenv("LOCAL_STORAGE_ROOT", ".local_storage")
+LOCAL_STORAGE_URL_HOST: str = os.getenv("LOCAL_STORAGE_URL_HOST", "127.0.0.1")
+LOCAL_STORAGE_URL_PORT: int = int(os.getenv("LOCAL_STORAGE_URL_PORT", "0"))
+
+LOCAL_STORAGE_CHUNK_SIZE: int = 1024 * 1024
+
+
+class GcsStorageBackend:
+    def __init__(self, credentials=None):
+        if credentials is None:
+            credentials = Credentials.from_service_account_info(
+                json.loads(st.secrets["CLOUD_STORAGE_SERVICE_ACCOUNT_KEY"])
+            )
+
+        self.storage_client = storage.Client(credentials=credentials)
+
+    def bucket(self, bucket_name):
+        return self.storage_client.bucket(bucket_name)
+
+
+def _safe_join(root, *parts):
+    path = os.path.abspath(os.path.join(root, *parts))
+
+    if os.path.commonpath([path, os.path.abspath(root)]) != os.path.abspath(root):
+        raise ValueError(f"{'/'.join(parts)} escapes the storage root")
+
+    return path
+
+
+@contextmanager
+def _mapped(file_path):
+    # mmap refuses empty files, so those are served as an empty buffer.
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            yield memoryview(b"")
+            return
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+
+            try:
+                yield view
+
+            finally:
+                view.release()
+
+
+class LocalBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.generation = None
+        self.size = None
+        self.updated = None
+        self._md5_hash = None
+
+        self.path = _safe_join(bucket.path, name)
+
+    def _refresh(self):
+        stat = os.stat(self.path)
+
+        # The write time in nanoseconds changes on every replace, which is
+        # the property callers rely on from a GCS generation.
+        self.generation = stat.st_mtime_ns
+        self.size = stat.st_size
+        self.updated = datetime.fromtimestamp(stat.st_mtime)
+        self._md5_hash = None
+
+    @property
+    def md5_hash(self):
+        # Base64 MD5 as GCS reports it; worked out on first use rather than
+        # on every metadata lookup.
+        if self._md5_hash is None and self.exists():
+            with _mapped(self.path) as view:
+                self._md5_hash = base64.b64encode(hashlib.md5(view).digest()).decode(
+                    "ascii"
+                )
+
+        return self._md5_hash
+
+    def _write(self, write_to):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        # Written beside the target and swapped in, so a reader never maps a
+        # half-written object.
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(self.path), prefix=".upload-"
+        )
+
+        try:
+            with os.fdopen(file_descriptor, "wb") as temp_file:
+                write_to(temp_file)
+
+            os.replace(temp_path, self.path)
+
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        self._refresh()
+
+    def upload_from_file(self, file_obj, **kwargs):
+        self._write(
+            lambda temp_file: shutil.copyfileobj(
+                file_obj, temp_file, LOCAL_STORAGE_CHUNK_SIZE
+            )
+        )
+
+    def upload_from_filename(self, filename, **kwargs):
+        with open(filename, "rb") as source_file:
+            self.upload_from_file(source_file)
+
+    def upload_from_string(self, data, **kwargs):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        self._write(lambda temp_file: temp_file.write(data))
+
+    def download_as_bytes(self, **kwargs):
+        with _mapped(self.path) as view:
+            return bytes(view)
+
+    def download_to_file(self, file_obj, **kwargs):
+        with _mapped(self.path) as view:
+            file_obj.write(view)
+
+    def download_to_filename(self, filename, **kwargs):
+        with open(filename, "wb") as destination_file:
+            self.download_to_file(destination_file)
+
+    def exists(self, **kwargs):
+        return os.path.isfile(self.path)
+
+    def reload(self, **kwargs):
+        self._refresh()
+
+    def delete(self, **kwargs):
+        os.remove(self.path)
+
+    def generate_signed_url(self, expiration=None, **kwargs):
+        return self.bucket.backend.url_server.sign(
+            self.bucket.name, self.name, expiration
+        )
+
+    def create_resumable_upload_session(
+        self, content_type=None, size=None, **kwargs
+    ):
+        return self.bucket.backend.url_server.create_upload_session(self, size)
+
+
+class LocalBucket:
+    def __init__(self, backend, name):
+        self.backend = backend
+        self.name = name
+
+        self.path = _safe_join(backend.root, name)
+
+    def blob(self, blob_name):
+        return LocalBlob(self, blob_name)
+
+    def get_blob(self, blob_name):
+        blob = LocalBlob(self, blob_name)
+
+        if not blob.exists():
+            return None
+
+        blob.reload()
+        return blob
+
+    def list_blobs(self, prefix=""):
+        blobs = []
+
+        for directory, _, file_names in os.walk(self.path):
+            for file_name in file_names:
+                if file_name.startswith(".upload-"):
+                    continue
+
+                blob_name = os.path.relpath(
+                    os.path.join(directory, file_name), self.path
+                ).replace(os.sep, "/")
+
+                if blob_name.startswith(prefix):
+                    blobs.append(self.get_blob(blob_name))
+
+        return sorted(
+            (blob for blob in blobs if blob is not None), key=lambda blob: blob.name
+        )
+
+
+class _SignedUrlRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+
+        bucket_name, _, blob_name = unquote(url.path).lstrip("/").partition("/")
+
+        if not self.server.url_server.verify(
+            bucket_name,
+            blob_name,
+            query.get("Expires", [""])[0],
+            query.get("Signature", [""])[0],
+        ):
+            self.send_error(403, "Signature mismatch or URL expired")
+            return
+
+        try:
+            file_path = _safe_join(self.server.storage_root, bucket_name, blob_name)
+
+            with _mapped(file_path) as view:
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type",
+                    mimetypes.guess_type(blob_name)[0] or "application/octet-stream",
+                )
+                self.send_header("Content-Length", str(len(view)))
+                self.end_headers()
+                self.wfile.write(view)
+
+        except (FileNotFoundError, IsADirectoryError, ValueError):
+            self.send_error(404, "No such object")
+
+    def do_PUT(self):
+        url = urlsplit(self.path)
+
+        if not url.path.startswith("/upload/"):
+            self.send_error(404, "No such upload session")
+            return
+
+        chunk = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        status, headers, resource = self.server.url_server.receive_chunk(
+            url.path[len("/upload/"):], self.headers.get("Content-Range", ""), chunk
+        )
+
+        body = json.dumps(resource).encode("utf-8") if resource else b""
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Stand-in for the storage.googleapis.com endpoint: URLs carry an expiry and
+# an HMAC over bucket, object and expiry, checked the way GCS checks V4
+# signatures, and the object body is served straight from the mapped file.
+# It also speaks the resumable upload protocol: chunks are PUT with a
+# Content-Range, answered with 308 and the committed Range until the last
+# one, which returns the object resource.
+class LocalSignedUrlServer:
+    def __init__(
+        self,
+        storage_root,
+        host=LOCAL_STORAGE_URL_HOST,
+        port=LOCAL_STORAGE_URL_PORT,
+    ):
+        self.storage_root = storage_root
+        self.host = host
+        self.port = port
+
+        self._signing_key = secrets.token_bytes(32)
+        self._server = None
+        self._lock = threading.Lock()
+
+        self._upload_sessions = {}
+        self._upload_sessions_lock = threading.Lock()
+
+    def _signature(self, bucket_name, blob_name, expires):
+        return hmac.new(
+            self._signing_key,
+            f"{bucket_name}/{blob_name}\n{expires}".encode("utf-8"),
+            hashlib.sha256,
+        ).hexdigest()
+
+    def verify(self, bucket_name, blob_name, expires, signature):
+        try:
+            if int(expires) < time.time():
+                return False
+
+        except ValueError:
+            return False
+
+        return hmac.compare_digest(
+            self._signature(bucket_name, blob_name, expires), signature
+        )
+
+    def start(self):
+        with self._lock:
+            if self._server is None:
+                self._server = ThreadingHTTPServer(
+                    (self.host, self.port), _SignedUrlRequestHandler
+                )
+                self._server.daemon_threads = True
+                self._server.url_server = self
+                self._server.storage_root = self.storage_root
+
+                threading.Thread(
+                    target=self._server.serve_forever,
+                    name="local-storage-urls",
+                    daemon=True,
+                ).start()
+
+        return self._server.server_address
+
+    def stop(self):
+        with self._lock:
+            if self._server is not None:
+                self._server.shutdown()
+                self._server.server_close()
+                self._server = None
+
+    def sign(self, bucket_name, blob_name, expiration=None):
+        host, port = self.start()
+
+        if expiration is None:
+            expiration = timedelta(hours=1)
+
+        if isinstance(expiration, timedelta):
+            expires = int(time.time() + expiration.total_seconds())
+        elif isinstance(expiration, datetime):
+            expires = int(expiration.timestamp())
+        else:
+            expires = int(expiration)
+
+        # Same shape as a GCS signed URL, so "&version=" can be appended.
+        return (
+            f"http://{host}:{port}/{quote(bucket_name)}/{quote(blob_name)}"
+            f"?Expires={expires}"
+            f"&Signature={self._signature(bucket_name, blob_name, expires)}"
+        )
+
+
+    def create_upload_session(self, blob, size=None):
+        host, port = self.start()
+
+        os.makedirs(os.path.dirname(blob.path), exist_ok=True)
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(blob.path), prefix=".upload-"
+        )
+        os.close(file_descriptor)
+
+        session_id = secrets.token_urlsafe(24)
+
+        with self._upload_sessions_lock:
+            self._upload_sessions[session_id] = {
+                "blob": blob,
+                "size": size,
+                "temp_path": temp_path,
+                "committed": 0,
+            }
+
+        return f"http://{host}:{port}/upload/{session_id}"
+
+    def receive_chunk(self, session_id, content_range, chunk):
+        match = re.fullmatch(r"bytes (?:(\d+)-(\d+)|\*)/(\d+|\*)", content_range)
+
+        with self._upload_sessions_lock:
+            session = self._upload_sessions.get(session_id)
+
+            if session is None or match is None:
+                return 404 if session is None else 400, {}, None
+
+            if match.group(3) != "*":
+                session["size"] = int(match.group(3))
+
+            # Only a chunk that starts exactly at the committed offset is
+            # kept; anything else is answered with where to resume from.
+            chunk_start = match.group(1)
+
+            if chunk_start is not None and int(chunk_start) == session["committed"]:
+                with open(session["temp_path"], "r+b") as temp_file:
+                    temp_file.seek(session["committed"])
+                    temp_file.write(chunk)
+
+                session["committed"] += len(chunk)
+
+            if session["size"] is None or session["committed"] < session["size"]:
+                headers = {}
+
+                if session["committed"]:
+                    headers["Range"] = f"bytes=0-{session['committed'] - 1}"
+
+                return 308, headers, None
+
+            blob = session["blob"]
+            os.replace(session["temp_path"], blob.path)
+            blob._refresh()
+
+            del self._upload_sessions[session_id]
+
+        return (
+            200,
+            {"Content-Type": "application/json"},
+            {
+                "bucket": blob.bucket.name,
+                "name": blob.name,
+                "size": str(blob.size),
+                "generation": str(blob.generation),
+                "md5Hash": blob.md5_hash,
+            },
+        )
+
+
+class LocalStorageBackend:
+    def __init__(self, root=LOCAL_STORAGE_ROOT, url_server=None):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+        self.url_server = url_server or LocalSignedUrlServer(self.root)
+
+    def bucket(self, bucket_name):
+        return LocalBucket(self, bucket_name)
+
+    def close(self):
+        self.url_server.stop()
+
+
+_storage_backend = None
+_storage_backend_lock = threading.Lock()
+
+
+def _create_storage_backend():
+    if CLOUD_STORAGE_BACKEND == "local":
+        return LocalStorageBackend()
+
+    if CLOUD_STORAGE_BACKEND == "gcs":
+        return GcsStorageBackend()
+
+    raise ValueError(f"Unknown CLOUD_STORAGE_BACKEND {CLOUD_STORAGE_BACKEND!r}")
+
+
+def get_storage_backend():
+    global _storage_backend
+
+    if _storage_backend is None:
+        with _storage_backend_lock:
+            if _storage_backend is None:
+                _storage_backend = _create_storage_backend()
+
+    return _storage_backend
+
+
+def set_storage_backend(backend):
+    # Used by the benchmarks to point every bucket class at a throwaway
+    # local root; the previous backend is returned so it can be restored.
+    global _storage_backend
+
+    with _storage_backend_lock:
+        previous_backend, _storage_backend = _storage_backend, backend
+
+    return previous_backend
@@ -0,0 +1,323 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import os
+import time
+import base64
+import random
+import hashlib
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from database.cloud_storage.signed_urls import get_signed_url_cache
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_MANAGER_WORKERS: int = int(os.getenv("UPLOAD_MANAGER_WORKERS", "4"))
+
+# Files from this size up go through a resumable session in chunks; GCS
+# requires every chunk but the last to be a multiple of 256 KiB.
+RESUMABLE_UPLOAD_THRESHOLD_BYTES: int = int(
+    os.getenv("RESUMABLE_UPLOAD_THRESHOLD_BYTES", str(8 * 1024 * 1024))
+)
+UPLOAD_CHUNK_SIZE_BYTES: int = int(
+    os.getenv("UPLOAD_CHUNK_SIZE_BYTES", str(8 * 256 * 1024))
+)
+UPLOAD_MAX_ATTEMPTS: int = 5
+UPLOAD_TIMEOUT_SECONDS: float = 60.0
+UPLOAD_PROGRESS_POLL_SECONDS: float = 0.2
+
+_RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class UploadChecksumError(Exception):
+    pass
+
+
+def _read_upload(file):
+    if isinstance(file, (bytes, bytearray, memoryview)):
+        return bytes(file)
+
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+
+    if hasattr(file, "seek"):
+        file.seek(0)
+
+    return file.read()
+
+
+def _md5_base64(data):
+    return base64.b64encode(hashlib.md5(data).digest()).decode("ascii")
+
+
+def _backoff(attempt):
+    time.sleep(min(8.0, 0.5 * 2**attempt) * random.uniform(0.5, 1.0))
+
+
+def _committed_offset(response):
+    # A 308 carries "Range: bytes=0-N" once anything has been persisted.
+    committed_range = response.headers.get("Range")
+
+    if not committed_range:
+        return 0
+
+    return int(committed_range.rsplit("-", 1)[-1]) + 1
+
+
+class UploadManager:
+    def __init__(
+        self,
+        max_workers=UPLOAD_MANAGER_WORKERS,
+        resumable_threshold_bytes=RESUMABLE_UPLOAD_THRESHOLD_BYTES,
+        chunk_size_bytes=UPLOAD_CHUNK_SIZE_BYTES,
+    ):
+        self.resumable_threshold_bytes = resumable_threshold_bytes
+        self.chunk_size_bytes = chunk_size_bytes
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="blob-upload"
+        )
+        self._http = requests.Session()
+
+        # Open resumable sessions by (bucket, blob, md5), so retrying the
+        # same file after a failure continues where the last attempt stopped.
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+
+    def _query_offset(self, session_url, size):
+        response = self._http.put(
+            session_url,
+            headers={"Content-Range": f"bytes */{size}"},
+            timeout=UPLOAD_TIMEOUT_SECONDS,
+        )
+
+        if response.status_code in (200, 201):
+            return size, response.json()
+
+        if response.status_code == 308:
+            return _committed_offset(response), None
+
+        response.raise_for_status()
+        raise RuntimeError(f"Unexpected status {response.status_code} from upload")
+
+    def _forget_session(self, session_key):
+        with self._sessions_lock:
+            self._sessions.pop(session_key, None)
+
+    def _upload_resumable(
+        self, blob, data, md5_hash, content_type, progress_callback
+    ):
+        session_key = (blob.bucket.name, blob.name, md5_hash)
+        size = len(data)
+
+        with self._sessions_lock:
+            session_url = self._sessions.get(session_key)
+
+        if session_url is None:
+            session_url = blob.create_resumable_upload_session(
+                content_type=content_type, size=size
+            )
+
+            with self._sessions_lock:
+                self._sessions[session_key] = session_url
+
+            offset, resource = 0, None
+        else:
+            offset, resource = self._query_offset(session_url, size)
+            logger.info("Resuming upload of %s at byte %s", blob.name, offset)
+
+        view = memoryview(data)
+        attempt = 0
+
+        while resource is None:
+            chunk = view[offset : offset + self.chunk_size_bytes]
+
+            try:
+                response = self._http.put(
+                    session_url,
+                    data=chunk,
+                    headers={
+                        "Content-Range": (
+                            f"bytes {offset}-{offset + len(chunk) - 1}/{size}"
+                        )
+                    },
+                    timeout=UPLOAD_TIMEOUT_SECONDS,
+                )
+
+                if response.status_code in _RETRYABLE_STATUS_CODES:
+                    raise requests.HTTPError(
+                        f"{response.status_code} from upload session",
+                        response=response,
+                    )
+
+            except requests.RequestException as error:
+                attempt += 1
+
+                if attempt >= UPLOAD_MAX_ATTEMPTS:
+                    raise
+
+                logger.warning("Upload of %s interrupted: %s", blob.name, error)
+                _backoff(attempt)
+
+                # Whatever reached the server before the failure is kept. If
+                # the status query fails too, the next PUT is answered with
+                # the committed range instead.
+                try:
+                    offset, resource = self._query_offset(session_url, size)
+
+                except requests.RequestException as error:
+                    pass
+
+                continue
+
+            attempt = 0
+
+            if response.status_code == 308:
+                offset = _committed_offset(response)
+            elif response.status_code in (200, 201):
+                offset, resource = size, response.json()
+            else:
+                # An expired or cancelled session cannot be resumed.
+                self._forget_session(session_key)
+                response.raise_for_status()
+
+            if progress_callback:
+                progress_callback(offset, size)
+
+        self._forget_session(session_key)
+
+        return resource.get("md5Hash"), resource.get("generation")
+
+    def _upload_simple(self, blob, data, content_type, progress_callback):
+        # checksum="md5" also has GCS reject a body that arrives corrupted.
+        blob.upload_from_file(
+            io.BytesIO(data), content_type=content_type, checksum="md5"
+        )
+
+        if progress_callback:
+            progress_callback(len(data), len(data))
+
+        return blob.md5_hash, blob.generation
+
+    def upload(
+        self, bucket, blob_path, file, content_type=None, progress_callback=None
+    ):
+        started_at = time.perf_counter()
+
+        data = _read_upload(file)
+        md5_hash = _md5_base64(data)
+        blob = bucket.blob(blob_path)
+
+        if len(data) >= self.resumable_threshold_bytes:
+            stored_md5_hash, generation = self._upload_resumable(
+                blob, data, md5_hash, content_type, progress_callback
+            )
+        else:
+            stored_md5_hash, generation = self._upload_simple(
+                blob, data, content_type, progress_callback
+            )
+
+        if stored_md5_hash != md5_hash:
+            blob.delete()
+
+            raise UploadChecksumError(
+                f"gs://{bucket.name}/{blob_path} stored MD5 {stored_md5_hash}, "
+                f"expected {md5_hash}"
+            )
+
+        generation = str(generation)
+        get_signed_url_cache().record_upload(bucket.name, blob_path, generation)
+
+        return {
+            "blob_path": blob_path,
+            "size": len(data),
+            "md5_hash": md5_hash,
+            "generation": generation,
+            "elapsed_ms": round((time.perf_counter() - started_at) * 1000, 2),
+        }
+
+    def submit(
+        self, bucket, blob_path, file, content_type=None, progress_callback=None
+    ):
+        # Read on the caller's thread: uploaded files belong to the script
+        # run that received them.
+        return self._executor.submit(
+            self.upload,
+            bucket,
+            blob_path,
+            _read_upload(file),
+            content_type,
+            progress_callback,
+        )
+
+    def upload_many(self, bucket, files, progress_callback=None):
+        # files maps blob path -> file, or (file, content_type). They upload
+        # concurrently, so the batch takes about as long as its slowest
+        # file; progress_callback(done_bytes, total_bytes) runs on this
+        # thread, so it may update Streamlit widgets.
+        uploads = {}
+        for blob_path, file in files.items():
+            file, content_type = file if isinstance(file, tuple) else (file, None)
+            uploads[blob_path] = (_read_upload(file), content_type)
+
+        total_bytes = sum(len(data) for data, _ in uploads.values())
+        progress = dict.fromkeys(uploads, 0)
+
+        def _file_progress(blob_path):
+            def _record(done_bytes, _):
+                progress[blob_path] = done_bytes
+
+            return _record
+
+        futures = {
+            blob_path: self.submit(
+                bucket, blob_path, data, content_type, _file_progress(blob_path)
+            )
+            for blob_path, (data, content_type) in uploads.items()
+        }
+
+        pending = set(futures.values())
+
+        while pending:
+            _, pending = wait(
+                pending,
+                timeout=UPLOAD_PROGRESS_POLL_SECONDS,
+                return_when=FIRST_COMPLETED,
+            )
+
+            if progress_callback:
+                progress_callback(sum(progress.values()), total_bytes)
+
+        # Re-raises the first failure, once every upload has settled.
+        return {blob_path: future.result() for blob_path, future in futures.items()}
+
+
+_upload_manager = None
+_upload_manager_lock = threading.Lock()
+
+
+def get_upload_manager() -> UploadManager:
+    global _upload_manager
+
+    if _upload_manager is None:
+        with _upload_manager_lock:
+            if _upload_manager is None:
+                _upload_manager = UploadManager()
+
+    return _upload_manager
@@ -13,17 +13,16 @@
 # limitations under the License.
 
 import os
-import json
 import bcrypt
 import random
 import warnings
-import streamlit as st
 
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 
-import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_admin import firestore
+
+from backend.utils.client_factory import get_client
 
 load_dotenv()
 warnings.filterwarnings("ignore")
@@ -31,16 +30,7 @@ warnings.filterwarnings("ignore")
 
 class OnsiteServiceRequestCollection:
     def __init__(self):
-        try:
-            creds = credentials.Certificate(
-                json.loads(st.secrets["FIREBASE_SERVICE_ACCOUNT_KEY"])
-            )
-
-            firebase_admin.initialize_app(creds)
-
-        except BaseException:
-            pass
-        self.db = firestore.client()
+        self.db = get_client("firestore")
 
     def _generate_request_id(self):
         request_id = "2" + "".join([str(random.randint(0, 9)) for _ in range(11)])
@@ -316,6 +306,24 @@ class OnsiteServiceRequestCollection:
         else:
             return []
 
+    def fetch_open_onsite_service_requests(self):
+        docs = self.db.collection("service_requests").document("onsite").collections()
+
+        open_service_requests = []
+
+        for customer_collection in docs:
+            for ticket_doc in customer_collection.where(
+                "ticket_status", "in", ["open", "on-hold"]
+            ).stream():
+                service_request_details = ticket_doc.to_dict()
+
+                service_request_details["customer_id"] = customer_collection.id
+                service_request_details["request_id"] = ticket_doc.id
+
+                open_service_requests.append(service_request_details)
+
+        return open_service_requests
+
     def add_service_request_activity(
         self, customer_id, service_request_id, added_by, notes
     ):
@@ -584,16 +592,7 @@ class OnsiteServiceRequestCollection:
 
 class ApplianceSpecificationsCollection:
     def __init__(self):
-        try:
-            creds = credentials.Certificate(
-                json.loads(st.secrets["FIREBASE_SERVICE_ACCOUNT_KEY"])
-            )
-
-            firebase_admin.initialize_app(creds)
-
-        except BaseException:
-            pass
-        self.db = firestore.client()
+        self.db = get_client("firestore")
 
     def add_appliance_specificatons(
         self, 
@@ -0,0 +1,68 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Builds the bundled pincode table that backend.utils.address_cache reads,
+# so pincode lookups are answered in-process. Download India Post's "All
+# India Pincode Directory" CSV from data.gov.in, then run:
+#
+#     python -m database.pincodes.build_pincode_directory path/to/download.csv
+#
+# The full directory lists every post office; the table keeps one row per
+# pincode (about 19,000) with the district and state the lookup returns.
+
+import os
+import csv
+import argparse
+
+from backend.utils.address_cache import PINCODE_DIRECTORY_PATH, read_pincode_directory
+
+
+def build_pincode_directory(source_paths, output_path=PINCODE_DIRECTORY_PATH):
+    pincodes = {}
+
+    for source_path in source_paths:
+        for pincode, office_name, district, state in read_pincode_directory(
+            source_path
+        ):
+            # The first office listed for a pincode names its district.
+            if pincode not in pincodes and district:
+                pincodes[pincode] = (office_name, district, state)
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+    with open(output_path, "w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(["pincode", "officename", "district", "statename"])
+
+        for pincode in sorted(pincodes):
+            writer.writerow([pincode, *pincodes[pincode]])
+
+    return len(pincodes)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Build the bundled pincode table from India Post's All "
+        "India Pincode Directory CSV."
+    )
+    parser.add_argument("source", nargs="+", help="Directory CSV(s) to read.")
+    parser.add_argument("--output", default=PINCODE_DIRECTORY_PATH)
+    args = parser.parse_args(argv)
+
+    pincode_count = build_pincode_directory(args.source, args.output)
+    print(f"Wrote {pincode_count} pincodes to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,13 +16,9 @@ import time
 import json
 import base64
 import warnings
-import numpy as np
-import pandas as pd
 
 import bleach
 import requests
-from PIL import Image
-from google.genai import types
 
 import dateutil
 import datetime
@@ -30,26 +26,17 @@ from datetime import timedelta
 
 import streamlit as st
 import streamlit_antd_components as sac
-from streamlit_folium import folium_static, st_folium
 from streamlit_extras.stylable_container import stylable_container
 
-import firebase_admin
-from firebase_admin import auth, credentials
-
-from backend.utils.geo_operations import LocationServices
-from backend.channels.email_client import TransactionalEmails
-from backend.channels.sms_client import NotificationSMS
-
-from database.firebase.firestore import OnsiteServiceRequestCollection
-from database.cloud_sql.queries import Appliances, QueryCustomers, QueryEngineers
-from database.cloud_sql.migrations import MigrateEngineers
-from database.cloud_storage.document_storage import (
-    CustomerRecordsBucket,
-    ServiceManualBucket,
+from backend.utils.import_profiler import (
+    install_import_profiler,
+    log_import_profile,
 )
-from database.cloud_storage.multimedia_storage import ProfilePicturesBucket
 
-from inference.chatbot import ServiceEngineerChatbot
+install_import_profiler()
+
+from backend.utils.client_factory import get_client
+from backend.utils.scoped_cache import invalidate_scope, scoped_cache
 
 
 st.set_page_config(
@@ -119,18 +106,12 @@ if "flag_use_context_cache" not in st.session_state:
 if "service_guide" not in st.session_state:
     st.session_state.service_guide = None
 
+if "service_guide_version" not in st.session_state:
+    st.session_state.service_guide_version = None
+
 if "ticket_counts" not in st.session_state:
     st.session_state.ticket_counts = {}
 
-if "distinct_appliance_details" not in st.session_state:
-    try:
-        query_appliances = Appliances()
-        st.session_state.distinct_appliance_details = (
-            query_appliances.fetch_distinct_appliance_data()
-        )
-    except Exception as error:
-        pass
-
 
 def set_cache_model_number(brand, sub_category, model_number):
     st.session_state.cache_model_number = model_number
@@ -138,40 +119,42 @@ def set_cache_model_number(brand, sub_category, model_number):
     st.session_state.cache_sub_category = sub_category
 
 
-@st.cache_data(ttl="60 minutes", show_spinner=False)
 def build_context_cache(
     input_brand, input_category, input_sub_category, input_model_number
 ):
-    service_manual_uri = (
-        "gs://service_manual_bucket/"
-        + input_category.lower().replace(" ", "_").replace("-", "_").replace("/", "_")
-        + "/"
-        + input_sub_category.lower()
-        .replace(" ", "_")
-        .replace("-", "_")
-        .replace("/", "_")
-        + "_service_guide.pdf"
-    )
-
-    # files_to_upload = [service_manual_uri, service_manual_uri, service_manual_uri]
-    files_to_upload = [service_manual_uri]
-
-    service_guide_title = (
-        input_brand + " " + input_sub_category + " " + input_model_number
-    )
-
-    service_engineer_chatbot = ServiceEngineerChatbot()
-    context_cache = service_engineer_chatbot.construct_cache_model(
+    context_cache_registry = get_context_cache_registry()
+    context_cache, _ = context_cache_registry.get_or_create(
         input_brand,
+        input_category,
         input_sub_category,
         input_model_number,
-        service_guide_title,
-        files_to_upload,
     )
 
     return context_cache
 
 
+@st.cache_resource(show_spinner=False)
+def start_context_cache_prewarmer():
+    context_cache_prewarmer = get_context_cache_prewarmer()
+    context_cache_prewarmer.start()
+
+    return context_cache_prewarmer
+
+
+@st.cache_resource(show_spinner=False)
+def start_notification_dispatcher():
+    notification_dispatcher = get_notification_dispatcher()
+    notification_dispatcher.start()
+
+    return notification_dispatcher
+
+
+def clear_engineer_caches():
+    # Only this engineer's entries are evicted: other logged-in engineers
+    # keep a warm cache, and the prewarmer and dispatchers keep running.
+    invalidate_scope("engineer", st.session_state.engineer_id)
+
+
 @st.dialog("Manage Account", width="large")
 def dialog_manage_account():
     cola, _, colb, colc = st.columns(
@@ -366,12 +349,9 @@ def dialog_manage_account():
                 st.success("Profile updated succesfully!", icon=":material/check:")
 
                 try:
-                    get_engineer_details.clear()
-                except Exception as error:
-                    pass
-
-                try:
-                    get_engineer_name.clear()
+                    invalidate_scope(
+                        "engineer", st.session_state.engineer_id, "profile"
+                    )
                 except Exception as error:
                     pass
 
@@ -478,7 +458,9 @@ def dialog_manage_account():
                 st.success("Profile updated succesfully!", icon=":material/check:")
 
                 try:
-                    get_engineer_details.clear()
+                    invalidate_scope(
+                        "engineer", st.session_state.engineer_id, "profile"
+                    )
                 except Exception as error:
                     pass
 
@@ -578,7 +560,9 @@ def dialog_manage_account():
                 st.success("Profile updated succesfully!", icon=":material/check:")
 
                 try:
-                    get_engineer_details.clear()
+                    invalidate_scope(
+                        "engineer", st.session_state.engineer_id, "profile"
+                    )
                 except Exception as error:
                     pass
 
@@ -647,6 +631,8 @@ def reset_password():
     ):
         with st.spinner("Processing request...", show_time=True):
             try:
+                from database.cloud_sql.queries import QueryEngineers
+
                 query_engineers = QueryEngineers()
                 engineer_exists = query_engineers.check_engineer_exists_by_email(
                     input_email
@@ -783,9 +769,9 @@ def dialog_resolve_service_request(service_request_id, service_request_details):
                             "last_name": "User",
                         }
 
-                    transaction_email_channel = TransactionalEmails()
-
-                    transaction_email_channel.send_onsite_service_request_resolved_mail(
+                    get_notification_dispatcher().send_email(
+                        "onsite_service_request_resolved",
+                        idempotency_key=f"{service_request_id}:{st.session_state.engineer_id}",
                         receiver_full_name=f"{
                             customer_name.get('first_name')} {
                             customer_name.get('last_name')}",
@@ -805,9 +791,9 @@ def dialog_resolve_service_request(service_request_id, service_request_details):
                     pass
 
                 try:
-                    notification_sms_channel = NotificationSMS()
-
-                    notification_sms_channel.send_onsite_service_request_resolved_sms(
+                    get_notification_dispatcher().send_sms(
+                        "onsite_service_request_resolved",
+                        idempotency_key=f"{service_request_id}:{st.session_state.engineer_id}",
                         receivers_phone_number=service_request_details.get(
                             "customer_contact"
                         ).get("phone_number"),
@@ -986,9 +972,9 @@ def dialog_review_service_request(service_request_id, service_request_details):
             pass
 
         try:
-            transaction_email_channel = TransactionalEmails()
-
-            transaction_email_channel.send_onsite_service_request_engineer_assigned_mail(
+            get_notification_dispatcher().send_email(
+                "onsite_service_request_engineer_assigned",
+                idempotency_key=f"{service_request_id}:{st.session_state.engineer_id}",
                 receiver_full_name=f"{
                     customer_name.get('first_name')} {
                     customer_name.get('last_name')}",
@@ -1008,9 +994,9 @@ def dialog_review_service_request(service_request_id, service_request_details):
             pass
 
         try:
-            notification_sms_channel = NotificationSMS()
-
-            notification_sms_channel.send_onsite_service_request_engineer_assigned_sms(
+            get_notification_dispatcher().send_sms(
+                "onsite_service_request_engineer_assigned",
+                idempotency_key=f"{service_request_id}:{st.session_state.engineer_id}",
                 receivers_phone_number=service_request_details.get(
                     "customer_contact"
                 ).get("phone_number"),
@@ -1147,9 +1133,9 @@ def dialog_view_more_ticket_options(service_request_id, service_request_details)
                                 "last_name": "User",
                             }
 
-                        transaction_email_channel = TransactionalEmails()
-
-                        transaction_email_channel.send_onsite_service_request_resolution_started_mail(
+                        get_notification_dispatcher().send_email(
+                            "onsite_service_request_resolution_started",
+                            idempotency_key=f"{service_request_id}:{st.session_state.engineer_id}",
                             receiver_full_name=f"{
                                 customer_name.get('first_name')} {
                                 customer_name.get('last_name')}",
@@ -1167,9 +1153,9 @@ def dialog_view_more_ticket_options(service_request_id, service_request_details)
                         pass
 
                     try:
-                        notification_sms_channel = NotificationSMS()
-
-                        notification_sms_channel.send_onsite_service_request_resolution_started_sms(
+                        get_notification_dispatcher().send_sms(
+                            "onsite_service_request_resolution_started",
+                            idempotency_key=f"{service_request_id}:{st.session_state.engineer_id}",
                             receivers_phone_number=service_request_details.get(
                                 "customer_contact"
                             ).get("phone_number"),
@@ -1494,7 +1480,7 @@ def dialog_view_service_request_details(
 
     if selected_tab == "Ticket Activity":
 
-        @st.cache_data(show_spinner=False)
+        @scoped_cache("engineer", "service_requests")
         def fetch_and_cache_ticket_activity(customer_id, request_id):
             onsite_service_request_collection = OnsiteServiceRequestCollection()
             return onsite_service_request_collection.fetch_service_request_activity(
@@ -1553,6 +1539,8 @@ def display_directions_to_customer_location(
         unsafe_allow_html=True,
     )
 
+    from streamlit_folium import folium_static
+
     with st.spinner("Finding the best route...", show_time=True):
         loc_services = LocationServices()
         map_obj = loc_services.display_route_with_folium(origin, destination)
@@ -1624,8 +1612,42 @@ if st.session_state.themes["refreshed"] == False:
 
 if __name__ == "__main__":
     if st.session_state.engineer_id:
+        # Gemini, the Cloud SQL connector, Firestore, Cloud Storage, Maps
+        # and the notification SDKs are imported only once an engineer has
+        # logged in, so the login page starts without them. The dialogs
+        # defined above look the names up when they run, after this point.
+        from google.genai import types
+
+        from backend.utils.geo_operations import LocationServices
+        from backend.module.notification_dispatcher import get_notification_dispatcher
+
+        from database.firebase.firestore import OnsiteServiceRequestCollection
+        from database.cloud_sql.catalog import get_appliance_catalog
+        from database.cloud_sql.queries import QueryCustomers, QueryEngineers
+        from database.cloud_sql.migrations import MigrateEngineers
+        from database.cloud_storage.document_storage import (
+            CustomerRecordsBucket,
+            ServiceManualBucket,
+        )
+        from database.cloud_storage.multimedia_storage import ProfilePicturesBucket
 
-        @st.cache_data(show_spinner=False)
+        from inference.chatbot import ServiceEngineerChatbot
+        from inference.answer_cache import build_guide_key
+        from inference.cache_prewarmer import (
+            get_context_cache_prewarmer,
+            get_context_cache_registry,
+        )
+
+        log_import_profile("engineer_app: logged in")
+
+        try:
+            st.session_state.distinct_appliance_details = (
+                get_appliance_catalog().as_nested_dict(include_category=False)
+            )
+        except Exception as error:
+            pass
+
+        @scoped_cache("engineer", "profile")
         def get_engineer_details(full_details=False):
             query_engineers = QueryEngineers()
             engineer_details = query_engineers.fetch_engineer_details_by_id(
@@ -1637,6 +1659,19 @@ if __name__ == "__main__":
 
         get_engineer_details(full_details=False)
 
+        try:
+            start_context_cache_prewarmer()
+
+        except Exception as error:
+            pass
+
+        # Delivers notifications left in the outbox by an earlier process.
+        try:
+            start_notification_dispatcher()
+
+        except Exception as error:
+            pass
+
         with st.sidebar:
             selected_menu_item = sac.menu(
                 [
@@ -1663,7 +1698,7 @@ if __name__ == "__main__":
         if selected_menu_item == "My Dashboard":
             onsite_service_request_collection = OnsiteServiceRequestCollection()
 
-            @st.cache_data(show_spinner=False)
+            @scoped_cache("engineer", "service_requests")
             def fetch_and_cache_onsite_service_requests(engineer_id):
                 st.session_state.onsite_service_requests = onsite_service_request_collection.fetch_onsite_service_request_details_by_engineer_id(
                     engineer_id
@@ -1767,7 +1802,7 @@ if __name__ == "__main__":
                 ):
                     dialog_manage_account()
 
-            @st.cache_data(show_spinner=False)
+            @scoped_cache("engineer", "profile")
             def get_engineer_name(full_name=True):
                 query_engineers = QueryEngineers()
 
@@ -1852,9 +1887,8 @@ if __name__ == "__main__":
                     st.session_state.themes["refreshed"] = False
                     st.session_state.themes["current_theme"] = "light"
 
+                    clear_engineer_caches()
                     st.session_state.clear()
-                    st.cache_data.clear()
-                    st.cache_resource.clear()
 
                     st.rerun()
 
@@ -2277,7 +2311,7 @@ if __name__ == "__main__":
                         unsafe_allow_html=True,
                     )
 
-                    @st.cache_data(show_spinner=False)
+                    @scoped_cache("engineer", "documents")
                     def get_service_manual(request_id):
                         service_manual_bucket = ServiceManualBucket()
                         service_manual_url = service_manual_bucket.fetch_service_manual_url(
@@ -2301,7 +2335,7 @@ if __name__ == "__main__":
 
                     service_manual_url = get_service_manual(request_id_to_view)
 
-                    @st.cache_data(show_spinner=False)
+                    @scoped_cache("engineer", "documents")
                     def get_warranty_certificate_url(request_id):
                         customer_records_bucket = CustomerRecordsBucket()
 
@@ -2404,9 +2438,8 @@ if __name__ == "__main__":
                         st.session_state.themes["refreshed"] = False
                         st.session_state.themes["current_theme"] = "light"
 
+                        clear_engineer_caches()
                         st.session_state.clear()
-                        st.cache_data.clear()
-                        st.cache_resource.clear()
 
                         st.rerun()
 
@@ -2667,7 +2700,7 @@ if __name__ == "__main__":
 
                 elif selected_tab == "Ticket Activity":
 
-                    @st.cache_data(show_spinner=False)
+                    @scoped_cache("engineer", "service_requests")
                     def fetch_and_cache_ticket_activity(customer_id, request_id):
                         onsite_service_request_collection = (
                             OnsiteServiceRequestCollection()
@@ -2714,7 +2747,11 @@ if __name__ == "__main__":
                                     )
 
                                     try:
-                                        fetch_and_cache_ticket_activity.clear()
+                                        invalidate_scope(
+                                            "engineer",
+                                            st.session_state.engineer_id,
+                                            "service_requests",
+                                        )
                                     except Exception as error:
                                         pass
 
@@ -2773,7 +2810,7 @@ if __name__ == "__main__":
 
                 else:
 
-                    @st.cache_data(show_spinner=False)
+                    @scoped_cache("engineer", "service_requests")
                     def fetch_and_cache_appliance_service_request_history(
                         customer_id, serial_number
                     ):
@@ -3036,15 +3073,43 @@ if __name__ == "__main__":
                             configuration_information, icon=":material/info:"
                         )
 
-                        query_appliances = Appliances()
-
                         if "cache_category" not in st.session_state:
                             st.session_state.cache_category = (
-                                query_appliances.fetch_category_by_sub_caegory(
+                                get_appliance_catalog().category_for_sub_category(
                                     st.session_state.cache_sub_category
                                 )
                             )
 
+                        service_guide_path = (
+                            st.session_state.cache_category.lower()
+                            .replace(" ", "_")
+                            .replace("-", "_")
+                            .replace("/", "_")
+                            + "/"
+                            + st.session_state.cache_sub_category.lower()
+                            .replace(" ", "_")
+                            .replace("-", "_")
+                            .replace("/", "_")
+                            + "_service_guide.pdf"
+                        )
+
+                        st.session_state.service_guide = build_guide_key(
+                            "gs://service_manual_bucket/" + service_guide_path,
+                            st.session_state.cache_brand,
+                            st.session_state.cache_model_number,
+                        )
+
+                        try:
+                            service_manual_bucket = ServiceManualBucket()
+                            st.session_state.service_guide_version = (
+                                service_manual_bucket.fetch_service_manual_generation(
+                                    service_guide_path
+                                )
+                            )
+
+                        except Exception as error:
+                            st.session_state.service_guide_version = None
+
                         try:
                             st.session_state.gemini_flash = build_context_cache(
                                 st.session_state.cache_brand,
@@ -3119,6 +3184,7 @@ if __name__ == "__main__":
                                 del st.session_state.messages
                                 del st.session_state.chat
                                 del st.session_state.service_guide
+                                del st.session_state.service_guide_version
 
                                 del st.session_state.gemini_flash
                                 del st.session_state.flag_use_context_cache
@@ -3196,8 +3262,11 @@ if __name__ == "__main__":
 
                             if st.session_state.flag_use_context_cache == True:
                                 response_from_model = (
-                                    st.session_state.chat.send_message(
-                                        message=prompt,
+                                    ServiceEngineerChatbot.send_chat_message(
+                                        chat=st.session_state.chat,
+                                        prompt=prompt,
+                                        guide_key=st.session_state.service_guide,
+                                        guide_version=st.session_state.service_guide_version,
                                     )
                                 )
 
@@ -3217,13 +3286,16 @@ if __name__ == "__main__":
                                 )
 
                                 response_from_model = (
-                                    st.session_state.chat.send_message(
-                                        message=[
+                                    ServiceEngineerChatbot.send_chat_message(
+                                        chat=st.session_state.chat,
+                                        prompt=prompt,
+                                        guide_key=st.session_state.service_guide,
+                                        guide_version=st.session_state.service_guide_version,
+                                        attachments=[
                                             types.Part.from_uri(
                                                 file_uri=service_manual_uri,
                                                 mime_type="application/pdf",
                                             ),
-                                            prompt,
                                         ],
                                     )
                                 )
@@ -3239,7 +3311,7 @@ if __name__ == "__main__":
 
                             try:
                                 response = st.write_stream(
-                                    response_generator(response_from_model.text)
+                                    response_generator(response_from_model)
                                 )
 
                             except Exception as err:
@@ -3290,9 +3362,8 @@ if __name__ == "__main__":
                             st.session_state.themes["refreshed"] = False
                             st.session_state.themes["current_theme"] = "light"
 
+                            clear_engineer_caches()
                             st.session_state.clear()
-                            st.cache_data.clear()
-                            st.cache_resource.clear()
 
                             st.rerun()
 
@@ -3338,15 +3409,6 @@ if __name__ == "__main__":
                 },
             }
 
-        try:
-            firebase_credentials = credentials.Certificate(
-                json.loads(st.secrets["FIREBASE_SERVICE_ACCOUNT_KEY"])
-            )
-            firebase_admin.initialize_app(firebase_credentials)
-
-        except Exception as error:
-            pass
-
         col_login_forum, col_image = st.columns(2)
 
         with col_image:
@@ -3434,12 +3496,18 @@ if __name__ == "__main__":
                 email = email.lower()
 
                 try:
+                    from firebase_admin import auth
+                    from database.cloud_sql.queries import QueryEngineers
+
+                    # Sets up the default Firebase app that auth relies on.
+                    get_client("firebase_app")
+
                     api_key = st.secrets["FIREBASE_AUTH_WEB_API_KEY"]
                     base_url = "https://identitytoolkit.googleapis.com/v1/accounts:signInWithPassword?key={api_key}"
 
                     if "@" not in email:
                         username = email.upper()
-                        user = firebase_admin.auth.get_user(username)
+                        user = auth.get_user(username)
                         email = user.email
 
                     query_engineers = QueryEngineers()
@@ -3458,12 +3526,13 @@ if __name__ == "__main__":
                             st.toast("Logging you in to the engineer app")
                             data = response.json()
 
-                            st.cache_data.clear()
-                            st.cache_resource.clear()
-
                             st.session_state.engineer_id = (
-                                firebase_admin.auth.get_user_by_email(email).uid
+                                auth.get_user_by_email(email).uid
                             )
+
+                            # Anything cached from this engineer's last
+                            # session is dropped; other engineers keep theirs.
+                            invalidate_scope("engineer", st.session_state.engineer_id)
                             st.rerun()
 
                         else:
@@ -3483,3 +3552,5 @@ if __name__ == "__main__":
                 except Exception as error:
                     st.session_state.engineer_id = False
                     st.rerun()
+
+        log_import_profile("engineer_app: login page")
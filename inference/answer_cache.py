@@ -0,0 +1,276 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+import time
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional
+
+ANSWER_CACHE_TTL_SECONDS: int = 6 * 60 * 60
+ANSWER_CACHE_MAX_ENTRIES_PER_GUIDE: int = 256
+ANSWER_CACHE_SIMILARITY_THRESHOLD: float = 0.8
+ANSWER_CACHE_MIN_QUESTION_TOKENS: int = 3
+
+_SHINGLE_SIZE = 4
+
+# Filler words that do not change the meaning of a troubleshooting question.
+# Negations ("not", "no") and question words are intentionally retained.
+_FILLER_WORDS = {
+    "a", "an", "the", "my", "our", "this", "that", "these", "those", "it",
+    "its", "is", "are", "was", "were", "be", "please", "pls", "kindly", "hi",
+    "hello", "hey", "me", "i", "we", "you", "your", "can", "could", "would",
+    "help", "tell", "of", "to", "for", "on", "in", "with", "some", "any",
+}
+
+
+def normalize_question(question: str) -> str:
+    question = unicodedata.normalize("NFKC", str(question)).lower()
+    question = re.sub(r"[^a-z0-9\s]", " ", question)
+
+    tokens = [
+        token for token in question.split() if token not in _FILLER_WORDS
+    ]
+    return " ".join(tokens)
+
+
+def build_guide_key(service_manual_uri: str, brand: str, model_number: str) -> str:
+    return f"{service_manual_uri}::{brand}::{model_number}".lower()
+
+
+def _shingles(normalized_question: str) -> frozenset:
+    text = f" {normalized_question} "
+
+    if len(text) <= _SHINGLE_SIZE:
+        return frozenset([text])
+
+    return frozenset(
+        text[idx: idx + _SHINGLE_SIZE]
+        for idx in range(len(text) - _SHINGLE_SIZE + 1)
+    )
+
+
+def _identifiers(normalized_question: str) -> frozenset:
+    # Error codes and part numbers (e.g. "e4", "f21") must match exactly, or
+    # "error code e4" would be a near-duplicate of "error code e5".
+    return frozenset(
+        token for token in normalized_question.split()
+        if any(char.isdigit() for char in token)
+    )
+
+
+def _jaccard_similarity(shingles_a: frozenset, shingles_b: frozenset) -> float:
+    if not shingles_a or not shingles_b:
+        return 0.0
+
+    return len(shingles_a & shingles_b) / len(shingles_a | shingles_b)
+
+
+class _CachedAnswer:
+    __slots__ = ("answer", "shingles", "identifiers", "created_at", "hits")
+
+    def __init__(self, answer, shingles, identifiers):
+        self.answer = answer
+        self.shingles = shingles
+        self.identifiers = identifiers
+        self.created_at = time.monotonic()
+        self.hits = 0
+
+
+class _GuideAnswers:
+    __slots__ = ("version", "entries")
+
+    def __init__(self, version):
+        self.version = version
+        self.entries = OrderedDict()
+
+
+class TroubleshootingAnswerCache:
+    def __init__(
+        self,
+        ttl_seconds: int = ANSWER_CACHE_TTL_SECONDS,
+        similarity_threshold: float = ANSWER_CACHE_SIMILARITY_THRESHOLD,
+        max_entries_per_guide: int = ANSWER_CACHE_MAX_ENTRIES_PER_GUIDE,
+        min_question_tokens: int = ANSWER_CACHE_MIN_QUESTION_TOKENS,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.max_entries_per_guide = max_entries_per_guide
+        self.min_question_tokens = min_question_tokens
+
+        self._guides: Dict[str, _GuideAnswers] = {}
+        self._lock = threading.Lock()
+
+        self._metrics = {
+            "lookups": 0,
+            "exact_hits": 0,
+            "near_duplicate_hits": 0,
+            "misses": 0,
+            "skipped": 0,
+            "stores": 0,
+            "expirations": 0,
+            "guide_invalidations": 0,
+        }
+
+    def _is_cacheable(self, normalized_question):
+        return len(normalized_question.split()) >= self.min_question_tokens
+
+    def _get_guide(self, guide_key, guide_version):
+        guide = self._guides.get(guide_key)
+
+        if guide is None:
+            guide = _GuideAnswers(guide_version)
+            self._guides[guide_key] = guide
+
+        elif guide_version is not None and guide.version != guide_version:
+            if guide.version is not None:
+                self._metrics["guide_invalidations"] += 1
+
+            guide.version = guide_version
+            guide.entries.clear()
+
+        return guide
+
+    def _is_expired(self, entry):
+        return time.monotonic() - entry.created_at > self.ttl_seconds
+
+    def lookup(
+        self,
+        guide_key: str,
+        question: str,
+        guide_version: Optional[str] = None,
+    ) -> Optional[str]:
+        normalized_question = normalize_question(question)
+
+        with self._lock:
+            self._metrics["lookups"] += 1
+
+            if not self._is_cacheable(normalized_question):
+                self._metrics["skipped"] += 1
+                return None
+
+            guide = self._get_guide(guide_key, guide_version)
+            entry = guide.entries.get(normalized_question)
+
+            if entry is not None and self._is_expired(entry):
+                del guide.entries[normalized_question]
+                self._metrics["expirations"] += 1
+                entry = None
+
+            if entry is not None:
+                guide.entries.move_to_end(normalized_question)
+                entry.hits += 1
+
+                self._metrics["exact_hits"] += 1
+                return entry.answer
+
+            shingles = _shingles(normalized_question)
+            identifiers = _identifiers(normalized_question)
+
+            best_key, best_score = None, 0.0
+
+            for cached_question, cached_entry in list(guide.entries.items()):
+                if self._is_expired(cached_entry):
+                    del guide.entries[cached_question]
+                    self._metrics["expirations"] += 1
+                    continue
+
+                if cached_entry.identifiers != identifiers:
+                    continue
+
+                score = _jaccard_similarity(shingles, cached_entry.shingles)
+
+                if score > best_score:
+                    best_key, best_score = cached_question, score
+
+            if best_key is not None and best_score >= self.similarity_threshold:
+                entry = guide.entries[best_key]
+                guide.entries.move_to_end(best_key)
+                entry.hits += 1
+
+                self._metrics["near_duplicate_hits"] += 1
+                return entry.answer
+
+            self._metrics["misses"] += 1
+            return None
+
+    def store(
+        self,
+        guide_key: str,
+        question: str,
+        answer: str,
+        guide_version: Optional[str] = None,
+    ) -> bool:
+        normalized_question = normalize_question(question)
+
+        if not answer or not self._is_cacheable(normalized_question):
+            return False
+
+        with self._lock:
+            guide = self._get_guide(guide_key, guide_version)
+
+            guide.entries[normalized_question] = _CachedAnswer(
+                answer,
+                _shingles(normalized_question),
+                _identifiers(normalized_question),
+            )
+            guide.entries.move_to_end(normalized_question)
+
+            while len(guide.entries) > self.max_entries_per_guide:
+                guide.entries.popitem(last=False)
+
+            self._metrics["stores"] += 1
+
+        return True
+
+    def invalidate_guide(self, guide_key: str) -> None:
+        with self._lock:
+            if self._guides.pop(guide_key, None) is not None:
+                self._metrics["guide_invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._guides.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["guides"] = len(self._guides)
+            metrics["entries"] = sum(
+                len(guide.entries) for guide in self._guides.values()
+            )
+
+        hits = metrics["exact_hits"] + metrics["near_duplicate_hits"]
+        eligible_lookups = metrics["lookups"] - metrics["skipped"]
+
+        metrics["hit_rate"] = (
+            round(hits / eligible_lookups, 4) if eligible_lookups else 0.0
+        )
+        return metrics
+
+
+_answer_cache = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_troubleshooting_answer_cache() -> TroubleshootingAnswerCache:
+    global _answer_cache
+
+    if _answer_cache is None:
+        with _answer_cache_lock:
+            if _answer_cache is None:
+                _answer_cache = TroubleshootingAnswerCache()
+
+    return _answer_cache
@@ -0,0 +1,331 @@
+# Copyright 2025 Ashwin Raj
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import logging
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+from inference.chatbot import ServiceEngineerChatbot, build_service_manual_uri
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_CACHE_REFRESH_MARGIN_SECONDS: int = 10 * 60
+
+PREWARM_INTERVAL_SECONDS: int = 15 * 60
+PREWARM_MAX_CONCURRENCY: int = 3
+PREWARM_MAX_NEW_CACHES_PER_RUN: int = 10
+PREWARM_MAX_ACTIVE_CACHES: int = 40
+
+PREWARM_ASSIGNMENT_STATUSES = ("pending_confirmation", "confirmed")
+
+
+def _guide_key(brand, sub_category, model_number):
+    return (brand, sub_category, model_number)
+
+
+def _seconds_until_expiry(context_cache):
+    expire_time = getattr(context_cache, "expire_time", None)
+
+    if expire_time is None:
+        return 0
+
+    if expire_time.tzinfo is None:
+        expire_time = expire_time.replace(tzinfo=timezone.utc)
+
+    return (expire_time - datetime.now(timezone.utc)).total_seconds()
+
+
+class ContextCacheRegistry:
+    def __init__(
+        self, refresh_margin_seconds=CONTEXT_CACHE_REFRESH_MARGIN_SECONDS
+    ):
+        self.refresh_margin_seconds = refresh_margin_seconds
+
+        self._context_caches = {}
+        self._guide_locks = {}
+        self._lock = threading.Lock()
+
+    def _get_guide_lock(self, guide_key):
+        with self._lock:
+            if guide_key not in self._guide_locks:
+                self._guide_locks[guide_key] = threading.Lock()
+
+            return self._guide_locks[guide_key]
+
+    def get(self, brand, sub_category, model_number):
+        with self._lock:
+            context_cache = self._context_caches.get(
+                _guide_key(brand, sub_category, model_number)
+            )
+
+        if context_cache is None:
+            return None
+
+        if _seconds_until_expiry(context_cache) <= self.refresh_margin_seconds:
+            return None
+
+        return context_cache
+
+    def active_caches(self):
+        with self._lock:
+            context_caches = dict(self._context_caches)
+
+        return {
+            guide_key: context_cache
+            for guide_key, context_cache in context_caches.items()
+            if _seconds_until_expiry(context_cache) > 0
+        }
+
+    def get_or_create(
+        self, brand, category, sub_category, model_number, chatbot=None
+    ):
+        context_cache = self.get(brand, sub_category, model_number)
+
+        if context_cache is not None:
+            return context_cache, False
+
+        guide_key = _guide_key(brand, sub_category, model_number)
+
+        # Serialize per guide so the pre-warmer and an engineer opening the
+        # chat for the same appliance never create two caches for it.
+        with self._get_guide_lock(guide_key):
+            context_cache = self.get(brand, sub_category, model_number)
+
+            if context_cache is not None:
+                return context_cache, False
+
+            chatbot = chatbot or ServiceEngineerChatbot()
+
+            with self._lock:
+                previous_cache = self._context_caches.get(guide_key)
+
+            if previous_cache is not None and _seconds_until_expiry(
+                previous_cache
+            ) > 0:
+                try:
+                    context_cache = chatbot.extend_context_cache_ttl(
+                        previous_cache
+                    )
+
+                except Exception as error:
+                    # Falls through to building a fresh cache below.
+                    logger.warning(
+                        "Could not extend the context cache for %s: %s",
+                        guide_key,
+                        error,
+                    )
+                    context_cache = None
+
+            if context_cache is None:
+                context_cache = chatbot.construct_cache_model(
+                    brand,
+                    sub_category,
+                    model_number,
+                    f"{brand} {sub_category} {model_number}",
+                    [build_service_manual_uri(category, sub_category)],
+                )
+
+            with self._lock:
+                self._context_caches[guide_key] = context_cache
+
+            return context_cache, True
+
+
+class ContextCachePrewarmer:
+    def __init__(
+        self,
+        registry,
+        interval_seconds=PREWARM_INTERVAL_SECONDS,
+        max_concurrency=PREWARM_MAX_CONCURRENCY,
+        max_new_caches_per_run=PREWARM_MAX_NEW_CACHES_PER_RUN,
+        max_active_caches=PREWARM_MAX_ACTIVE_CACHES,
+    ):
+        self.registry = registry
+        self.interval_seconds = interval_seconds
+        self.max_concurrency = max_concurrency
+        self.max_new_caches_per_run = max_new_caches_per_run
+        self.max_active_caches = max_active_caches
+
+        self.last_run_summary = {}
+
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def collect_upcoming_guides(self, service_requests):
+        guide_demand = Counter()
+        guide_categories = {}
+
+        for service_request in service_requests:
+            assigned_to = service_request.get("assigned_to")
+
+            if not assigned_to or assigned_to == "ADMIN":
+                continue
+
+            if (
+                service_request.get("assignment_status")
+                not in PREWARM_ASSIGNMENT_STATUSES
+            ):
+                continue
+
+            appliance_details = service_request.get("appliance_details") or {}
+
+            guide_key = _guide_key(
+                appliance_details.get("brand"),
+                appliance_details.get("sub_category"),
+                appliance_details.get("model_number"),
+            )
+
+            if not all(guide_key) or not appliance_details.get("category"):
+                continue
+
+            guide_demand[guide_key] += 1
+            guide_categories[guide_key] = appliance_details.get("category")
+
+        return [
+            (guide_key, guide_categories[guide_key])
+            for guide_key, _ in guide_demand.most_common()
+        ]
+
+    def _warm_guide(self, guide_key, category, chatbot):
+        brand, sub_category, model_number = guide_key
+
+        _, created = self.registry.get_or_create(
+            brand, category, sub_category, model_number, chatbot=chatbot
+        )
+        return created
+
+    def run_once(self, service_requests=None):
+        started_at = time.perf_counter()
+
+        if service_requests is None:
+            from database.firebase.firestore import (
+                OnsiteServiceRequestCollection,
+            )
+
+            service_requests = (
+                OnsiteServiceRequestCollection().fetch_open_onsite_service_requests()
+            )
+
+        upcoming_guides = self.collect_upcoming_guides(service_requests)
+
+        active_caches = self.registry.active_caches()
+        budget = min(
+            self.max_new_caches_per_run,
+            max(0, self.max_active_caches - len(active_caches)),
+        )
+
+        # Guides that are already warm cost nothing unless they are about to
+        # expire, so only the remainder is charged against the budget.
+        cold_guides = [
+            (guide_key, category)
+            for guide_key, category in upcoming_guides
+            if self.registry.get(*guide_key) is None
+        ]
+        guides_to_warm = cold_guides[:budget]
+
+        summary = {
+            "upcoming_guides": len(upcoming_guides),
+            "already_warm": len(upcoming_guides) - len(cold_guides),
+            "skipped_over_budget": len(cold_guides) - len(guides_to_warm),
+            "scheduled": len(guides_to_warm),
+            "created": 0,
+            "failed": 0,
+        }
+
+        if guides_to_warm:
+            chatbot = ServiceEngineerChatbot()
+
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                futures = [
+                    pool.submit(self._warm_guide, guide_key, category, chatbot)
+                    for guide_key, category in guides_to_warm
+                ]
+
+                for future in futures:
+                    try:
+                        if future.result():
+                            summary["created"] += 1
+
+                    except Exception as error:
+                        summary["failed"] += 1
+                        logger.warning("Context cache pre-warm failed: %s", error)
+
+        summary["elapsed_seconds"] = round(time.perf_counter() - started_at, 3)
+        self.last_run_summary = summary
+
+        return summary
+
+    def _run_forever(self):
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+
+            except Exception as error:
+                logger.warning("Context cache pre-warmer run failed: %s", error)
+
+            self._stop_event.wait(self.interval_seconds)
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run_forever,
+                name="context-cache-prewarmer",
+                daemon=True,
+            )
+            self._thread.start()
+
+        return True
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_context_cache_registry = None
+_context_cache_registry_lock = threading.Lock()
+
+
+def get_context_cache_registry() -> ContextCacheRegistry:
+    global _context_cache_registry
+
+    if _context_cache_registry is None:
+        with _context_cache_registry_lock:
+            if _context_cache_registry is None:
+                _context_cache_registry = ContextCacheRegistry()
+
+    return _context_cache_registry
+
+
+_context_cache_prewarmer = None
+_context_cache_prewarmer_lock = threading.Lock()
+
+
+def get_context_cache_prewarmer() -> ContextCachePrewarmer:
+    global _context_cache_prewarmer
+
+    if _context_cache_prewarmer is None:
+        with _context_cache_prewarmer_lock:
+            if _context_cache_prewarmer is None:
+                _context_cache_prewarmer = ContextCachePrewarmer(
+                    get_context_cache_registry()
+                )
+
+    return _context_cache_prewarmer
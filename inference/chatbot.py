@@ -24,10 +24,27 @@ from google.genai import types
 from google.oauth2.service_account import Credentials
 from google.auth.transport.requests import Request
 
+from inference.answer_cache import get_troubleshooting_answer_cache
+from backend.utils.llm_telemetry import get_llm_telemetry
+
 load_dotenv()
 warnings.filterwarnings("ignore")
 
 
+def _service_manual_path_segment(value):
+    return value.lower().replace(" ", "_").replace("-", "_").replace("/", "_")
+
+
+def build_service_manual_uri(category, sub_category):
+    return (
+        "gs://service_manual_bucket/"
+        + _service_manual_path_segment(category)
+        + "/"
+        + _service_manual_path_segment(sub_category)
+        + "_service_guide.pdf"
+    )
+
+
 class ServiceEngineerChatbot:
     def __init__(self):
         credentials = Credentials.from_service_account_info(
@@ -215,24 +232,38 @@ class ServiceEngineerChatbot:
                 )
             )
 
-        context_cache = self.client.caches.create(
-            model="gemini-2.5-flash",
-            config=types.CreateCachedContentConfig(
-                contents=[
-                    types.Content(
-                        role="user",
-                        parts=files_to_upload,
-                    )
-                ],
-                system_instruction=gemini_system_instruction,
-                display_name=f"{service_guide_title}_cache",
-                ttl="3600s",
-            ),
-        )
+        with get_llm_telemetry().track_call(
+            "engineer_chatbot", "construct_cache_model", "gemini-2.5-flash"
+        ) as llm_call:
+            context_cache = self.client.caches.create(
+                model="gemini-2.5-flash",
+                config=types.CreateCachedContentConfig(
+                    contents=[
+                        types.Content(
+                            role="user",
+                            parts=files_to_upload,
+                        )
+                    ],
+                    system_instruction=gemini_system_instruction,
+                    display_name=f"{service_guide_title}_cache",
+                    ttl="3600s",
+                ),
+            )
+
+            cached_content = self.client.caches.get(name=context_cache.name)
+
+            llm_call.extra["cached_content_tokens"] = getattr(
+                cached_content.usage_metadata, "total_token_count", None
+            )
 
-        cached_content = self.client.caches.get(name=context_cache.name)
         return cached_content
 
+    def extend_context_cache_ttl(self, context_cache, ttl="3600s"):
+        return self.client.caches.update(
+            name=context_cache.name,
+            config=types.UpdateCachedContentConfig(ttl=ttl),
+        )
+
     def create_chat_instance(
         self, context_cache, chat_history, use_context_cache=False
     ):
@@ -253,15 +284,87 @@ class ServiceEngineerChatbot:
 
         return chat
 
-    def chat_with_context_cache(self, prompt, context_cache):
-        response = self.client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                cached_content=context_cache.name,
-            ),
+    def chat_with_context_cache(
+        self, prompt, context_cache, guide_key=None, guide_version=None
+    ):
+        # Each call here is a single, standalone turn with no chat history,
+        # so the question alone is a safe cache key.
+        answer_cache = get_troubleshooting_answer_cache()
+
+        if guide_key:
+            cached_answer = answer_cache.lookup(guide_key, prompt, guide_version)
+
+            if cached_answer:
+                return cached_answer
+
+        with get_llm_telemetry().track_call(
+            "engineer_chatbot", "chat_with_context_cache", "gemini-2.5-flash"
+        ) as llm_call:
+            response = self.client.models.generate_content(
+                model="gemini-2.5-flash",
+                contents=prompt,
+                config=types.GenerateContentConfig(
+                    cached_content=context_cache.name,
+                ),
+            )
+            llm_call.set_usage(response.usage_metadata)
+
+        if guide_key:
+            answer_cache.store(guide_key, prompt, response.text, guide_version)
+
+        return response.text
+
+    @staticmethod
+    def send_chat_message(
+        chat, prompt, guide_key=None, guide_version=None, attachments=None
+    ):
+        answer_cache = get_troubleshooting_answer_cache()
+
+        # Cached answers are keyed on the question alone, so they are only
+        # used for the opening question of a chat. A follow-up such as "what
+        # about step 3?" depends on the turns before it.
+        use_answer_cache = bool(guide_key) and not any(
+            content.role == "user" for content in chat.get_history()
         )
 
+        if use_answer_cache:
+            cached_answer = answer_cache.lookup(guide_key, prompt, guide_version)
+
+            if cached_answer:
+                # Recorded as if Gemini had answered, so later turns in this
+                # chat still see the question and the answer.
+                chat.record_history(
+                    user_input=types.Content(
+                        role="user",
+                        parts=[*(attachments or []), types.Part.from_text(text=prompt)],
+                    ),
+                    model_output=[
+                        types.Content(
+                            role="model",
+                            parts=[types.Part.from_text(text=cached_answer)],
+                        )
+                    ],
+                    is_valid=True,
+                )
+
+                return cached_answer
+
+        with get_llm_telemetry().track_call(
+            "engineer_chatbot",
+            "send_chat_message",
+            "gemini-2.5-flash",
+            attachments=len(attachments or []),
+        ) as llm_call:
+            if attachments:
+                response = chat.send_message(message=[*attachments, prompt])
+            else:
+                response = chat.send_message(message=prompt)
+
+            llm_call.set_usage(response.usage_metadata)
+
+        if use_answer_cache:
+            answer_cache.store(guide_key, prompt, response.text, guide_version)
+
         return response.text
 
     def construct_flash_model(self, brand, sub_category, model_number):
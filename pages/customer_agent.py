@@ -13,7 +13,6 @@
 # limitations under the License.
 
 import os
-import time
 import uuid
 import warnings
 from dotenv import load_dotenv
@@ -25,9 +24,13 @@ import streamlit as st
 import streamlit_antd_components as sac
 from streamlit_extras.stylable_container import stylable_container
 
-from customer_agent.runner import initialize_adk, run_adk_sync
-from database.cloud_storage.multimedia_storage import ProfilePicturesBucket
-from database.cloud_sql.queries import QueryCustomers
+from backend.utils.scoped_cache import invalidate_scope, scoped_cache
+from backend.utils.import_profiler import (
+    install_import_profiler,
+    log_import_profile,
+)
+
+install_import_profiler()
 
 
 st.set_page_config(
@@ -187,7 +190,7 @@ def get_greetings(is_ist, session_id):
     return greeting
 
 
-@st.cache_data(show_spinner=False)
+@scoped_cache("customer", "profile")
 def get_customer_details(full_name, session_id):
     query_customers = QueryCustomers()
 
@@ -218,6 +221,18 @@ adk_logo = "https://google.github.io/adk-docs/assets/agent-development-kit.png"
 
 if __name__ == "__main__":
     if st.session_state.customer_id:
+        # ADK, Gemini and the Cloud SQL connector load only for a signed-in
+        # customer; get_customer_details looks QueryCustomers up at call time.
+        from customer_agent.runner import (
+            ensure_adk_session,
+            initialize_adk,
+            stream_adk_sync,
+        )
+        from database.cloud_storage.multimedia_storage import ProfilePicturesBucket
+        from database.cloud_sql.queries import QueryCustomers
+
+        log_import_profile("customer_agent page")
+
         if 'messages' not in st.session_state:
             st.session_state['messages'] = []
 
@@ -321,7 +336,8 @@ if __name__ == "__main__":
                     icon=":material/arrow_back:",
                     use_container_width=True,
                 ):
-                    st.cache_data.clear()
+                    # The agent may have changed appliances or requests.
+                    invalidate_scope("customer", st.session_state.customer_id)
                     st.switch_page('customer_app.py')
 
             with colb:
@@ -331,7 +347,7 @@ if __name__ == "__main__":
                     help="New Session",
                     use_container_width=True,
                 ):
-                    initialize_adk.clear()
+                    initialize_adk.clear(user_id=st.session_state.customer_id)
                     del st.session_state['messages']
                     del st.session_state['adk_session_id']
 
@@ -342,6 +358,12 @@ if __name__ == "__main__":
                 user_id=st.session_state.customer_id
             )
 
+            # The cached session may have been evicted while the customer was
+            # away, e.g. a tab left open overnight without logging out.
+            ensure_adk_session(
+                adk_runner, st.session_state.customer_id, current_session_id
+            )
+
         except Exception as e:
             st.error(f"""
                 **Fatal Error:** Could not initialize the ADK Runner or Session 
@@ -368,47 +390,68 @@ if __name__ == "__main__":
                 st.markdown(prompt, unsafe_allow_html=False)
 
             with st.chat_message("assistant", avatar=adk_logo):
-                message_placeholder = st.empty()
-
-                with st.spinner("Thinking.....", show_time=True):
-                    try:
-                        agent_response = run_adk_sync(
-                            st.session_state.customer_id, 
-                            adk_runner, 
-                            current_session_id, 
-                            prompt
-                        )
+                tool_status_placeholder = st.empty()
 
-                    except Exception as error:
-                        agent_response = """Sorry, an error occurred while 
-                        processing your request. Please try again later."""
+                def describe_tool_call(tool_name):
+                    if tool_name == "transfer_to_agent":
+                        return "Connecting you with the right assistant..."
 
-                st.session_state.messages.append(
-                    {"role": "assistant", "content": agent_response}
-                )
+                    return (
+                        tool_name.removesuffix("_tool").replace("_", " ").capitalize()
+                        + "..."
+                    )
+
+                def response_generator(stream_events):
+                    streamed_text = False
+                    tool_status_placeholder.caption(
+                        ":material/hourglass_top: Thinking..."
+                    )
 
-                def response_generator(response):
-                    for word in response:
-                        time.sleep(0.025)
+                    for stream_event in stream_events:
+                        if stream_event["type"] == "tool_start":
+                            tool_status_placeholder.caption(
+                                ":material/build: "
+                                + describe_tool_call(stream_event["name"])
+                            )
 
-                        try:
-                            yield word.text
-                        except Exception as err:
-                            yield word
+                        elif stream_event["type"] == "tool_end":
+                            tool_status_placeholder.caption(
+                                ":material/hourglass_top: Thinking..."
+                            )
+
+                        elif stream_event["type"] in ("text", "error"):
+                            tool_status_placeholder.empty()
+                            streamed_text = True
+
+                            yield stream_event["text"]
+
+                        elif stream_event["type"] == "final" and not streamed_text:
+                            yield stream_event["text"]
+
+                    tool_status_placeholder.empty()
 
                 try:
                     response = st.write_stream(
-                        response_generator(agent_response)
+                        response_generator(
+                            stream_adk_sync(
+                                st.session_state.customer_id,
+                                adk_runner,
+                                current_session_id,
+                                prompt,
+                            )
+                        )
                     )
 
                 except Exception as err:
-                    fallback_message = (
-                        f"Sorry, I am unable to answer this."
-                    )
+                    tool_status_placeholder.empty()
 
-                    response = st.write_stream(
-                        response_generator(fallback_message)
-                    )
+                    response = """Sorry, an error occurred while processing 
+                    your request. Please try again later."""
+                    st.markdown(response)
+
+                st.session_state.messages.append(
+                    {"role": "assistant", "content": response}
+                )
 
     else:
         st.switch_page("customer_app.py")